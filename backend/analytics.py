@@ -0,0 +1,267 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from database import database, read_database
+from models import passes, purchase_logs, sales_rollups, seat_usage_rollups, rollup_watermarks, seat_sessions
+from seat_state import to_kst
+import pytz
+KST = pytz.timezone("Asia/Seoul")
+
+logger = logging.getLogger(__name__)
+
+# purchase_logs 를 집계 테이블에 반영하는 주기 (초)
+ROLLUP_INTERVAL_SECONDS = 60
+# 한 트랜잭션에서 반영하는 최대 로그 수
+FOLD_BATCH_SIZE = 5000
+# 아직 커밋 중일 수 있는 최근 로그는 건너뛰고 다음 주기에 반영 (id 순서와 커밋 순서가 다를 수 있음)
+FOLD_LAG = timedelta(seconds=30)
+
+SALES_WATERMARK = "sales_rollups"
+
+
+def hour_bucket(value: datetime) -> datetime:
+    return to_kst(value).replace(minute=0, second=0, microsecond=0)
+
+
+def day_bucket(value: datetime) -> datetime:
+    return to_kst(value).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def week_bucket(value: datetime) -> datetime:
+    # 월요일 00시 기준
+    day = day_bucket(value)
+    return day - timedelta(days=day.weekday())
+
+
+PERIOD_BUCKETS = {
+    "hour": hour_bucket,
+    "day": day_bucket,
+    "week": week_bucket,
+}
+
+
+def upsert(table):
+    """
+    INSERT ... ON CONFLICT 를 쓸 수 있는 DB별 insert (운영 PostgreSQL, 개발 SQLite 모두 지원).
+    """
+    if database.url.dialect == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+async def add_to_bucket(table, keys: dict, increments: dict):
+    """
+    집계 행에 값을 더함. 행이 없으면 새로 만듦.
+    한 문장의 upsert 라서 같은 새 시간 버킷에 동시에 더해도 기본키 충돌 없이 둘 다 반영됨.
+    """
+    query = upsert(table).values(**keys, **increments)
+    query = query.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={column: table.c[column] + query.excluded[column] for column in increments},
+    )
+    await database.execute(query)
+
+
+async def fold_purchase_logs(now: Optional[datetime] = None) -> int:
+    """
+    워터마크 이후의 purchase_logs 를 시간/이용권별로 묶어 sales_rollups 에 더함.
+    반영한 로그 수를 반환. 밀린 로그를 다 반영하면 워터마크의 updated_at 을 now 로 맞춤 (보고서의 집계 지연 표시용).
+    """
+    now = now or datetime.now(KST)
+    cutoff = now - FOLD_LAG
+    folded = 0
+
+    while True:
+        async with database.transaction():
+            watermark = await database.fetch_one(
+                select(rollup_watermarks.c.last_id).where(rollup_watermarks.c.name == SALES_WATERMARK)
+            )
+            if not watermark:
+                await database.execute(rollup_watermarks.insert().values(name=SALES_WATERMARK, last_id=0))
+                last_id = 0
+            else:
+                last_id = watermark["last_id"]
+
+            records = await database.fetch_all(
+                select(purchase_logs.c.id, purchase_logs.c.pass_id, purchase_logs.c.price, purchase_logs.c.purchased_at)
+                .where(purchase_logs.c.id > last_id)
+                .order_by(purchase_logs.c.id)
+                .limit(FOLD_BATCH_SIZE)
+            )
+
+            batch = []
+            for record in records:
+                if to_kst(record["purchased_at"]) > cutoff:
+                    break
+                batch.append(record)
+
+            if not batch:
+                break
+
+            # 다른 워커가 먼저 반영했다면 워터마크가 바뀌어 있으므로 이번 배치는 버림
+            caught_up = len(batch) < FOLD_BATCH_SIZE
+            moved = await database.fetch_one(
+                rollup_watermarks.update()
+                .where(rollup_watermarks.c.name == SALES_WATERMARK)
+                .where(rollup_watermarks.c.last_id == last_id)
+                .values(last_id=batch[-1]["id"], **({"updated_at": now} if caught_up else {}))
+                .returning(rollup_watermarks.c.last_id)
+            )
+            if not moved:
+                return folded
+
+            buckets: Dict[Tuple[datetime, int], list] = defaultdict(lambda: [0, 0])
+            for record in batch:
+                bucket = buckets[(hour_bucket(record["purchased_at"]), record["pass_id"])]
+                bucket[0] += 1
+                bucket[1] += record["price"]
+
+            for (hour, pass_id), (count, revenue) in buckets.items():
+                await add_to_bucket(
+                    sales_rollups,
+                    {"hour": hour, "pass_id": pass_id},
+                    {"purchase_count": count, "revenue": revenue},
+                )
+
+        folded += len(batch)
+        if caught_up:
+            return folded
+
+    # 새로 반영할 로그가 없었음: 그래도 여기까지는 따라잡았다고 기록
+    await database.execute(
+        rollup_watermarks.update()
+        .where(rollup_watermarks.c.name == SALES_WATERMARK)
+        .values(updated_at=now)
+    )
+    return folded
+
+
+async def sales_rollup_lag(now: Optional[datetime] = None) -> Optional[int]:
+    """
+    매출 집계가 몇 초 전 구매까지 반영돼 있는지. 집계가 한 번도 따라잡은 적 없으면 None.
+    마지막으로 따라잡은 시각보다 FOLD_LAG 만큼 이전 구매까지 들어 있음.
+    """
+    now = now or datetime.now(KST)
+    updated_at = await read_database.fetch_val(
+        select(rollup_watermarks.c.updated_at).where(rollup_watermarks.c.name == SALES_WATERMARK)
+    )
+    if updated_at is None:
+        return None
+    return max(int((now - to_kst(updated_at) + FOLD_LAG).total_seconds()), 0)
+
+
+async def record_seat_usage(start_at: Optional[datetime], end_at: datetime, branch_id: int):
+    """
+    끝난 좌석 이용 한 건을 시간대별로 나눠 지점의 seat_usage_rollups 에 더함. 퇴실/만료 때 호출.
+    """
+    if start_at is None:
+        return
+
+    start_at = to_kst(start_at)
+    end_at = to_kst(end_at)
+    if end_at <= start_at:
+        return
+
+    hour = hour_bucket(start_at)
+    while hour < end_at:
+        next_hour = hour + timedelta(hours=1)
+        seconds = int((min(end_at, next_hour) - max(start_at, hour)).total_seconds())
+        ended_here = end_at <= next_hour
+        await add_to_bucket(
+            seat_usage_rollups,
+            {"hour": hour, "branch_id": branch_id},
+            {"occupied_seconds": seconds, "sessions": 1 if ended_here else 0},
+        )
+        hour = next_hour
+
+
+async def record_seat_session(session: dict, branch_id: int):
+    """
+    끝난 좌석 이용 한 건을 seat_sessions 에 추가하고 지점의 시간대별 이용 집계에도 더함.
+    퇴실/만료 처리와 같은 트랜잭션 안에서 호출.
+    """
+    if session["started_at"] is None:
+        return
+
+    started_at = to_kst(session["started_at"])
+    ended_at = to_kst(session["ended_at"])
+    used_minutes = max(int((ended_at - started_at).total_seconds() // 60), 0)
+
+    await database.execute(
+        seat_sessions.insert().values({
+            **session,
+            "started_at": started_at,
+            "ended_at": ended_at,
+            "used_minutes": used_minutes,
+        })
+    )
+    await record_seat_usage(started_at, ended_at, branch_id)
+
+
+async def iter_revenue(period: str, start: datetime, end: datetime, branch_id: int) -> AsyncIterator[dict]:
+    """
+    기간 내 지점 매출을 period(hour/day/week) 단위로 묶어 차례로 반환.
+    시간 버킷을 정렬된 순서로 읽으며 합치므로 기간이 길어도 메모리는 일정함.
+    """
+    to_bucket = PERIOD_BUCKETS[period]
+    query = (
+        select(sales_rollups.c.hour, sales_rollups.c.purchase_count, sales_rollups.c.revenue)
+        .select_from(sales_rollups.join(passes, sales_rollups.c.pass_id == passes.c.id))
+        .where(passes.c.branch_id == branch_id)
+        .where(sales_rollups.c.hour >= start)
+        .where(sales_rollups.c.hour < end)
+        .order_by(sales_rollups.c.hour)
+    )
+
+    current = None
+    async for record in read_database.iterate(query):
+        bucket = to_bucket(record["hour"])
+        if current is None or current["bucket"] != bucket:
+            if current is not None:
+                yield current
+            current = {"bucket": bucket, "purchase_count": 0, "revenue": 0}
+        current["purchase_count"] += record["purchase_count"]
+        current["revenue"] += record["revenue"]
+
+    if current is not None:
+        yield current
+
+
+async def iter_seat_utilization(start: datetime, end: datetime, branch_id: int, seat_count: int) -> AsyncIterator[dict]:
+    """
+    기간 내 지점의 시간대별 좌석 점유율. 점유율 = 점유 시간 합 / (지점 좌석 수 × 1시간).
+    """
+    query = (
+        seat_usage_rollups.select()
+        .where(seat_usage_rollups.c.branch_id == branch_id)
+        .where(seat_usage_rollups.c.hour >= start)
+        .where(seat_usage_rollups.c.hour < end)
+        .order_by(seat_usage_rollups.c.hour)
+    )
+    capacity = seat_count * 3600
+
+    async for record in read_database.iterate(query):
+        yield {
+            "bucket": to_kst(record["hour"]),
+            "occupied_minutes": record["occupied_seconds"] // 60,
+            "sessions": record["sessions"],
+            "utilization": round(record["occupied_seconds"] / capacity, 4) if capacity else None,
+        }
+
+
+async def run_rollups(interval: float = ROLLUP_INTERVAL_SECONDS):
+    """
+    lifespan 에서 백그라운드 태스크로 실행하는 주기적 매출 집계 루프.
+    """
+    while True:
+        try:
+            folded = await fold_purchase_logs()
+            if folded:
+                logger.info("구매 로그 %d건 집계 반영", folded)
+        except Exception:
+            logger.exception("매출 집계 실패")
+        await asyncio.sleep(interval)
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import select, literal, union_all
+from database import database
+from models import (
+    user_passes, purchase_logs, rollup_watermarks,
+    user_passes_archive, purchase_logs_archive,
+)
+from analytics import SALES_WATERMARK
+import pytz
+KST = pytz.timezone("Asia/Seoul")
+
+logger = logging.getLogger(__name__)
+
+# 구매 후 이 기간(일)이 지난 구매 로그는 보관 테이블로 옮김
+ARCHIVE_PURCHASE_LOGS_AFTER_DAYS = int(os.getenv("ARCHIVE_PURCHASE_LOGS_AFTER_DAYS", "180"))
+# 한 트랜잭션에서 옮기는 최대 행 수 (잠금 시간, WAL 크기를 제한)
+ARCHIVE_BATCH_SIZE = 1000
+# 배치 사이 쉬는 시간 (초), 요청 처리에 DB를 양보
+ARCHIVE_PAUSE_SECONDS = 0.1
+ARCHIVE_INTERVAL_SECONDS = 3600
+
+
+async def archive_user_passes(ids: List[int], now: datetime) -> list:
+    """
+    보유 이용권을 보관 테이블로 옮기고 옮긴 행(id, user_id, branch_id 등)을 반환 (만료/소진 때 삭제 대신).
+    상태를 바꾼 트랜잭션 안에서 호출. 지운 행만 옮기므로 퇴실과 만료 정리가 같은 이용권을 동시에 옮겨도 한 번만 들어감.
+    """
+    if not ids:
+        return []
+    deleted = await database.fetch_all(
+        user_passes.delete()
+        .where(user_passes.c.id.in_(ids))
+        .returning(
+            user_passes.c.id,
+            user_passes.c.user_id,
+            user_passes.c.pass_id,
+            user_passes.c.branch_id,
+            user_passes.c.expire_at,
+            user_passes.c.remaining_seconds,
+        )
+    )
+    if deleted:
+        await database.execute_many(user_passes_archive.insert(), [
+            {
+                "id": record["id"],
+                "user_id": record["user_id"],
+                "pass_id": record["pass_id"],
+                "branch_id": record["branch_id"],
+                "expire_at": record["expire_at"],
+                "end_reason": "used_up" if record["remaining_seconds"] is not None else "expired",
+                "archived_at": now,
+            }
+            for record in deleted
+        ])
+    return deleted
+
+
+class Archiver:
+    """
+    오래된 구매 로그를 보관 테이블로 옮기는 백그라운드 작업.
+    ARCHIVE_BATCH_SIZE 씩 나눠 트랜잭션마다 "지우고 지운 행을 보관 테이블에 넣기" 를 하고,
+    매출 집계(sales_rollups)에 이미 반영된 로그만 옮겨 집계가 빠지지 않게 함.
+    """
+
+    def __init__(
+        self,
+        hot_period: timedelta = timedelta(days=ARCHIVE_PURCHASE_LOGS_AFTER_DAYS),
+        batch_size: int = ARCHIVE_BATCH_SIZE,
+        pause: float = ARCHIVE_PAUSE_SECONDS,
+        interval: float = ARCHIVE_INTERVAL_SECONDS,
+    ):
+        self.hot_period = hot_period
+        self.batch_size = batch_size
+        self.pause = pause
+        self.interval = interval
+
+    async def archive_purchase_logs(self, now: Optional[datetime] = None) -> int:
+        now = now or datetime.now(KST)
+        cutoff = now - self.hot_period
+        folded_id = await database.fetch_val(
+            select(rollup_watermarks.c.last_id).where(rollup_watermarks.c.name == SALES_WATERMARK)
+        )
+        if not folded_id:
+            return 0
+
+        moved = 0
+        while True:
+            chunk = (
+                select(purchase_logs.c.id)
+                .where(purchase_logs.c.purchased_at < cutoff)
+                .where(purchase_logs.c.id <= folded_id)
+                .order_by(purchase_logs.c.purchased_at)
+                .limit(self.batch_size)
+            )
+            async with database.transaction():
+                deleted = await database.fetch_all(
+                    purchase_logs.delete()
+                    .where(purchase_logs.c.id.in_(chunk.scalar_subquery()))
+                    .returning(*purchase_logs.c)
+                )
+                if deleted:
+                    await database.execute_many(purchase_logs_archive.insert(), [dict(record) for record in deleted])
+
+            moved += len(deleted)
+            if len(deleted) < self.batch_size:
+                break
+            await asyncio.sleep(self.pause)
+
+        if moved:
+            logger.info("구매 로그 %d건 보관 테이블로 이동", moved)
+        return moved
+
+    async def run(self):
+        """
+        lifespan 에서 백그라운드 태스크로 실행하는 보관 루프.
+        """
+        while True:
+            try:
+                await self.archive_purchase_logs()
+            except Exception:
+                logger.exception("구매 로그 보관 실패")
+            await asyncio.sleep(self.interval)
+
+
+async def purchase_history(db, user_id: int, before_id: Optional[int], limit: int, include_archived: bool) -> List[dict]:
+    """
+    사용자 구매 내역을 최근 것부터 (id 키셋 페이지). include_archived 면 보관 테이블까지 함께 읽음.
+    보관 테이블도 원래 id 를 쓰므로 두 테이블을 합쳐도 id 가 겹치지 않음.
+    """
+    def tier(table, archived: bool):
+        query = (
+            select(
+                table.c.id,
+                table.c.pass_id,
+                table.c.purchased_at,
+                table.c.price,
+                literal(archived).label("archived"),
+            )
+            .where(table.c.user_id == user_id)
+        )
+        if before_id is not None:
+            query = query.where(table.c.id < before_id)
+        return query
+
+    tiers = [tier(purchase_logs, False)]
+    if include_archived:
+        tiers.append(tier(purchase_logs_archive, True))
+    combined = union_all(*tiers).subquery()
+    records = await db.fetch_all(select(combined).order_by(combined.c.id.desc()).limit(limit))
+    return [dict(record) for record in records]
+
+
+async def ended_passes(db, user_id: int, before_id: Optional[int], limit: int) -> List[dict]:
+    """
+    만료/소진되어 보관 테이블로 옮긴 보유 이용권 (최근 것부터).
+    """
+    query = user_passes_archive.select().where(user_passes_archive.c.user_id == user_id)
+    if before_id is not None:
+        query = query.where(user_passes_archive.c.id < before_id)
+    records = await db.fetch_all(query.order_by(user_passes_archive.c.id.desc()).limit(limit))
+    return [dict(record) for record in records]
+
+
+# 앱 전체에서 공유하는 보관 작업
+archiver = Archiver()
@@ -0,0 +1,57 @@
+"""
+인증 의존성(get_current_user) 요청당 오버헤드 측정.
+
+    cd backend
+    python -m bench.auth_overhead --iterations 20000
+
+매번 JWT 를 디코드/검증하는 기존 방식과 토큰 캐시를 거치는 방식을 비교함.
+DB 연결 없이 실행되도록 폐기 토큰 목록은 방금 확인한 것으로 간주함.
+"""
+import argparse
+import asyncio
+import os
+import time
+from datetime import timedelta
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from routes.protected import decode_token, get_current_user, token_cache, revoked
+from routes.user import create_access_token
+
+
+async def full_decode(token: str) -> int:
+    # 캐시 도입 전 방식: 요청마다 서명 검증 + 디코드
+    payload = decode_token(token)
+    return int(payload["sub"])
+
+
+async def measure(func, token: str, iterations: int) -> float:
+    await func(token)  # 워밍업
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await func(token)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+async def main(iterations: int):
+    token = create_access_token(data={"sub": "1"}, expires_delta=timedelta(minutes=60))
+
+    # DB 없이 측정하기 위해 폐기 목록은 방금 새로 읽은 것으로 둠
+    revoked._checked_at = time.monotonic()
+    revoked.check_interval = float("inf")
+    token_cache.clear()
+
+    before = await measure(full_decode, token, iterations)
+    after = await measure(get_current_user, token, iterations)
+
+    print(f"iterations          : {iterations}")
+    print(f"jwt decode per call : {before:8.2f} us")
+    print(f"cached per call     : {after:8.2f} us")
+    print(f"speedup             : {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
@@ -0,0 +1,124 @@
+"""
+목록 응답 직렬화 비교: 행마다 Pydantic 모델 + response_model (이전) vs dict 를 바로 FastJSONResponse (지금).
+
+    cd backend
+    python -m bench.encoding --rows 50 500 5000
+
+/status, /user/passes 와 같은 모양의 행을 메모리에 만들어 두고, 같은 데이터를 두 방식으로 돌려주는
+엔드포인트를 httpx ASGI 전송으로 호출해 요청당 시간을 잼. DB 조회는 빼고 응답을 만드는 비용만 비교함.
+두 방식의 응답 본문이 같은 JSON 인지도 확인함.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+# 연결하지 않으므로 .env 가 없어도 import 되도록 주소만 채움
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+import httpx
+import pytz
+from fastapi import FastAPI
+from fast_json import FastJSONResponse, orjson
+from routes.seat import SeatStatusResponse
+from routes.passes import UserPassResponse
+
+KST = pytz.timezone("Asia/Seoul")
+
+
+def seat_rows(count: int) -> List[dict]:
+    return [
+        {
+            "seat_name": f"S{index:04d}",
+            "is_occupied": index % 3 != 0,
+            "occupant_user_pass_id": index if index % 3 != 0 else None,
+            "occupant_remaining_time": (index * 7) % 240 if index % 3 != 0 else None,
+            "is_paused": index % 17 == 0,
+        }
+        for index in range(count)
+    ]
+
+
+def user_pass_rows(count: int) -> List[dict]:
+    now = KST.localize(datetime(2026, 1, 1, 9, 0))
+    return [
+        {
+            "user_pass_id": index,
+            "pass_id": index % 5 + 1,
+            "name": "2시간권" if index % 2 else "1일권",
+            "pass_type": "time_period" if index % 2 else "day",
+            "remaining_time": 120 if index % 2 else None,
+            "remaining_seconds": 7200 if index % 2 else None,
+            "expire_at": None if index % 2 else now + timedelta(days=1, seconds=index),
+            "is_active": False,
+            "is_paused": False,
+            "seat_id": None,
+            "branch_id": 1,
+        }
+        for index in range(count)
+    ]
+
+
+def build_app(seats: List[dict], user_passes: List[dict]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/old/status", response_model=List[SeatStatusResponse])
+    async def old_status():
+        return [SeatStatusResponse(**row) for row in seats]
+
+    @app.get("/new/status", response_model=List[SeatStatusResponse])
+    async def new_status():
+        return FastJSONResponse(seats)
+
+    @app.get("/old/user_passes", response_model=List[UserPassResponse])
+    async def old_user_passes():
+        return [UserPassResponse(**row) for row in user_passes]
+
+    @app.get("/new/user_passes", response_model=List[UserPassResponse])
+    async def new_user_passes():
+        return FastJSONResponse(user_passes)
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, url: str, iterations: int) -> float:
+    await client.get(url)  # 워밍업
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await client.get(url)
+    return (time.perf_counter() - started) / iterations * 1000
+
+
+async def run(args):
+    print(f"encoder: {'orjson' if orjson is not None else 'json (orjson 없음)'}")
+    print(f"{'endpoint':<12} {'rows':>6} {'old ms':>9} {'new ms':>9} {'speedup':>8} {'bytes':>9}")
+    for rows in args.rows:
+        app = build_app(seat_rows(rows), user_pass_rows(rows))
+        iterations = max(args.min_iterations, args.budget // rows)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in ("status", "user_passes"):
+                old_body = (await client.get(f"/old/{name}")).content
+                new_body = (await client.get(f"/new/{name}")).content
+                if json.loads(old_body) != json.loads(new_body):
+                    raise SystemExit(f"{name}: 두 응답의 JSON 이 다릅니다")
+
+                old_ms = await measure(client, f"/old/{name}", iterations)
+                new_ms = await measure(client, f"/new/{name}", iterations)
+                print(f"{name:<12} {rows:>6} {old_ms:>9.3f} {new_ms:>9.3f} {old_ms / new_ms:>7.1f}x {len(new_body):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--budget", type=int, default=200000, help="크기별 호출 수 = budget / rows")
+    parser.add_argument("--min-iterations", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
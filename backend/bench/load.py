@@ -0,0 +1,269 @@
+"""
+스터디카페 API 부하/지연 시간 벤치마크.
+
+    cd backend
+    python -m bench.load                                  # 임시 SQLite 파일
+    python -m bench.load --url postgresql://user:pw@localhost/cafe_bench
+    python -m bench.load --out bench/baseline.json        # 기준 결과 저장
+    python -m bench.load --baseline bench/baseline.json   # 기준 대비 p95 회귀 검사
+
+main.app 을 프로세스 안에서(httpx ASGI 전송) 띄우고 사용자/이용권/좌석을 채운 뒤,
+/login, /purchase, /seat, /leave, /status, /user/passes 를 섞어서 동시에 호출함.
+엔드포인트별 p50/p95/p99 지연 시간, 처리량, 요청당 DB 쿼리 수를 출력하고 JSON 으로 저장함.
+PostgreSQL 로 돌릴 때는 비어 있는 벤치마크 전용 DB 를 지정할 것 (데이터를 채움).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+DEFAULT_MIX = "status=40,user_passes=20,login=10,purchase=10,seat=10,leave=10"
+
+# Server-Timing 헤더의 db 항목 (metrics.server_timing 참고)
+DB_TIMING = re.compile(r'db;dur=[0-9.]+;desc="(\d+) queries"')
+
+
+def query_count(response) -> int:
+    """
+    응답의 Server-Timing 헤더에서 그 요청이 실행한 DB 쿼리 수를 읽음.
+    """
+    match = DB_TIMING.search(response.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else 0
+
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, weight = part.split("=")
+        weights[name.strip()] = int(weight)
+    return weights
+
+
+async def seed(database, users: int, seats: int):
+    from models import passes, seats as seats_table, users as users_table
+
+    await database.execute_many(passes.insert(), [
+        {"id": 1, "name": "2시간권", "pass_type": "time_period", "duration": 120, "price": 3000},
+        {"id": 2, "name": "4시간권", "pass_type": "time", "duration": 240, "price": 5000},
+        {"id": 3, "name": "1일권", "pass_type": "day", "duration": 1, "price": 9000},
+    ])
+    await database.execute_many(users_table.insert(), [
+        {"phone_number": f"010{i:08d}", "name": f"user{i}", "age": 20} for i in range(users)
+    ])
+    await database.execute_many(seats_table.insert(), [
+        {"id": f"S{i:04d}", "is_occupied": False} for i in range(seats)
+    ])
+
+
+class VirtualUser:
+    def __init__(self, index: int):
+        self.phone_number = f"010{index:08d}"
+        self.headers = None
+        self.pass_ids = []
+        self.seat_id = None
+
+
+async def run(args) -> dict:
+    os.environ["DATABASE_URL"] = args.url
+    os.environ.setdefault("SECRET_KEY", "bench-secret")
+    # 가상 사용자가 모두 같은 클라이언트 주소에서 호출하므로 횟수 제한은 끔
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    import httpx
+    from main import app
+    from database import database
+    from pass_catalog import pass_catalog
+    from seat_state import seat_maps
+
+    rng = random.Random(args.seed)
+    weights = parse_mix(args.mix)
+    names, cumulative = list(weights), list(weights.values())
+
+    latencies = defaultdict(list)
+    queries = defaultdict(int)
+    errors = defaultdict(int)
+    free_seats = [f"S{i:04d}" for i in range(args.seats)]
+    rng.shuffle(free_seats)
+
+    async with app.router.lifespan_context(app):
+        await seed(database, args.users, args.seats)
+        await pass_catalog.load()
+        seat_maps.invalidate_all()
+
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            async def call(name: str, method: str, url: str, **kwargs):
+                start = time.perf_counter()
+                response = await client.request(method, url, **kwargs)
+                latencies[name].append((time.perf_counter() - start) * 1000)
+                queries[name] += query_count(response)
+                if response.status_code >= 400:
+                    errors[name] += 1
+                return response
+
+            async def login(user: VirtualUser):
+                response = await call("login", "POST", "/login", json={"phone_number": user.phone_number})
+                if response.status_code == 200:
+                    user.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            async def step(user: VirtualUser, name: str):
+                if user.headers is None or name == "login":
+                    await login(user)
+                elif name == "status":
+                    await call("status", "GET", "/status", headers=user.headers)
+                elif name == "user_passes":
+                    await call("user_passes", "GET", "/user/passes", headers=user.headers)
+                elif name == "purchase":
+                    response = await call(
+                        "purchase", "POST", "/purchase",
+                        json={"pass_id": rng.randint(1, 3)}, headers=user.headers,
+                    )
+                    if response.status_code == 200:
+                        user.pass_ids.append(response.json()["user_pass_id"])
+                elif name == "seat":
+                    if user.seat_id or not user.pass_ids or not free_seats:
+                        return
+                    seat_id = free_seats.pop()
+                    response = await call(
+                        "seat", "POST", "/seat",
+                        json={"seat_id": seat_id, "user_pass_id": user.pass_ids[-1]}, headers=user.headers,
+                    )
+                    if response.status_code == 200:
+                        user.seat_id = seat_id
+                    else:
+                        free_seats.insert(0, seat_id)
+                elif name == "leave":
+                    if not user.seat_id:
+                        return
+                    await call("leave", "POST", "/leave", json={"seat_id": user.seat_id}, headers=user.headers)
+                    free_seats.insert(0, user.seat_id)
+                    user.seat_id = None
+
+            users = [VirtualUser(i) for i in range(args.users)]
+            remaining = [args.requests]
+
+            async def worker(worker_id: int):
+                own = users[worker_id::args.concurrency] or users
+                while remaining[0] > 0:
+                    remaining[0] -= 1
+                    user = rng.choice(own)
+                    await step(user, rng.choices(names, weights=cumulative)[0])
+
+            started = time.perf_counter()
+            await asyncio.gather(*[worker(i) for i in range(args.concurrency)])
+            duration = time.perf_counter() - started
+
+    endpoints = {}
+    for name, values in sorted(latencies.items()):
+        values.sort()
+        endpoints[name] = {
+            "count": len(values),
+            "errors": errors[name],
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+            "mean_ms": round(sum(values) / len(values), 3),
+            "queries_per_request": round(queries[name] / len(values), 2),
+        }
+
+    total = sum(len(values) for values in latencies.values())
+    return {
+        "config": {
+            "database": args.url.split(":", 1)[0],
+            "users": args.users,
+            "seats": args.seats,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "mix": args.mix,
+            "seed": args.seed,
+        },
+        "total": {
+            "requests": total,
+            "duration_s": round(duration, 3),
+            "throughput_rps": round(total / duration, 1) if duration else 0,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def print_report(result: dict):
+    total = result["total"]
+    print(f"{total['requests']} requests in {total['duration_s']}s ({total['throughput_rps']} req/s)")
+    print(f"{'endpoint':12} {'count':>6} {'err':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'q/req':>6}")
+    for name, stats in result["endpoints"].items():
+        print(
+            f"{name:12} {stats['count']:6} {stats['errors']:5} "
+            f"{stats['p50_ms']:8.2f} {stats['p95_ms']:8.2f} {stats['p99_ms']:8.2f} "
+            f"{stats['queries_per_request']:6.2f}"
+        )
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """
+    기준 결과보다 p95 가 tolerance 비율 이상 느려졌거나 요청당 쿼리 수가 늘어난 엔드포인트 목록.
+    """
+    regressions = []
+    for name, stats in result["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(name)
+        if not base:
+            continue
+        if stats["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {stats['p95_ms']}ms")
+        if stats["queries_per_request"] > base["queries_per_request"] + 0.5:
+            regressions.append(
+                f"{name}: queries/request {base['queries_per_request']} -> {stats['queries_per_request']}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="DB 주소 (기본: 임시 SQLite 파일)")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--seats", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"요청 비율 (기본: {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용하는 p95 증가 비율 (기본 0.2)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.url:
+            args.url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        result = asyncio.run(run(args))
+
+    print_report(result)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
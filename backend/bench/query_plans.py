@@ -0,0 +1,48 @@
+"""
+자주 실행되는 쿼리가 인덱스를 타는지 실행 계획으로 확인.
+
+    cd backend
+    python -m bench.query_plans                                   # 임시 SQLite 파일
+    python -m bench.query_plans --url postgresql://user:pw@localhost/cafe
+
+마이그레이션(alembic upgrade head)을 적용한 DB에서 EXPLAIN 을 실행하고,
+대상 테이블을 풀 스캔하거나 기대한 인덱스를 쓰지 않는 쿼리가 하나라도 있으면 종료 코드 1로 끝남.
+쿼리 목록과 확인 방법은 hot_queries.py 에 있고, tests/test_query_plans.py 도 같은 것으로 확인함.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from sqlalchemy import create_engine
+from hot_queries import HOT_QUERIES, plan_problems, upgrade
+
+
+def main(url: str) -> int:
+    upgrade(url)
+    engine = create_engine(url)
+
+    failures = 0
+    with engine.connect() as connection:
+        for name, table, index, query in HOT_QUERIES:
+            problems = plan_problems(connection, table, index, query)
+
+            result = "NO INDEX" if problems else "index"
+            print(f"[{result:9}] {name}")
+            for detail in problems:
+                print(f"             {detail}")
+            failures += bool(problems)
+
+    print(f"{len(HOT_QUERIES) - failures}/{len(HOT_QUERIES)} queries use the expected index ({engine.dialect.name})")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="검사할 DB 주소 (기본: 임시 SQLite 파일)")
+    args = parser.parse_args()
+
+    if args.url:
+        sys.exit(main(args.url))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sys.exit(main(f"sqlite:///{os.path.join(tmp, 'plans.db')}"))
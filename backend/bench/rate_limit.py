@@ -0,0 +1,73 @@
+"""
+요청 횟수 제한(RateLimiter) 요청당 오버헤드와 키 수 측정.
+
+    cd backend
+    python -m bench.rate_limit --iterations 200000 --keys 500000
+
+같은 키로 허용/거절되는 경우, 매번 새 키인 경우(IP 를 바꿔 가며 두드리는 경우),
+그리고 라우트에 붙는 IP 기준 의존성 전체 호출을 µs 단위로 잼.
+"""
+import argparse
+import asyncio
+import time
+
+from starlette.requests import Request
+
+from rate_limit import RateLimiter, limit_by_ip
+
+
+def measure(func, iterations: int) -> float:
+    func(0)  # 워밍업
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(i)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+async def measure_async(func, iterations: int) -> float:
+    await func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await func()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main(iterations: int, keys: int):
+    # 1. 같은 키로 계속 허용 (제한이 사실상 없는 정책)
+    allowed = RateLimiter("bench_allowed", limit=10 ** 9, period=1)
+    allowed_us = measure(lambda i: allowed.hit("10.0.0.1"), iterations)
+
+    # 2. 같은 키로 계속 거절 (제한을 넘긴 뒤 두드리는 경우)
+    denied = RateLimiter("bench_denied", limit=1, period=3600)
+    denied.hit("10.0.0.1")
+    denied_us = measure(lambda i: denied.hit("10.0.0.1"), iterations)
+
+    # 3. 매번 새 키. 1초 동안 1번 정책이라 오래된 키는 곧 다 차서 지워짐
+    spread = RateLimiter("bench_spread", limit=1, period=1)
+    clock = [0.0]
+
+    def hit_new_key(i):
+        clock[0] += 0.0001  # 초당 만 개의 서로 다른 키
+        spread.hit(i, now=clock[0])
+
+    spread_us = measure(hit_new_key, keys)
+
+    # 4. 라우트 의존성 전체 (client_ip + enforce)
+    dependency = limit_by_ip(RateLimiter("bench_dependency", limit=10 ** 9, period=1))
+    request = Request({"type": "http", "client": ("10.0.0.1", 50000), "headers": []})
+    dependency_us = asyncio.run(measure_async(lambda: dependency(request), iterations))
+
+    print(f"iterations              : {iterations}")
+    print(f"allowed hit per call    : {allowed_us:8.2f} us")
+    print(f"denied hit per call     : {denied_us:8.2f} us")
+    print(f"new-key hit per call    : {spread_us:8.2f} us ({keys} keys)")
+    print(f"keys kept after spread  : {len(spread):8d} (about 1s worth of keys)")
+    print(f"ip dependency per call  : {dependency_us:8.2f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--keys", type=int, default=500000)
+    args = parser.parse_args()
+    main(args.iterations, args.keys)
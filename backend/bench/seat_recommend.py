@@ -0,0 +1,79 @@
+"""
+좌석 추천(seat_layout) 계산 시간 측정.
+
+    cd backend
+    python -m bench.seat_recommend --seats 500 --occupancy 0.7
+
+구역 4개에 격자로 배치한 좌석을 점유율만큼 무작위로 채운 뒤,
+빈 좌석 N개 추천과 K명 함께 앉기 추천의 호출당 시간을 잼. DB 없이 메모리 인덱스만 사용함.
+"""
+import argparse
+import os
+import random
+import time
+
+# 연결하지 않으므로 .env 가 없어도 import 되도록 주소만 채움
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from seat_layout import BranchLayout, recommend_group, recommend_seats
+
+FEATURES = ["outlet", "window", "quiet"]
+ZONES = ["open", "quiet", "window", "booth"]
+
+
+def build_layout(seat_count: int, row_length: int, rng: random.Random) -> BranchLayout:
+    records = []
+    per_zone = -(-seat_count // len(ZONES))
+    for index in range(seat_count):
+        zone = ZONES[index // per_zone]
+        position = index % per_zone
+        x, y = position % row_length, position // row_length
+        features = [feature for feature in FEATURES if rng.random() < 0.3]
+        records.append({
+            "id": f"S{index:04d}",
+            "zone": zone,
+            "pos_x": x,
+            "pos_y": y,
+            "features": ",".join(features),
+        })
+    return BranchLayout(records)
+
+
+def measure(func, iterations: int) -> float:
+    func()  # 워밍업
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seats", type=int, default=500)
+    parser.add_argument("--row-length", type=int, default=10)
+    parser.add_argument("--occupancy", type=float, default=0.7)
+    parser.add_argument("--count", type=int, default=5)
+    parser.add_argument("--group-size", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    layout = build_layout(args.seats, args.row_length, rng)
+    build_us = (time.perf_counter() - started) * 1_000_000
+
+    occupied = {seat_id for seat_id in layout.seats if rng.random() < args.occupancy}
+    wanted = {"outlet", "window"}
+
+    single = measure(lambda: recommend_seats(layout, occupied, args.count, wanted), args.iterations)
+    group = measure(lambda: recommend_group(layout, occupied, args.group_size, wanted), args.iterations)
+
+    print(f"seats / occupied        : {args.seats} / {len(occupied)}")
+    print(f"layout index build      : {build_us:10.1f} us (배치 변경 시 1회)")
+    print(f"best {args.count} free seats      : {single:10.1f} us")
+    print(f"group of {args.group_size}              : {group:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional, Set
+from dotenv import load_dotenv
+from database import database
+from models import branches
+
+load_dotenv()
+
+# 지점을 지정하지 않은 기존 API(/status, /passes 등)가 가리키는 지점 (마이그레이션 0005 의 본점)
+DEFAULT_BRANCH_ID = 1
+# 없는 지점 id 로 요청이 와도 지점 목록은 이 간격(초)에 한 번까지만 다시 읽음
+BRANCH_MISS_RELOAD_SECONDS = 5
+
+
+def parse_owned_branches(value: str) -> Optional[Set[int]]:
+    ids = {int(branch_id) for branch_id in value.split(",") if branch_id.strip()}
+    return ids or None
+
+
+# 이 워커가 맡는 지점 id 목록, 예: OWNED_BRANCHES=1,3 (비워 두면 모든 지점)
+# 프록시가 /branches/{id}/ 경로를 지점 담당 워커로 보내고, 만료 정리도 맡은 지점만 함
+OWNED_BRANCH_IDS: Optional[Set[int]] = parse_owned_branches(os.getenv("OWNED_BRANCHES", ""))
+
+
+def owns_branch(branch_id: int) -> bool:
+    return OWNED_BRANCH_IDS is None or branch_id in OWNED_BRANCH_IDS
+
+
+class BranchDirectory:
+    """
+    지점 목록을 프로세스 메모리에 올려 두는 캐시. 지점별 요청마다 존재 확인 쿼리를 하지 않음.
+    목록에 없는 id 는 다른 워커가 방금 추가한 지점일 수 있어 다시 읽되, miss_reload_interval 에 한 번까지만
+    (없는 id 를 바꿔 가며 요청해도 요청마다 전체 목록을 읽지 않음).
+    """
+
+    def __init__(self, miss_reload_interval: float = BRANCH_MISS_RELOAD_SECONDS):
+        self.miss_reload_interval = miss_reload_interval
+        self._by_id: Dict[int, dict] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def load(self):
+        records = await database.fetch_all(branches.select().order_by(branches.c.id))
+        self._by_id = {record["id"]: dict(record) for record in records}
+        self._loaded_at = time.monotonic()
+
+    def _reload_due(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.miss_reload_interval
+
+    def all(self) -> List[dict]:
+        return list(self._by_id.values())
+
+    async def get(self, branch_id: int) -> Optional[dict]:
+        branch = self._by_id.get(branch_id)
+
+        # 다른 워커에서 방금 추가된 지점일 수 있으니 없을 때만, 마지막으로 읽은 지 간격이 지났으면 다시 읽음
+        if branch is None and self._reload_due():
+            async with self._lock:
+                if branch_id not in self._by_id and self._reload_due():
+                    await self.load()
+            branch = self._by_id.get(branch_id)
+
+        return branch
+
+
+# 앱 전체에서 공유하는 지점 목록 캐시
+branch_directory = BranchDirectory()
@@ -0,0 +1,477 @@
+"""
+회원/이용권/좌석/과거 구매 내역 대량 가져오기 CLI (새 지점 개설, 기존 POS 데이터 이전용).
+
+    cd backend
+    python -m bulk_import users members.csv
+    python -m bulk_import passes catalog.ndjson --branch-id 2
+    python -m bulk_import seats layout.csv --branch-id 2
+    python -m bulk_import purchases history.csv.gz --batch-size 2000
+    python -m bulk_import users members.csv --dry-run     # 검증만, DB에 쓰지 않음
+
+파일은 CSV(첫 줄이 헤더) 또는 NDJSON(한 줄에 JSON 객체 하나), .gz 압축도 읽음. 형식은 확장자로 정하고 --format 으로 바꿀 수 있음.
+파일을 끝까지 올리지 않고 --batch-size 행씩 읽어 검증하고, 묶음마다 한 트랜잭션에서 여러 행 INSERT 로 넣으므로
+백만 행 파일도 메모리 사용량이 묶음 크기만큼으로 일정함. 스키마는 미리 최신이어야 함 (alembic upgrade head 또는 앱 한 번 실행).
+
+컬럼 (* 는 필수):
+    users     : phone_number*, name*, age*, created_at
+    passes    : name*, pass_type*(time|time_period|day), duration*, price*, branch_id
+    seats     : seat_id*, zone, x, y, features(쉼표 구분 또는 목록), branch_id
+    purchases : phone_number* 또는 user_id*, pass_id* 또는 pass_name*, purchased_at*(실행 시각 이전), price, branch_id
+
+중복: 회원은 핸드폰 번호, 좌석은 좌석 id 로 파일 안과 DB 의 기존 행을 걸러 먼저 나온 것만 넣음 (다시 실행해도 안전).
+이용권과 구매 내역은 고유 키가 없어 다시 실행하면 또 들어가므로 한 번만 실행할 것.
+과거 구매 내역은 다음 집계 주기에 매출 집계에 반영되고 오래된 것은 보관 작업이 보관 테이블로 옮김.
+좌석 배치/이용권 목록은 실행 중인 앱의 캐시가 만료되면 (좌석 배치 최대 1분, 이용권은 다음 버전 확인 때) 반영됨.
+"""
+import argparse
+from abc import ABC, abstractmethod
+import asyncio
+import csv
+import gzip
+import io
+import json
+import sys
+import time
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.dialects.postgresql import asyncpg
+from database import database
+from models import users, passes, seats, purchase_logs, branches
+from branches import DEFAULT_BRANCH_ID
+from pass_catalog import bump_catalog_version
+from seat_state import to_kst
+import pytz
+KST = pytz.timezone("Asia/Seoul")
+
+DEFAULT_BATCH_SIZE = 1000
+# INSERT 한 문장의 최대 바인드 변수 수 (SQLite 32766, PostgreSQL 32767 보다 작게)
+MAX_BIND_PARAMS = 30000
+# 이 개수까지만 잘못된 행을 하나씩 출력하고 나머지는 개수만 셈
+MAX_REPORTED_ERRORS = 20
+# 진행 상황 출력 간격 (초)
+PROGRESS_INTERVAL_SECONDS = 5
+PASS_TYPES = ("time", "time_period", "day")
+
+
+# ----- 파일 읽기 -----
+
+def open_text(path: str):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8-sig", newline="")
+    return open(path, "r", encoding="utf-8-sig", newline="")
+
+
+def detect_format(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    return "ndjson" if name.endswith((".ndjson", ".jsonl", ".json")) else "csv"
+
+
+def read_records(file, file_format: str) -> Iterator[dict]:
+    """
+    파일에서 한 행씩 dict 로 읽음 (한꺼번에 읽지 않음). 읽을 수 없는 NDJSON 줄은 ValueError 를 담아 넘김.
+    """
+    if file_format == "csv":
+        yield from csv.DictReader(file)
+        return
+    for line in file:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield ValueError(f"JSON 형식 오류: {exc.msg}")
+            continue
+        yield record if isinstance(record, dict) else ValueError("JSON 객체가 아닙니다.")
+
+
+def chunks(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ----- 값 검증 -----
+
+def _blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def text_field(raw: dict, key: str, required: bool = True) -> Optional[str]:
+    value = raw.get(key)
+    if _blank(value):
+        if required:
+            raise ValueError(f"{key} 값이 없습니다.")
+        return None
+    return str(value).strip()
+
+
+def int_field(raw: dict, key: str, required: bool = True, minimum: Optional[int] = None) -> Optional[int]:
+    value = raw.get(key)
+    if _blank(value):
+        if required:
+            raise ValueError(f"{key} 값이 없습니다.")
+        return None
+    try:
+        number = int(str(value).strip())
+    except ValueError:
+        raise ValueError(f"{key} 값이 정수가 아닙니다: {value!r}")
+    if minimum is not None and number < minimum:
+        raise ValueError(f"{key} 값은 {minimum} 이상이어야 합니다: {number}")
+    return number
+
+
+def datetime_field(raw: dict, key: str, required: bool = True) -> Optional[datetime]:
+    """
+    ISO 형식 시각 (예: 2024-03-01 14:30:00, 2024-03-01T14:30:00+09:00). 시간대가 없으면 KST 로 봄.
+    """
+    value = raw.get(key)
+    if _blank(value):
+        if required:
+            raise ValueError(f"{key} 값이 없습니다.")
+        return None
+    try:
+        return to_kst(datetime.fromisoformat(str(value).strip()))
+    except ValueError:
+        raise ValueError(f"{key} 값이 시각 형식이 아닙니다: {value!r}")
+
+
+# ----- 가져오기 종류별 처리 -----
+
+class ImportStats:
+    def __init__(self):
+        self.read = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+
+    def error(self, number: int, message):
+        self.errors += 1
+        if self.errors <= MAX_REPORTED_ERRORS:
+            print(f"행 {number}: {message}", file=sys.stderr)
+        elif self.errors == MAX_REPORTED_ERRORS + 1:
+            print("잘못된 행이 더 있습니다 (이후는 개수만 셉니다).", file=sys.stderr)
+
+    def rows_per_second(self) -> float:
+        return self.read / max(time.perf_counter() - self.started, 1e-9)
+
+    def summary(self) -> str:
+        return (
+            f"읽음 {self.read}, 추가 {self.inserted}, 중복 {self.duplicates}, 오류 {self.errors}, "
+            f"{time.perf_counter() - self.started:.1f}초 ({self.rows_per_second():,.0f} 행/초)"
+        )
+
+
+class Importer(ABC):
+    """
+    가져오기 종류 하나. parse 는 DB 없이 한 행을 검증/변환하고 (ValueError 면 잘못된 행),
+    resolve 는 묶음 단위로 DB 와 비교해 넣을 행만 남김 (묶음 트랜잭션 안에서 호출).
+    """
+    table = None
+
+    def __init__(self, branch_id: int):
+        self.branch_id = branch_id
+        self.branch_ids = set()
+
+    async def load(self):
+        self.branch_ids = {record["id"] for record in await database.fetch_all(select(branches.c.id))}
+
+    def branch(self, raw: dict) -> int:
+        branch_id = int_field(raw, "branch_id", required=False)
+        branch_id = self.branch_id if branch_id is None else branch_id
+        if branch_id not in self.branch_ids:
+            raise ValueError(f"존재하지 않는 지점입니다: {branch_id}")
+        return branch_id
+
+    @abstractmethod
+    def parse(self, raw: dict) -> dict:
+        ...
+
+    async def resolve(self, rows: List[Tuple[int, dict]], stats: ImportStats) -> List[dict]:
+        return [row for _, row in rows]
+
+    async def finish(self):
+        pass
+
+
+def dedupe(rows: List[Tuple[int, dict]], key: str, existing: set, stats: ImportStats) -> List[dict]:
+    """
+    묶음 안에서 key 가 처음 나온 행만 남기고, DB에 이미 있는 key 도 뺌.
+    앞 묶음은 이미 커밋되어 existing 조회에 잡히므로 파일 전체 키를 메모리에 들고 있지 않아도 됨.
+    """
+    seen = set(existing)
+    kept = []
+    for _, row in rows:
+        if row[key] in seen:
+            stats.duplicates += 1
+            continue
+        seen.add(row[key])
+        kept.append(row)
+    return kept
+
+
+class UserImporter(Importer):
+    table = users
+
+    def __init__(self, branch_id: int):
+        super().__init__(branch_id)
+        self.now = datetime.now(KST)
+
+    def parse(self, raw: dict) -> dict:
+        return {
+            "phone_number": text_field(raw, "phone_number"),
+            "name": text_field(raw, "name"),
+            "age": int_field(raw, "age", minimum=0),
+            "created_at": datetime_field(raw, "created_at", required=False) or self.now,
+        }
+
+    async def resolve(self, rows, stats):
+        phone_numbers = list({row["phone_number"] for _, row in rows})
+        existing = {
+            record["phone_number"]
+            for record in await database.fetch_all(
+                select(users.c.phone_number).where(users.c.phone_number.in_(phone_numbers))
+            )
+        } if phone_numbers else set()
+        return dedupe(rows, "phone_number", existing, stats)
+
+
+class PassImporter(Importer):
+    table = passes
+
+    def parse(self, raw: dict) -> dict:
+        pass_type = text_field(raw, "pass_type")
+        if pass_type not in PASS_TYPES:
+            raise ValueError(f"알 수 없는 이용권 유형입니다: {pass_type}")
+        return {
+            "name": text_field(raw, "name"),
+            "pass_type": pass_type,
+            "duration": int_field(raw, "duration", minimum=1),
+            "price": int_field(raw, "price", minimum=0),
+            "branch_id": self.branch(raw),
+        }
+
+    async def finish(self):
+        # 실행 중인 워커들이 다음 버전 확인 때 이용권 목록을 다시 읽도록
+        await bump_catalog_version()
+
+
+class SeatImporter(Importer):
+    table = seats
+
+    def parse(self, raw: dict) -> dict:
+        features = raw.get("features")
+        if isinstance(features, list):
+            features = ",".join(str(feature) for feature in features)
+        features = sorted({feature.strip() for feature in (features or "").split(",") if feature.strip()})
+        return {
+            "id": text_field(raw, "seat_id"),
+            "is_occupied": False,
+            "branch_id": self.branch(raw),
+            "zone": text_field(raw, "zone", required=False),
+            "pos_x": int_field(raw, "x", required=False),
+            "pos_y": int_field(raw, "y", required=False),
+            "features": ",".join(features) or None,
+        }
+
+    async def resolve(self, rows, stats):
+        # 좌석 id 는 모든 지점에서 하나뿐. 이미 있는 좌석의 배치 수정은 관리자 API(PUT /seats/layout)로
+        seat_ids = list({row["id"] for _, row in rows})
+        existing = {
+            record["id"]
+            for record in await database.fetch_all(select(seats.c.id).where(seats.c.id.in_(seat_ids)))
+        } if seat_ids else set()
+        return dedupe(rows, "id", existing, stats)
+
+
+class PurchaseImporter(Importer):
+    table = purchase_logs
+
+    def __init__(self, branch_id: int):
+        super().__init__(branch_id)
+        self.now = datetime.now(KST)
+        self.passes_by_id: Dict[int, dict] = {}
+        self.pass_ids_by_name: Dict[Tuple[int, str], List[int]] = {}
+
+    async def load(self):
+        await super().load()
+        # 이용권 목록은 작으므로 한 번에 올려 두고 id 또는 (지점, 이름)으로 찾음
+        for record in await database.fetch_all(select(passes.c.id, passes.c.name, passes.c.price, passes.c.branch_id)):
+            self.passes_by_id[record["id"]] = dict(record)
+            self.pass_ids_by_name.setdefault((record["branch_id"], record["name"]), []).append(record["id"])
+
+    def find_pass(self, raw: dict) -> dict:
+        pass_id = int_field(raw, "pass_id", required=False)
+        if pass_id is None:
+            name = text_field(raw, "pass_name", required=False)
+            if name is None:
+                raise ValueError("pass_id 또는 pass_name 값이 없습니다.")
+            candidates = self.pass_ids_by_name.get((self.branch(raw), name), [])
+            if len(candidates) != 1:
+                raise ValueError(f"이용권 이름으로 하나를 찾을 수 없습니다: {name} ({len(candidates)}개)")
+            pass_id = candidates[0]
+        if pass_id not in self.passes_by_id:
+            raise ValueError(f"존재하지 않는 이용권입니다: {pass_id}")
+        return self.passes_by_id[pass_id]
+
+    def parse(self, raw: dict) -> dict:
+        selected_pass = self.find_pass(raw)
+        user_id = int_field(raw, "user_id", required=False)
+        phone_number = None if user_id is not None else text_field(raw, "phone_number")
+        price = int_field(raw, "price", required=False, minimum=0)
+        purchased_at = datetime_field(raw, "purchased_at")
+        # 매출 집계는 id 순서로 FOLD_LAG 전까지만 반영하므로 미래 시각 한 행이 그 뒤 집계와 보관을 모두 멈춤
+        if purchased_at > self.now:
+            raise ValueError(f"purchased_at 이 미래 시각입니다: {purchased_at.isoformat()}")
+        return {
+            "user_id": user_id,
+            "phone_number": phone_number,
+            "pass_id": selected_pass["id"],
+            "purchased_at": purchased_at,
+            "price": selected_pass["price"] if price is None else price,  # 가격이 없으면 지금 가격
+        }
+
+    async def resolve(self, rows, stats):
+        # 핸드폰 번호/회원 id 를 묶음 단위로 한 번에 확인
+        phone_numbers = list({row["phone_number"] for _, row in rows if row["phone_number"] is not None})
+        user_ids = list({row["user_id"] for _, row in rows if row["user_id"] is not None})
+        known = {}
+        if phone_numbers or user_ids:
+            records = await database.fetch_all(
+                select(users.c.id, users.c.phone_number)
+                .where(users.c.phone_number.in_(phone_numbers) | users.c.id.in_(user_ids))
+            )
+            for record in records:
+                known[("phone", record["phone_number"])] = record["id"]
+                known[("id", record["id"])] = record["id"]
+
+        kept = []
+        for number, row in rows:
+            lookup = ("id", row["user_id"]) if row["user_id"] is not None else ("phone", row["phone_number"])
+            if lookup not in known:
+                stats.error(number, f"등록되지 않은 회원입니다: {lookup[1]}")
+                continue
+            kept.append({
+                "user_id": known[lookup],
+                "pass_id": row["pass_id"],
+                "purchased_at": row["purchased_at"],
+                "price": row["price"],
+            })
+        return kept
+
+
+IMPORTERS = {
+    "users": UserImporter,
+    "passes": PassImporter,
+    "seats": SeatImporter,
+    "purchases": PurchaseImporter,
+}
+
+
+# ----- 실행 -----
+
+def driver_dialect():
+    """
+    드라이버 executemany 에 바로 넘길 SQL 을 만들 SQLAlchemy dialect (aiosqlite: ?, asyncpg: $1). 그 밖의 드라이버는 None.
+    """
+    if database.url.dialect == "sqlite" and database.url.driver in ("", "aiosqlite"):
+        return sqlite.dialect()
+    if database.url.dialect == "postgresql" and database.url.driver in ("", "asyncpg"):
+        return asyncpg.dialect()
+    return None
+
+
+async def insert_rows(table, rows: List[dict]):
+    """
+    한 묶음을 드라이버의 executemany 로 넣음. databases 의 execute_many 는 행마다 쿼리를 따로 컴파일/실행하고,
+    여러 행 INSERT (VALUES (...), (...)) 는 SQLAlchemy 컴파일이 묶음마다 100ms 가까이 걸려서
+    한 행짜리 INSERT 를 한 번만 컴파일해 값(타입 변환 적용)만 바꿔 보냄. 모든 행이 같은 컬럼을 가져야 함.
+    """
+    if not rows:
+        return
+    dialect = driver_dialect()
+    if dialect is None:
+        # 드라이버를 모르면 여러 행 INSERT 로, 바인드 변수 한도를 넘지 않게 나눠 보냄
+        per_statement = max(1, MAX_BIND_PARAMS // len(rows[0]))
+        for start in range(0, len(rows), per_statement):
+            await database.execute(table.insert().values(rows[start:start + per_statement]))
+        return
+
+    compiled = table.insert().inline().compile(dialect=dialect, column_keys=list(rows[0]))
+    keys = compiled.positiontup
+    processors = [compiled.binds[key].type.dialect_impl(dialect).bind_processor(dialect) for key in keys]
+    values = [
+        tuple(process(row[key]) if process else row[key] for key, process in zip(keys, processors))
+        for row in rows
+    ]
+    # 지금 트랜잭션이 잡고 있는 연결을 그대로 씀
+    async with database.connection() as connection:
+        await connection.raw_connection.executemany(str(compiled), values)
+
+
+async def run_import(importer: Importer, records: Iterable, batch_size: int, dry_run: bool = False) -> ImportStats:
+    stats = ImportStats()
+    await importer.load()
+    last_progress = time.perf_counter()
+
+    for chunk in chunks(enumerate(records, 1), batch_size):
+        parsed = []
+        for number, raw in chunk:
+            stats.read += 1
+            try:
+                if isinstance(raw, ValueError):
+                    raise raw
+                parsed.append((number, importer.parse(raw)))
+            except ValueError as exc:
+                stats.error(number, exc)
+
+        # 묶음마다 한 트랜잭션. 도중에 실패해도 앞 묶음은 남으므로 고쳐서 다시 실행하면 됨 (회원/좌석은 이미 들어간 행을 건너뜀)
+        async with database.transaction(force_rollback=dry_run):
+            rows = await importer.resolve(parsed, stats)
+            if not dry_run:
+                await insert_rows(importer.table, rows)
+        stats.inserted += len(rows)
+
+        if time.perf_counter() - last_progress >= PROGRESS_INTERVAL_SECONDS:
+            print(f"... {stats.summary()}", file=sys.stderr)
+            last_progress = time.perf_counter()
+
+    if not dry_run and stats.inserted:
+        await importer.finish()
+    return stats
+
+
+async def main(args) -> int:
+    importer = IMPORTERS[args.kind](args.branch_id)
+    file_format = args.format or detect_format(args.path)
+
+    await database.connect()
+    try:
+        with open_text(args.path) as file:
+            stats = await run_import(importer, read_records(file, file_format), args.batch_size, args.dry_run)
+    finally:
+        await database.disconnect()
+
+    print(("[검증만] " if args.dry_run else "") + f"{args.kind}: {stats.summary()}")
+    return 1 if stats.errors else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("kind", choices=sorted(IMPORTERS))
+    parser.add_argument("path", help="가져올 파일 (- 이면 표준 입력)")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="기본은 확장자로 판단")
+    parser.add_argument("--branch-id", type=int, default=DEFAULT_BRANCH_ID, help="branch_id 컬럼이 없는 행의 지점")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="한 트랜잭션에서 처리하는 행 수")
+    parser.add_argument("--dry-run", action="store_true", help="검증과 중복 확인만 하고 넣지 않음")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,252 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import func, select
+from database import database
+from models import change_log, change_feed_state
+from pass_catalog import pass_catalog
+from seat_state import live_remaining_seconds, to_kst
+from fast_json import dumps
+import pytz
+KST = pytz.timezone("Asia/Seoul")
+
+logger = logging.getLogger(__name__)
+
+# 이보다 오래된 변경 기록은 지움. 그보다 오래 꺼져 있던 클라이언트는 전체를 다시 읽음
+CHANGE_RETENTION = timedelta(days=1)
+PRUNE_SECONDS = 3600
+# 한 번에 돌려주는 변경 기록 수 (넘으면 has_more, 이어서 다시 요청)
+CHANGES_PAGE_SIZE = 500
+# 롱폴링 중 다른 워커의 변경을 확인하는 간격 (같은 워커의 변경은 바로 깨어남)
+CHANGES_POLL_SECONDS = 3
+
+
+def seat_change(status: dict) -> dict:
+    """
+    좌석 변경 (status 는 /status 응답 항목 모양).
+    """
+    return {"entity": "seat", "entity_id": status["seat_name"], "user_id": None, "data": status}
+
+
+def user_pass_change(user_id: int, user_pass_id: int, data: Optional[dict] = None) -> dict:
+    """
+    보유 이용권 변경 (data 는 /user/passes 응답 항목 모양, None 이면 삭제).
+    """
+    return {"entity": "user_pass", "entity_id": str(user_pass_id), "user_id": user_id, "data": data}
+
+
+def user_pass_payload(user_pass, selected_pass, now: datetime) -> dict:
+    """
+    UserPassResponse 모양의 dict (/user/passes 응답, 변경 피드). 행마다 모델을 만들지 않고 바로 직렬화.
+    """
+    remaining_seconds = live_remaining_seconds(user_pass["remaining_seconds"], user_pass["metered_at"], now)
+    return {
+        "user_pass_id": user_pass["id"],
+        "pass_id": user_pass["pass_id"],
+        "name": selected_pass["name"],
+        "pass_type": selected_pass["pass_type"],
+        "remaining_time": remaining_seconds // 60 if remaining_seconds is not None else None,
+        "remaining_seconds": remaining_seconds,
+        "expire_at": to_kst(user_pass["expire_at"]),
+        "is_active": bool(user_pass["is_active"]),
+        "is_paused": user_pass["paused_at"] is not None,
+        "seat_id": user_pass["seat_id"],
+        "branch_id": user_pass["branch_id"],
+    }
+
+
+async def user_pass_changed(user_pass, now: datetime) -> dict:
+    """
+    보유 이용권 변경 기록 (이용권 정보는 메모리 캐시에서).
+    """
+    selected_pass = await pass_catalog.get_pass(user_pass["pass_id"])
+    return user_pass_change(user_pass["user_id"], user_pass["id"], user_pass_payload(user_pass, selected_pass, now))
+
+
+async def _lock_branch(branch_id: int):
+    """
+    지점별 상태 행(change_feed_state)의 version 을 올려 행 잠금을 잡음. 같은 지점의 변경 기록 트랜잭션은
+    커밋될 때까지 차례로 처리되므로 id 가 커밋 순서대로 매겨져, 커서보다 작은 id 가 나중에 커밋되어 빠지는 일이 없음.
+    """
+    updated = await database.fetch_one(
+        change_feed_state.update()
+        .where(change_feed_state.c.branch_id == branch_id)
+        .values(version=change_feed_state.c.version + 1)
+        .returning(change_feed_state.c.version)
+    )
+    if not updated:
+        await database.execute(change_feed_state.insert().values(branch_id=branch_id, version=1, pruned_id=0))
+
+
+async def record_changes(branch_id: int, changes: List[dict], now: datetime):
+    """
+    변경 기록 저장. 상태를 바꾼 트랜잭션 안에서 마지막에 호출해 변경과 기록이 함께 커밋되게 함.
+    커밋한 뒤에는 change_feed.notify(branch_id) 로 롱폴링 중인 요청을 깨움.
+    """
+    if not changes:
+        return
+    await _lock_branch(branch_id)
+    await database.execute_many(change_log.insert(), [
+        {
+            "branch_id": branch_id,
+            "entity": change["entity"],
+            "entity_id": change["entity_id"],
+            "user_id": change["user_id"],
+            "data": dumps(change["data"]).decode("utf-8") if change["data"] is not None else None,
+            "created_at": now,
+        }
+        for change in changes
+    ])
+
+
+class ChangeFeed:
+    """
+    지점별 변경 기록을 커서(change_log.id) 이후만 읽어 주는 증분 동기화.
+    같은 항목이 여러 번 바뀌었으면 마지막 상태 하나로 줄여서 보냄.
+    롱폴링은 같은 워커의 커밋이면 바로 깨어나고, 다른 워커의 변경은 CHANGES_POLL_SECONDS 마다 확인함.
+    """
+
+    def __init__(
+        self,
+        page_size: int = CHANGES_PAGE_SIZE,
+        poll_interval: float = CHANGES_POLL_SECONDS,
+        retention: timedelta = CHANGE_RETENTION,
+    ):
+        self.page_size = page_size
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._events: Dict[int, asyncio.Event] = {}
+
+    def notify(self, branch_id: int):
+        event = self._events.pop(branch_id, None)
+        if event is not None:
+            event.set()
+
+    async def _wait(self, branch_id: int, timeout: float):
+        event = self._events.get(branch_id)
+        if event is None:
+            event = self._events[branch_id] = asyncio.Event()
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _bounds(self, branch_id: int):
+        """
+        (지점의 지운 기록 마지막 id, 가장 최근 id). 상태 행이 없는 지점은 기록한 적이 없어 지운 것도 없음.
+        """
+        pruned_id = await database.fetch_val(
+            select(change_feed_state.c.pruned_id).where(change_feed_state.c.branch_id == branch_id)
+        ) or 0
+        latest = await database.fetch_val(select(func.max(change_log.c.id)))
+        # 기록을 모두 지웠어도 커서는 지운 마지막 id 아래로 내려가지 않음
+        return pruned_id, max(latest or 0, pruned_id)
+
+    async def _reset(self, branch_id: int) -> dict:
+        # 클라이언트는 이 커서를 받은 뒤 전체를 읽고 이 커서부터 이어 받음 (그 사이 변경은 다시 와도 덮어쓰기)
+        _, latest_id = await self._bounds(branch_id)
+        return {"cursor": latest_id, "reset": True, "has_more": False, "changes": []}
+
+    async def read(self, branch_id: int, user_id: int, since: Optional[int]) -> dict:
+        """
+        since 이후 변경을 한 페이지 읽음. 좌석은 지점 전체, 보유 이용권은 user_id 것만.
+        커서가 없거나 이미 지운 기록 이전이면 reset 으로 전체를 다시 읽으라고 알림.
+        """
+        if since is None:
+            return await self._reset(branch_id)
+
+        records = await database.fetch_all(
+            select(change_log.c.id, change_log.c.entity, change_log.c.entity_id, change_log.c.user_id, change_log.c.data)
+            .where(change_log.c.branch_id == branch_id)
+            .where(change_log.c.id > since)
+            .order_by(change_log.c.id)
+            .limit(self.page_size)
+        )
+
+        # 기록을 읽은 뒤에 정리 표시를 확인해야, 읽는 사이 정리가 끝나 빠진 기록이 있어도 reset 으로 걸러짐
+        pruned_id, latest_id = await self._bounds(branch_id)
+        if since < pruned_id or since > latest_id:
+            return await self._reset(branch_id)
+
+        # 항목별 마지막 변경만 남김 (dict 는 넣은 순서를 유지하므로 다시 넣어 마지막 변경 순서로 정렬)
+        latest: Dict[tuple, dict] = {}
+        for record in records:
+            if record["entity"] == "user_pass" and record["user_id"] != user_id:
+                continue
+            key = (record["entity"], record["entity_id"])
+            latest.pop(key, None)
+            latest[key] = record
+
+        changes = [
+            {
+                "entity": record["entity"],
+                "id": record["entity_id"],
+                "deleted": record["data"] is None,
+                "data": json.loads(record["data"]) if record["data"] is not None else None,
+            }
+            for record in latest.values()
+        ]
+        return {
+            # 남의 이용권 기록만 있었어도 커서는 읽은 데까지 넘김
+            "cursor": records[-1]["id"] if records else since,
+            "reset": False,
+            "has_more": len(records) == self.page_size,
+            "changes": changes,
+        }
+
+    async def poll(self, branch_id: int, user_id: int, since: Optional[int], wait: float) -> dict:
+        """
+        변경이 생기거나 wait 초가 지날 때까지 기다렸다가 read() 결과를 반환 (롱폴링).
+        """
+        deadline = time.monotonic() + wait
+        while True:
+            result = await self.read(branch_id, user_id, since)
+            remaining = deadline - time.monotonic()
+            if result["changes"] or result["reset"] or result["has_more"] or remaining <= 0:
+                return result
+            since = result["cursor"]
+            await self._wait(branch_id, min(remaining, self.poll_interval))
+
+    async def prune(self, now: Optional[datetime] = None) -> int:
+        """
+        보관 기간이 지난 기록을 지우고 지운 마지막 id 를 남김 (그 이전 커서는 reset).
+        """
+        now = now or datetime.now(KST)
+        last_id = await database.fetch_val(
+            select(func.max(change_log.c.id)).where(change_log.c.created_at < now - self.retention)
+        )
+        if last_id is None:
+            return 0
+
+        async with database.transaction():
+            deleted = await database.fetch_all(
+                change_log.delete().where(change_log.c.id <= last_id).returning(change_log.c.id)
+            )
+            # 기록이 있던 지점은 모두 상태 행이 있으므로 전체 행에 지운 마지막 id 를 남김
+            await database.execute(
+                change_feed_state.update()
+                .where(change_feed_state.c.pruned_id < last_id)
+                .values(pruned_id=last_id)
+            )
+
+        if deleted:
+            logger.info("변경 기록 %d건 정리", len(deleted))
+        return len(deleted)
+
+    async def run(self):
+        """
+        lifespan 에서 백그라운드 태스크로 실행하는 기록 정리 루프.
+        """
+        while True:
+            try:
+                await self.prune()
+            except Exception:
+                logger.exception("변경 기록 정리 실패")
+            await asyncio.sleep(PRUNE_SECONDS)
+
+
+# 앱 전체에서 공유하는 변경 피드
+change_feed = ChangeFeed()
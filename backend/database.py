@@ -1,9 +1,183 @@
 from databases import Database
 from dotenv import load_dotenv
+from metrics import BACKGROUND_ROUTE, current_stats, metrics
+from typing import Dict, List, Optional
+import logging
 import os
+import time
 
 load_dotenv() #.env 파일 읽기
-DATABASE_URL = os.getenv("DATABASE_URL")  # 개발용 SQLite DB 파일 경로, 나중에 PostgreSQL 등으로 바꿀 수 있음
+DATABASE_URL = os.getenv("DATABASE_URL")  # 운영은 PostgreSQL (postgresql://...), 개발은 SQLite 파일
+# 읽기 전용 복제 DB (없으면 주 DB에서 읽음). 좌석 현황, 이용권 목록, 보유 이용권 조회에 씀
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL")
+# 복제 지연: 쓰기 직후 이 시간(초) 동안은 그 데이터를 주 DB에서 읽음
+REPLICA_LAG_SECONDS = float(os.getenv("REPLICA_LAG_SECONDS", "2"))
+# 이 시간(ms)을 넘긴 쿼리는 SQL 과 route 를 로그로 남김
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+
+# 연결 풀 설정 (PostgreSQL/asyncpg)
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+# 연결별 prepared statement 캐시 크기. pgbouncer transaction 모드 뒤에서는 0 으로 꺼야 함
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+DB_COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", "10"))        # 쿼리 하나 최대 시간 (초)
+DB_CONNECT_TIMEOUT = float(os.getenv("DB_CONNECT_TIMEOUT", "5"))         # 연결 맺기 최대 시간 (초)
+DB_POOL_IDLE_LIFETIME = float(os.getenv("DB_POOL_IDLE_LIFETIME", "300"))  # 이 시간 이상 놀고 있는 연결은 닫음 (초)
+
+
+def pool_options(url: str) -> dict:
+    """
+    DB 종류별 연결 옵션. databases 가 PostgreSQL 은 asyncpg.create_pool 에, SQLite 는 sqlite3.connect 에 그대로 넘김.
+    """
+    if url.startswith("postgres"):
+        return {
+            "min_size": DB_POOL_MIN_SIZE,
+            "max_size": DB_POOL_MAX_SIZE,
+            "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+            "command_timeout": DB_COMMAND_TIMEOUT,
+            "timeout": DB_CONNECT_TIMEOUT,
+            "max_inactive_connection_lifetime": DB_POOL_IDLE_LIFETIME,
+        }
+    if url.startswith("sqlite"):
+        # SQLite 는 풀이 없음. timeout 은 다른 연결의 쓰기 잠금을 기다리는 시간
+        return {
+            "timeout": DB_COMMAND_TIMEOUT,
+            "cached_statements": DB_STATEMENT_CACHE_SIZE,
+        }
+    return {}
+
+logger = logging.getLogger(__name__)
+
+
+def compile_sql(query) -> str:
+    """
+    로그용 SQL 문자열. 가능하면 파라미터 값까지 채워서 보여 줌.
+    """
+    if isinstance(query, str):
+        return query
+    try:
+        return str(query.compile(compile_kwargs={"literal_binds": True}))
+    except Exception:
+        return str(query)
+
+
+class InstrumentedDatabase(Database):
+    """
+    쿼리마다 실행 시간을 재서 지금 요청의 통계(metrics.current_stats)에 더하는 Database.
+    SLOW_QUERY_MS 를 넘긴 쿼리는 컴파일된 SQL 과 route 를 경고 로그로 남김.
+    name 은 /metrics 의 연결 풀 지표에 붙는 이름 (primary, replica).
+    """
+
+    def __init__(self, url: str, name: str = "primary", **options):
+        super().__init__(url, **options)
+        self.name = name
+
+    def pool_stats(self) -> Optional[Dict[str, int]]:
+        """
+        연결 풀 크기/유휴 연결 수/최대 크기. 풀이 없는 DB(SQLite)나 연결 전이면 None.
+        """
+        pool = getattr(self._backend, "_pool", None)
+        if pool is None or not hasattr(pool, "get_idle_size"):
+            return None
+        return {"size": pool.get_size(), "idle": pool.get_idle_size(), "max": pool.get_max_size()}
+
+    def _record(self, query, started: float):
+        seconds = time.perf_counter() - started
+        stats = current_stats.get()
+        if stats is not None:
+            stats.query_count += 1
+            stats.query_seconds += seconds
+            route = stats.route
+        else:
+            route = BACKGROUND_ROUTE
+            metrics.observe_queries(route, 1, seconds)
+
+        if seconds * 1000 >= SLOW_QUERY_MS:
+            metrics.observe_slow_query(route)
+            logger.warning("느린 쿼리 %.1fms [%s]\n%s", seconds * 1000, route, compile_sql(query))
+
+    async def fetch_all(self, query, values=None):
+        started = time.perf_counter()
+        try:
+            return await super().fetch_all(query, values)
+        finally:
+            self._record(query, started)
+
+    async def fetch_one(self, query, values=None):
+        started = time.perf_counter()
+        try:
+            return await super().fetch_one(query, values)
+        finally:
+            self._record(query, started)
+
+    async def fetch_val(self, query, values=None, column=0):
+        started = time.perf_counter()
+        try:
+            return await super().fetch_val(query, values, column=column)
+        finally:
+            self._record(query, started)
+
+    async def execute(self, query, values=None):
+        started = time.perf_counter()
+        try:
+            return await super().execute(query, values)
+        finally:
+            self._record(query, started)
+
+    async def execute_many(self, query, values):
+        started = time.perf_counter()
+        try:
+            return await super().execute_many(query, values)
+        finally:
+            self._record(query, started)
+
+    async def iterate(self, query, values=None):
+        # 스트리밍 조회는 마지막 행을 읽을 때까지를 한 쿼리 시간으로 봄
+        started = time.perf_counter()
+        try:
+            async for record in super().iterate(query, values):
+                yield record
+        finally:
+            self._record(query, started)
+
 
 # 데이터베이스 객체 생성 (비동기 방식)
-database = Database(DATABASE_URL)
+database = InstrumentedDatabase(DATABASE_URL, "primary", **pool_options(DATABASE_URL))
+# 읽기 전용 복제 DB. 설정이 없으면 주 DB 객체를 그대로 씀
+read_database = (
+    InstrumentedDatabase(READ_DATABASE_URL, "replica", **pool_options(READ_DATABASE_URL))
+    if READ_DATABASE_URL else database
+)
+all_databases = [database] if read_database is database else [database, read_database]
+
+
+def reader(written_at: Optional[float]) -> InstrumentedDatabase:
+    """
+    읽을 DB 선택. written_at(time.monotonic) 이후 REPLICA_LAG_SECONDS 가 지나지 않았으면
+    복제 DB에 아직 반영되지 않았을 수 있으므로 주 DB.
+    """
+    if written_at is not None and time.monotonic() - written_at < REPLICA_LAG_SECONDS:
+        return database
+    return read_database
+
+
+def render_pool_metrics() -> List[str]:
+    lines = [
+        "# HELP db_pool_connections DB 연결 풀의 연결 수 (state=idle|busy)",
+        "# TYPE db_pool_connections gauge",
+    ]
+    limits = [
+        "# HELP db_pool_max_connections DB 연결 풀 최대 크기",
+        "# TYPE db_pool_max_connections gauge",
+    ]
+    for db in all_databases:
+        stats = db.pool_stats()
+        if stats is None:
+            continue
+        lines.append(f'db_pool_connections{{db="{db.name}",state="idle"}} {stats["idle"]}')
+        lines.append(f'db_pool_connections{{db="{db.name}",state="busy"}} {stats["size"] - stats["idle"]}')
+        limits.append(f'db_pool_max_connections{{db="{db.name}"}} {stats["max"]}')
+    return lines + limits
+
+
+metrics.add_collector(render_pool_metrics)
@@ -0,0 +1,256 @@
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime, timedelta
+from collections import defaultdict
+from typing import List, Optional, Set, Tuple
+from sqlalchemy import select, and_
+from database import database
+from models import seats, user_passes
+from seat_state import seat_maps, free_seat_status, to_kst
+from seat_hub import seat_hubs
+from waitlist import waitlist
+from change_feed import change_feed, record_changes, seat_change, user_pass_change
+from notifications import notification_dispatcher, enqueue, seat_freed_row
+from analytics import record_seat_session
+from archive import archive_user_passes
+from branches import OWNED_BRANCH_IDS
+import pytz
+KST = pytz.timezone("Asia/Seoul")
+
+logger = logging.getLogger(__name__)
+
+# 다른 워커가 만든 이용권도 놓치지 않도록 마감 시각이 없어도 이 간격마다 한 번은 점검 (초)
+MAX_SWEEP_INTERVAL_SECONDS = 60
+# 한 트랜잭션에서 정리하는 최대 이용권 수
+SWEEP_BATCH_SIZE = 500
+# 정리가 실패하면 이 간격부터 두 배씩 늘려 다시 시도 (최대 MAX_SWEEP_INTERVAL_SECONDS). 지난 마감 시각으로 헛돌지 않게
+SWEEP_RETRY_SECONDS = 1
+
+
+class ExpirySweeper:
+    """
+    만료된 이용권 삭제와 좌석 비우기를 요청 처리와 분리해 백그라운드에서 일괄 처리.
+    다가오는 만료 시각을 최소 힙으로 들고 있다가 가장 빠른 만료 시각에 맞춰 깨어남.
+    힙은 다시 만들지 않고 구매/착석/복귀 때 넣고, 정리 후 지난 시각을 빼며,
+    다른 워커가 만든 이용권은 점검 때마다 마지막으로 읽은 id 이후만 읽어 넣음.
+    branch_ids 를 주면 그 지점 이용권만 정리함 (워커별 담당 지점, OWNED_BRANCHES).
+    """
+
+    def __init__(self, max_interval: float = MAX_SWEEP_INTERVAL_SECONDS, branch_ids: Optional[set] = None):
+        self.max_interval = max_interval
+        self.branch_ids = branch_ids
+        self._deadlines: List[Tuple[datetime, int]] = []  # (만료 시각, user_pass_id)
+        self._scheduled: Set[Tuple[datetime, int]] = set()  # 힙에 든 항목 (같은 항목을 두 번 넣지 않게)
+        self._last_user_pass_id = 0  # 만료 시각을 읽어 온 마지막 user_passes.id
+        self._wakeup = asyncio.Event()
+
+    def schedule(self, user_pass_id: int, deadline: datetime):
+        """
+        구매/착석으로 새 만료 시각이 생기면 등록.
+        지금 기다리는 시각보다 빠르면 루프를 바로 깨움.
+        """
+        entry = (to_kst(deadline), user_pass_id)
+        if entry in self._scheduled:
+            return
+        is_earliest = not self._deadlines or entry[0] < self._deadlines[0][0]
+        heapq.heappush(self._deadlines, entry)
+        self._scheduled.add(entry)
+        if is_earliest:
+            self._wakeup.set()
+
+    def _owned(self, query):
+        if self.branch_ids is None:
+            return query
+        return query.where(user_passes.c.branch_id.in_(self.branch_ids))
+
+    def next_deadline(self) -> Optional[datetime]:
+        return self._deadlines[0][0] if self._deadlines else None
+
+    async def sweep(self, now: Optional[datetime] = None) -> int:
+        """
+        만료된 이용권을 집합 단위 쿼리로 정리하고 정리한 이용권 수를 반환.
+        """
+        now = now or datetime.now(KST)
+
+        # 1. 계량 중인 정액 시간권은 계량 시작 시각 + 남은 시간으로 만료 여부 계산
+        #    (체크포인트에서 두 값이 같이 움직여 합은 그대로이므로, 아직 안 된 것은 힙에 넣어 둠)
+        seated_deadlines = await self._seated_deadlines()
+        used_up_ids = [user_pass_id for deadline, user_pass_id in seated_deadlines if deadline <= now]
+
+        expired_condition = (
+            (user_passes.c.expire_at <= now)
+            | (user_passes.c.remaining_seconds <= 0)
+        )
+        if used_up_ids:
+            expired_condition = expired_condition | user_passes.c.id.in_(used_up_ids)
+
+        candidate_ids = [
+            record["id"]
+            for record in await database.fetch_all(self._owned(select(user_passes.c.id).where(expired_condition)))
+        ]
+
+        # 한 트랜잭션이 너무 커지지 않도록 SWEEP_BATCH_SIZE 씩 나눠 정리
+        expired_count = 0
+        for start in range(0, len(candidate_ids), SWEEP_BATCH_SIZE):
+            expired_count += await self._expire(candidate_ids[start:start + SWEEP_BATCH_SIZE], now)
+        if expired_count:
+            logger.info("만료 이용권 %d건 정리", expired_count)
+
+        for deadline, user_pass_id in seated_deadlines:
+            if deadline > now:
+                self.schedule(user_pass_id, deadline)
+        await self._load_new_deadlines()
+        self._pop_due(now)
+        return expired_count
+
+    async def _expire(self, user_pass_ids: List[int], now: datetime) -> int:
+        """
+        만료된 이용권 한 묶음을 한 트랜잭션으로 정리 (좌석 비우기, 보관 테이블로 옮기기, 기록/알림).
+        """
+        async with database.transaction():
+            # 1. 만료된 이용권이 아직 앉아 있는 좌석만 비우기. 조건부 UPDATE 로 차지한 좌석만 아래에서 기록하므로
+            #    같은 좌석의 동시 퇴실과 한쪽만 처리됨 (퇴실과 같은 방식: 점유 해제 먼저, 점유 정보는 다음에 지움)
+            released = await database.fetch_all(
+                seats.update()
+                .where(seats.c.user_pass_id.in_(user_pass_ids))
+                .where(seats.c.is_occupied == True)
+                .values(is_occupied=False)
+                .returning(seats.c.id, seats.c.branch_id, seats.c.start_at, seats.c.user_pass_id)
+            )
+            freed_seats = []
+            if released:
+                await database.execute(
+                    seats.update()
+                    .where(seats.c.id.in_([seat["id"] for seat in released]))
+                    .values(user_pass_id=None, start_at=None)
+                )
+                owners = {
+                    record["id"]: dict(record)
+                    for record in await database.fetch_all(
+                        select(user_passes.c.id, user_passes.c.user_id, user_passes.c.pass_id)
+                        .where(user_passes.c.id.in_([seat["user_pass_id"] for seat in released]))
+                    )
+                }
+                for seat in released:
+                    owner = owners.get(seat["user_pass_id"], {})
+                    freed_seats.append({**dict(seat), "user_id": owner.get("user_id"), "pass_id": owner.get("pass_id")})
+
+            # 2. 만료된 이용권은 지우지 않고 보관 테이블로 옮김 (그 사이 퇴실로 먼저 옮겨진 것은 빠짐)
+            expired_passes = await archive_user_passes(user_pass_ids, now)
+
+            # 3. 만료로 끝난 좌석 이용 기록 저장 및 이용 시간 집계
+            for seat in freed_seats:
+                await record_seat_session({
+                    "seat_id": seat["id"],
+                    "user_pass_id": seat["user_pass_id"],
+                    "user_id": seat["user_id"],
+                    "pass_id": seat["pass_id"],
+                    "started_at": seat["start_at"],
+                    "ended_at": now,
+                    "end_reason": "expired",
+                }, seat["branch_id"])
+
+            # 4. 지점별 변경 기록 (비워진 좌석, 없어진 보유 이용권)
+            changes_by_branch = defaultdict(list)
+            for seat in freed_seats:
+                changes_by_branch[seat["branch_id"]].append(seat_change(free_seat_status(seat["id"])))
+            for record in expired_passes:
+                changes_by_branch[record["branch_id"]].append(user_pass_change(record["user_id"], record["id"]))
+            for branch_id in sorted(changes_by_branch):
+                await record_changes(branch_id, changes_by_branch[branch_id], now)
+
+            # 5. 좌석이 자동 반납된 사용자에게 보낼 알림 (발송은 알림 발송기가 따로 함)
+            await enqueue([seat_freed_row(seat, now) for seat in freed_seats])
+
+        for branch_id in changes_by_branch:
+            change_feed.notify(branch_id)
+        if freed_seats:
+            notification_dispatcher.wake()
+
+        freed_by_branch = defaultdict(list)
+        for seat in freed_seats:
+            freed_by_branch[seat["branch_id"]].append(seat["id"])
+        for branch_id, seat_ids in freed_by_branch.items():
+            seat_maps.invalidate(branch_id)
+            seat_hubs.channel(branch_id).publish_freed(seat_ids)
+            await waitlist.seats_freed(branch_id, seat_ids, now)
+
+        return len(expired_passes)
+
+    async def _seated_deadlines(self) -> List[Tuple[datetime, int]]:
+        """
+        계량 중인(착석 중이고 외출 중이 아닌) 정액 시간권의 (계량 시작 시각 + 남은 시간, user_pass_id) 목록.
+        """
+        records = await database.fetch_all(self._owned(
+            select(user_passes.c.id, user_passes.c.remaining_seconds, user_passes.c.metered_at)
+            .where(and_(user_passes.c.remaining_seconds.is_not(None), user_passes.c.metered_at.is_not(None)))
+        ))
+        return [
+            (to_kst(record["metered_at"]) + timedelta(seconds=record["remaining_seconds"]), record["id"])
+            for record in records
+        ]
+
+    async def _load_new_deadlines(self):
+        """
+        마지막으로 읽은 뒤 생긴 이용권(다른 워커 구매, 일괄 구매 등)의 만료 시각만 힙에 넣음.
+        expire_at 은 구매 후 바뀌지 않으므로 새 행만 읽으면 됨 (처음 한 번만 전체를 읽음).
+        늦게 커밋된 작은 id 를 놓쳐도 점검 간격마다 DB 조건으로 정리하므로 늦어질 뿐 빠지지 않음.
+        """
+        records = await database.fetch_all(self._owned(
+            select(user_passes.c.id, user_passes.c.expire_at)
+            .where(user_passes.c.id > self._last_user_pass_id)
+            .order_by(user_passes.c.id)
+        ))
+        for record in records:
+            if record["expire_at"] is not None:
+                self.schedule(record["id"], record["expire_at"])
+            self._last_user_pass_id = record["id"]
+
+    def _pop_due(self, now: datetime):
+        """
+        정리를 마친 시각까지의 항목을 힙에서 뺌 (퇴실/외출로 지난 항목, 맡지 않은 지점 이용권도 여기서 빠짐).
+        """
+        while self._deadlines and self._deadlines[0][0] <= now:
+            self._scheduled.discard(heapq.heappop(self._deadlines))
+
+    def _seconds_until_next(self, now: datetime) -> float:
+        deadline = self.next_deadline()
+        if deadline is None:
+            return self.max_interval
+        return min(max((deadline - now).total_seconds(), 0), self.max_interval)
+
+    async def run(self):
+        """
+        lifespan 에서 백그라운드 태스크로 실행하는 루프.
+        """
+        last_sweep = None
+        failures = 0
+        retry_at = 0.0  # 실패 후 다시 시도할 수 있는 시각 (monotonic)
+        while True:
+            now = datetime.now(KST)
+            deadline = self.next_deadline()
+            overdue = last_sweep is None or time.monotonic() - last_sweep >= self.max_interval
+
+            # 가장 빠른 만료 시각이 지났거나 점검 간격이 지났을 때만 정리 (실패 직후에는 재시도 간격을 기다림)
+            if (overdue or (deadline is not None and deadline <= now)) and time.monotonic() >= retry_at:
+                try:
+                    await self.sweep(now)
+                    failures = 0
+                except Exception:
+                    failures += 1
+                    retry_at = time.monotonic() + min(SWEEP_RETRY_SECONDS * 2 ** (failures - 1), self.max_interval)
+                    logger.exception("만료 이용권 정리 실패 (%d회 연속)", failures)
+                last_sweep = time.monotonic()
+
+            self._wakeup.clear()
+            timeout = max(self._seconds_until_next(datetime.now(KST)), retry_at - time.monotonic())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+# 앱 전체에서 공유하는 만료 스위퍼 (이 워커가 맡은 지점만)
+expiry_sweeper = ExpirySweeper(branch_ids=OWNED_BRANCH_IDS)
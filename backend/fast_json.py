@@ -0,0 +1,39 @@
+import json
+from datetime import date, datetime
+from typing import Any
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # orjson 이 없으면 표준 json 으로 같은 모양의 JSON 을 만듦
+    orjson = None
+
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"JSON 으로 바꿀 수 없는 값입니다: {type(value).__name__}")
+
+
+def dumps(data: Any) -> bytes:
+    """
+    dict/list 를 바로 JSON 바이트로. FastAPI 기본 응답과 같은 모양
+    (공백 없는 구분자, 한글 그대로, datetime 은 ISO 8601).
+    """
+    if orjson is not None:
+        # DB 레코드의 컬럼명은 str 하위 타입(quoted_name)이라 키 검사를 풀어 줌
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """
+    서버에서 만든 믿을 수 있는 dict 목록을 검증 없이 바로 직렬화하는 응답.
+    라우트가 Response 를 반환하면 FastAPI 는 response_model 검증/인코딩을 건너뛰므로,
+    response_model 은 API 문서용으로만 남고 행마다 Pydantic 모델을 만들지 않음.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,223 @@
+"""
+자주 실행되는 쿼리 목록과, 그 쿼리가 기대한 인덱스를 타는지 실행 계획(EXPLAIN)으로 확인하는 함수.
+bench/query_plans.py (명령줄 확인)와 tests/test_query_plans.py 가 함께 씀.
+PostgreSQL 은 행이 적으면 일부러 Seq Scan 을 고르므로 enable_seqscan 을 끄고 확인함.
+"""
+import json
+import os
+from datetime import datetime
+from typing import List, Tuple
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import select, text
+from models import (
+    change_log, notification_outbox, passes, purchase_logs, purchase_logs_archive,
+    seats, seat_reservations, user_passes, user_passes_archive,
+)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+NOW = datetime(2026, 1, 1)
+
+# (이름, 인덱스를 타야 하는 테이블, 타야 하는 인덱스, 쿼리)
+HOT_QUERIES = [
+    (
+        "get_user_passes",
+        "user_passes",
+        "ix_user_passes_user_id_pass_id",
+        user_passes.join(passes, user_passes.c.pass_id == passes.c.id)
+        .select()
+        .where(user_passes.c.user_id == 1),
+    ),
+    (
+        "leave_seat: 좌석의 이용권",
+        "user_passes",
+        "ix_user_passes_seat_id",
+        user_passes.select().where(user_passes.c.seat_id == "A1"),
+    ),
+    (
+        "expiry: 기간 만료",
+        "user_passes",
+        "ix_user_passes_expire_at",
+        select(user_passes.c.id).where(user_passes.c.expire_at <= NOW),
+    ),
+    (
+        "expiry: 남은 시간 소진",
+        "user_passes",
+        "ix_user_passes_remaining_seconds",
+        select(user_passes.c.id).where(user_passes.c.remaining_seconds <= 0),
+    ),
+    (
+        "metering: 체크포인트 대상",
+        "user_passes",
+        "ix_user_passes_metered_at",
+        select(user_passes.c.id, user_passes.c.remaining_seconds, user_passes.c.metered_at)
+        .where(user_passes.c.metered_at <= NOW)
+        .where(user_passes.c.remaining_seconds.is_not(None)),
+    ),
+    (
+        "expiry: 만료 이용권의 좌석",
+        "seats",
+        "ix_seats_user_pass_id",
+        select(seats.c.id).where(seats.c.user_pass_id.in_([1, 2, 3])),
+    ),
+    (
+        "seat_map: 지점 좌석 스냅샷",
+        "seats",
+        "ix_seats_branch_id",
+        select(seats.c.id, seats.c.is_occupied).where(seats.c.branch_id == 1).order_by(seats.c.id),
+    ),
+    (
+        "reservation: 같은 좌석 예약 겹침",
+        "seat_reservations",
+        "ix_seat_reservations_seat_id_start_at",
+        select(seat_reservations.c.id)
+        .where(seat_reservations.c.seat_id == "A1")
+        .where(seat_reservations.c.status.in_(["booked", "checked_in"]))
+        .where(seat_reservations.c.start_at < NOW)
+        .where(seat_reservations.c.end_at > NOW),
+    ),
+    (
+        "reservation: 노쇼 정리",
+        "seat_reservations",
+        "ix_seat_reservations_status_start_at",
+        select(seat_reservations.c.id)
+        .where(seat_reservations.c.status == "booked")
+        .where(seat_reservations.c.start_at <= NOW),
+    ),
+    (
+        "sales: 기간별 매출",
+        "purchase_logs",
+        "ix_purchase_logs_purchased_at",
+        select(purchase_logs.c.pass_id, purchase_logs.c.price)
+        .where(purchase_logs.c.purchased_at >= NOW)
+        .where(purchase_logs.c.purchased_at < datetime(2026, 2, 1)),
+    ),
+    (
+        "sales: 사용자별 구매 내역",
+        "purchase_logs",
+        "ix_purchase_logs_user_id_purchased_at",
+        purchase_logs.select()
+        .where(purchase_logs.c.user_id == 1)
+        .order_by(purchase_logs.c.purchased_at.desc()),
+    ),
+    (
+        "changes: 커서 이후 변경",
+        "change_log",
+        "ix_change_log_branch_id_id",
+        select(change_log.c.id, change_log.c.entity, change_log.c.entity_id)
+        .where(change_log.c.branch_id == 1)
+        .where(change_log.c.id > 100)
+        .order_by(change_log.c.id)
+        .limit(500),
+    ),
+    (
+        "changes: 보관 기간 지난 기록",
+        "change_log",
+        "ix_change_log_created_at",
+        select(change_log.c.id).where(change_log.c.created_at < NOW),
+    ),
+    (
+        "notifications: 보낼 알림",
+        "notification_outbox",
+        "ix_notification_outbox_status_next_attempt_at",
+        select(notification_outbox.c.id)
+        .where(notification_outbox.c.status == "pending")
+        .where(notification_outbox.c.next_attempt_at <= NOW)
+        .order_by(notification_outbox.c.id)
+        .limit(100),
+    ),
+    (
+        "archive: 옮길 구매 로그",
+        "purchase_logs",
+        "ix_purchase_logs_purchased_at",
+        select(purchase_logs.c.id)
+        .where(purchase_logs.c.purchased_at < NOW)
+        .where(purchase_logs.c.id <= 1000)
+        .order_by(purchase_logs.c.purchased_at)
+        .limit(1000),
+    ),
+    (
+        "archive: 보관된 구매 내역",
+        "purchase_logs_archive",
+        "ix_purchase_logs_archive_user_id",
+        select(purchase_logs_archive.c.id)
+        .where(purchase_logs_archive.c.user_id == 1)
+        .order_by(purchase_logs_archive.c.id.desc()),
+    ),
+    (
+        "archive: 끝난 보유 이용권",
+        "user_passes_archive",
+        "ix_user_passes_archive_user_id",
+        user_passes_archive.select()
+        .where(user_passes_archive.c.user_id == 1)
+        .order_by(user_passes_archive.c.id.desc()),
+    ),
+]
+
+
+def upgrade(url: str):
+    """
+    url 의 DB에 마이그레이션을 끝까지 적용 (main.run_migrations 와 같지만 DATABASE_URL 이 아닌 DB에도 씀).
+    """
+    cfg = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+    cfg.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    command.upgrade(cfg, "head")
+
+
+def compile_query(query, dialect) -> Tuple[str, dict]:
+    # IN (...) 목록도 실제 파라미터로 펼쳐서 컴파일
+    compiled = query.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.construct_params()
+    if compiled.positiontup:
+        params = {key: params[key] for key in compiled.positiontup}
+    return str(compiled), params
+
+
+def sqlite_plan(connection, sql: str, params: dict) -> List[str]:
+    """
+    EXPLAIN QUERY PLAN 의 단계 설명 목록 (예: "SEARCH user_passes USING INDEX ix_user_passes_seat_id (seat_id=?)").
+    """
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", tuple(params.values())).fetchall()
+    return [row[-1] for row in rows]
+
+
+def sqlite_problems(connection, sql: str, params: dict, table: str, index: str) -> list:
+    details = sqlite_plan(connection, sql, params)
+    problems = [
+        detail for detail in details
+        if detail.startswith(f"SCAN {table}") and "INDEX" not in detail
+    ]
+    if not any(f"INDEX {index} " in detail for detail in details):
+        problems.append(f"{index} 를 쓰지 않음: {details}")
+    return problems
+
+
+def postgres_problems(connection, sql: str, params: dict, table: str, index: str) -> list:
+    connection.execute(text("SET enable_seqscan = off"))
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}", params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    problems, index_names = [], []
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") == table:
+            problems.append(f"Seq Scan on {table}")
+        if "Index Name" in node:
+            index_names.append(node["Index Name"])
+        nodes.extend(node.get("Plans", []))
+    if index not in index_names:
+        problems.append(f"{index} 를 쓰지 않음: {index_names}")
+    return problems
+
+
+def plan_problems(connection, table: str, index: str, query) -> list:
+    """
+    쿼리를 connection 의 DB 종류로 컴파일해 실행 계획을 보고, 풀 스캔이나 기대한 인덱스를 안 쓰는 문제 목록을 반환.
+    """
+    sql, params = compile_query(query, connection.dialect)
+    check = sqlite_problems if connection.dialect.name == "sqlite" else postgres_problems
+    return check(connection, sql, params, table, index)
+
@@ -0,0 +1,55 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException
+from pydantic import BaseModel
+from database import database
+from models import idempotency_keys
+import pytz
+KST = pytz.timezone("Asia/Seoul")
+
+
+def request_hash(request: BaseModel) -> str:
+    """
+    요청 본문의 해시. 같은 키로 다른 내용을 보낸 재시도를 가려내려고 키와 함께 저장함.
+    """
+    body = json.dumps(request.model_dump(mode="json"), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+async def fetch_response(user_id: int, key: str, body_hash: str) -> Optional[dict]:
+    """
+    같은 Idempotency-Key 로 이미 처리된 요청이 있으면 그때의 응답을 반환.
+    키는 같은데 요청 본문이 다르면 422 (다른 구매를 같은 키로 보낸 클라이언트 오류).
+    """
+    record = await database.fetch_one(
+        idempotency_keys.select()
+        .where(idempotency_keys.c.user_id == user_id)
+        .where(idempotency_keys.c.key == key)
+    )
+    if not record:
+        return None
+    # 해시를 저장하기 전(0017 이전)에 쓴 키는 비교하지 않음
+    if record["request_hash"] is not None and record["request_hash"] != body_hash:
+        raise HTTPException(
+            status_code=422,
+            detail="같은 Idempotency-Key 로 다른 내용의 요청을 보냈습니다.",
+        )
+    return json.loads(record["response"])
+
+
+async def store_response(user_id: int, key: str, body_hash: str, response: dict):
+    """
+    응답을 키, 요청 본문 해시와 함께 저장. 실제 처리와 같은 트랜잭션 안에서 호출해야 함.
+    같은 키가 동시에 들어오면 유니크 제약 위반으로 나중 요청의 트랜잭션이 롤백됨.
+    """
+    await database.execute(
+        idempotency_keys.insert().values(
+            user_id=user_id,
+            key=key,
+            request_hash=body_hash,
+            response=json.dumps(response, ensure_ascii=False, default=str),
+            created_at=datetime.now(KST),
+        )
+    )
@@ -1,27 +1,89 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import database
-from models import metadata
-from sqlalchemy import create_engine
+from fastapi.responses import PlainTextResponse
+from database import all_databases
+from alembic import command
+from alembic.config import Config
 from contextlib import asynccontextmanager
-from routes import user, protected, passes, seat
+from expiry import expiry_sweeper
+from pass_catalog import pass_catalog
+from branches import branch_directory
+from reservations import reservation_book
+from metering import usage_meter
+from waitlist import waitlist
+from change_feed import change_feed
+from notifications import notification_dispatcher
+from archive import archiver
+from analytics import run_rollups
+from metrics import MetricsMiddleware, metrics
+import asyncio
+import logging
+import time
+from routes.protected import get_admin_user
+from routes import user, protected, branches, passes, seat, seat_layout, reservations, waitlist as waitlist_routes, changes, history, reports
 from dotenv import load_dotenv
 import os
 
 load_dotenv() #.env 파일 읽기
 DATABASE_URL = os.getenv("DATABASE_URL")
+# 앱 시작 때 마이그레이션 적용 여부. 기본은 개발용 SQLite 에서만 켬.
+# 운영(PostgreSQL)은 배포 단계에서 `alembic upgrade head` 를 한 번만 실행 (켜더라도 워커끼리는 advisory lock 으로 하나씩 적용)
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "1" if (DATABASE_URL or "").startswith("sqlite") else "0") == "1"
 
-app = FastAPI() # FastAPI 앱 객체 생성
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_migrations():
+    """
+    DB 스키마를 최신 마이그레이션까지 적용 (migrations/, alembic). 동기 엔진을 쓰므로 스레드에서 실행.
+    """
+    alembic_cfg = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    alembic_cfg.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+    alembic_cfg.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
+    command.upgrade(alembic_cfg, "head")
 
-# DB 초기화용 엔진 (테이블 생성에 필요)
-engine = create_engine(DATABASE_URL)
-metadata.create_all(engine)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await database.connect()
+    # 단계별 시작 시간은 /metrics 의 app_startup_seconds 로 확인
+    started = time.perf_counter()
+
+    async def phase(name: str, step):
+        phase_started = time.perf_counter()
+        await step
+        metrics.observe_startup(name, time.perf_counter() - phase_started)
+
+    if AUTO_MIGRATE:
+        await phase("migrate", asyncio.to_thread(run_migrations))
+    await phase("connect", asyncio.gather(*(db.connect() for db in all_databases)))
+    # 이용권 목록은 거의 바뀌지 않으므로 시작할 때 메모리에 올려 둠
+    await phase("pass_catalog", pass_catalog.load())
+    await phase("branches", branch_directory.load())
+    # 끝나지 않은 좌석 예약으로 좌석별 예약 인덱스를 만듦
+    await phase("reservations", reservation_book.load())
+    # 좌석 대기열
+    await phase("waitlist", waitlist.load())
+    metrics.observe_startup("total", time.perf_counter() - started)
+    logger.info("앱 시작 %.0fms", (time.perf_counter() - started) * 1000)
+    # 만료 이용권 정리, 매출 집계, 예약 노쇼 정리, 사용 시간 체크포인트, 좌석 제안 만료, 변경 기록 정리, 알림 발송, 오래된 구매 로그 보관은 요청 처리와 분리해 백그라운드에서 실행
+    background_tasks = [
+        asyncio.create_task(expiry_sweeper.run()),
+        asyncio.create_task(run_rollups()),
+        asyncio.create_task(reservation_book.run()),
+        asyncio.create_task(usage_meter.run()),
+        asyncio.create_task(waitlist.run()),
+        asyncio.create_task(change_feed.run()),
+        asyncio.create_task(notification_dispatcher.run()),
+        asyncio.create_task(archiver.run()),
+    ]
     yield 
-    await database.disconnect()
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    for db in all_databases:
+        await db.disconnect()
 
 app=FastAPI(lifespan=lifespan)
 
@@ -32,13 +94,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+# 요청별 DB 쿼리 수/시간 측정 (Server-Timing 헤더, /metrics)
+app.add_middleware(MetricsMiddleware)
 
 # 라우터 등록
 app.include_router(user.router)
 app.include_router(protected.router)
+app.include_router(branches.router)
 app.include_router(passes.router)
 app.include_router(seat.router)
+app.include_router(seat_layout.router)
+app.include_router(reservations.router)
+app.include_router(waitlist_routes.router)
+app.include_router(changes.router)
+app.include_router(history.router)
+app.include_router(reports.router)
 @app.get("/")
 async def root():
     return {"message": "스터디카페 앱 API 시작!"}
+
+# Prometheus 텍스트 형식 지표 (관리자, 수집기는 관리자 토큰을 Bearer 로 보냄)
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint(admin_id: int = Depends(get_admin_user)):
+    return metrics.render()
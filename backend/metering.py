@@ -0,0 +1,143 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import case, select
+from database import database
+from models import user_passes
+from seat_state import seat_maps, seat_status, occupied_entry, to_kst, unbilled_seconds
+from seat_hub import seat_hubs
+from change_feed import change_feed, record_changes, seat_change, user_pass_changed
+from expiry import expiry_sweeper
+from branches import OWNED_BRANCH_IDS
+import pytz
+KST = pytz.timezone("Asia/Seoul")
+
+logger = logging.getLogger(__name__)
+
+# 착석 중인 정액 시간권의 사용 시간을 DB 남은 시간에 반영하는 주기 (초)
+CHECKPOINT_SECONDS = 60
+# 외출은 이 시간까지만 시간이 멈추고, 넘기면 자동으로 다시 계량함
+MAX_PAUSE = timedelta(hours=1)
+
+
+def settle(user_pass, now: datetime) -> dict:
+    """
+    지금까지 계량한 사용 시간을 남은 시간에서 빼고 계량을 멈추는 UPDATE 값 (외출, 퇴실).
+    남은 시간을 절대값으로 쓰므로 체크포인트와 순서가 엇갈려도 결과가 같음.
+    """
+    values = {"metered_at": None}
+    if user_pass["remaining_seconds"] is not None:
+        values["remaining_seconds"] = user_pass["remaining_seconds"] - unbilled_seconds(user_pass["metered_at"], now)
+    return values
+
+
+class UsageMeter:
+    """
+    정액 시간권 사용 시간을 초 단위로 계량. 착석/외출 복귀 때 metered_at 에 계량 시작 시각을 두고,
+    주기마다 모든 착석 중 이용권의 사용분을 한 번의 UPDATE 로 remaining_seconds 에 반영함(체크포인트).
+    metered_at 은 반영한 초만큼만 앞으로 옮겨 1초 미만 자투리가 버려지지 않게 함.
+    branch_ids 를 주면 그 지점 이용권만 다룸 (워커별 담당 지점).
+    """
+
+    def __init__(self, interval: float = CHECKPOINT_SECONDS, branch_ids: Optional[set] = None):
+        self.interval = interval
+        self.branch_ids = branch_ids
+
+    def _owned(self, query):
+        if self.branch_ids is None:
+            return query
+        return query.where(user_passes.c.branch_id.in_(self.branch_ids))
+
+    async def checkpoint(self, now: Optional[datetime] = None) -> int:
+        """
+        계량 중인 이용권의 사용 시간을 남은 시간에 반영하고 반영한 이용권 수를 반환.
+        """
+        now = now or datetime.now(KST)
+        records = await database.fetch_all(self._owned(
+            select(user_passes.c.id, user_passes.c.remaining_seconds, user_passes.c.metered_at)
+            .where(user_passes.c.metered_at <= now)
+            .where(user_passes.c.remaining_seconds.is_not(None))
+        ))
+
+        remaining, metered_at, read_metered_at = {}, {}, {}
+        for record in records:
+            charged = unbilled_seconds(record["metered_at"], now)
+            if charged == 0:
+                continue
+            remaining[record["id"]] = record["remaining_seconds"] - charged
+            metered_at[record["id"]] = to_kst(record["metered_at"]) + timedelta(seconds=charged)
+            read_metered_at[record["id"]] = record["metered_at"]
+
+        if not remaining:
+            return 0
+
+        # 읽은 뒤 퇴실/외출로 metered_at 이 바뀐 행은 건너뜀 (그쪽에서 이미 정산함)
+        updated = await database.fetch_all(
+            user_passes.update()
+            .where(user_passes.c.id.in_(list(remaining)))
+            .where(user_passes.c.metered_at == case(read_metered_at, value=user_passes.c.id))
+            .values(
+                remaining_seconds=case(remaining, value=user_passes.c.id),
+                metered_at=case(metered_at, value=user_passes.c.id),
+            )
+            .returning(user_passes.c.id)
+        )
+        return len(updated)
+
+    async def resume_overdue(self, now: Optional[datetime] = None) -> int:
+        """
+        MAX_PAUSE 를 넘긴 외출을 한 번의 UPDATE 로 끝내고 다시 계량 시작.
+        외출 복귀 API 와 같이 좌석/보유 이용권 변경 기록을 같은 트랜잭션에 남기고 좌석 이벤트를 발행함.
+        """
+        now = now or datetime.now(KST)
+        async with database.transaction():
+            resumed = await database.fetch_all(self._owned(
+                user_passes.update()
+                .where(user_passes.c.paused_at <= now - MAX_PAUSE)
+                .values(
+                    paused_at=None,
+                    metered_at=case((user_passes.c.remaining_seconds.is_not(None), now), else_=None),
+                )
+            ).returning(*user_passes.c))
+
+            statuses_by_branch = defaultdict(list)
+            changes_by_branch = defaultdict(list)
+            for record in resumed:
+                if record["seat_id"] is not None:
+                    resumed_status = seat_status(occupied_entry(record["seat_id"], record), now)
+                    statuses_by_branch[record["branch_id"]].append(resumed_status)
+                    changes_by_branch[record["branch_id"]].append(seat_change(resumed_status))
+                changes_by_branch[record["branch_id"]].append(await user_pass_changed(record, now))
+            for branch_id in sorted(changes_by_branch):
+                await record_changes(branch_id, changes_by_branch[branch_id], now)
+
+        if resumed:
+            for record in resumed:
+                if record["remaining_seconds"] is not None:
+                    expiry_sweeper.schedule(record["id"], now + timedelta(seconds=record["remaining_seconds"]))
+            for branch_id in changes_by_branch:
+                seat_maps.invalidate(branch_id)
+                change_feed.notify(branch_id)
+                for resumed_status in statuses_by_branch[branch_id]:
+                    seat_hubs.channel(branch_id).publish_seat(resumed_status)
+            logger.info("외출 시간 초과 %d건 자동 복귀", len(resumed))
+        return len(resumed)
+
+    async def run(self):
+        """
+        lifespan 에서 백그라운드 태스크로 실행하는 체크포인트 루프.
+        프로세스가 죽어도 DB의 남은 시간은 최대 한 주기 전 사용분까지 반영되어 있음.
+        """
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.resume_overdue()
+                await self.checkpoint()
+            except Exception:
+                logger.exception("사용 시간 체크포인트 실패")
+
+
+# 앱 전체에서 공유하는 사용 시간 계량기 (이 워커가 맡은 지점만)
+usage_meter = UsageMeter(branch_ids=OWNED_BRANCH_IDS)
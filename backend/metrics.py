@@ -0,0 +1,183 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 요청 처리 시간 히스토그램 구간 (초)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# 요청 밖(만료 정리, 매출 집계 등 백그라운드 태스크)에서 실행된 쿼리의 route 이름
+BACKGROUND_ROUTE = "background"
+
+
+class RequestStats:
+    """
+    요청 하나에서 실행된 DB 쿼리 수와 누적 시간. 미들웨어가 요청마다 새로 만들어 current_stats 에 넣음.
+    """
+    __slots__ = ("method", "path", "query_count", "query_seconds")
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.query_count = 0
+        self.query_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+# 지금 처리 중인 요청의 통계 (요청 밖이면 None)
+current_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_stats", default=None)
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """
+    프로세스 내 요청/DB 쿼리 카운터. /metrics 에서 Prometheus 텍스트 형식으로 내보냄.
+    """
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self.request_buckets: Dict[Tuple[str, str], list] = defaultdict(lambda: [0] * (len(DURATION_BUCKETS) + 1))
+        self.request_seconds: Dict[Tuple[str, str], float] = defaultdict(float)
+        self.queries: Dict[str, int] = defaultdict(int)
+        self.query_seconds: Dict[str, float] = defaultdict(float)
+        self.slow_queries: Dict[str, int] = defaultdict(int)
+        self.startup_seconds: Dict[str, float] = {}
+        # render() 때 지금 값을 읽어 오는 게이지 (예: DB 연결 풀), Prometheus 텍스트 줄 목록을 반환
+        self.collectors: List[Callable[[], List[str]]] = []
+
+    def add_collector(self, collector: Callable[[], List[str]]):
+        self.collectors.append(collector)
+
+    def observe_startup(self, phase: str, seconds: float):
+        self.startup_seconds[phase] = seconds
+
+    def observe_request(self, method: str, route: str, status_code: int, seconds: float, stats: RequestStats):
+        self.requests[(method, route, str(status_code))] += 1
+        self.request_buckets[(method, route)][bisect_left(DURATION_BUCKETS, seconds)] += 1
+        self.request_seconds[(method, route)] += seconds
+        self.observe_queries(f"{method} {route}", stats.query_count, stats.query_seconds)
+
+    def observe_queries(self, route: str, count: int, seconds: float):
+        if count:
+            self.queries[route] += count
+            self.query_seconds[route] += seconds
+
+    def observe_slow_query(self, route: str):
+        self.slow_queries[route] += 1
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_requests_total 처리한 HTTP 요청 수",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status_code), count in sorted(self.requests.items()):
+            lines.append(
+                f'http_requests_total{{method="{method}",route="{escape_label(route)}",status="{status_code}"}} {count}'
+            )
+
+        lines += [
+            "# HELP http_request_duration_seconds HTTP 요청 처리 시간",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), buckets in sorted(self.request_buckets.items()):
+            labels = f'method="{method}",route="{escape_label(route)}"'
+            cumulative = 0
+            for bound, count in zip(DURATION_BUCKETS, buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += buckets[-1]
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {self.request_seconds[(method, route)]:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {cumulative}")
+
+        lines += [
+            "# HELP db_queries_total 실행한 DB 쿼리 수 (route 별)",
+            "# TYPE db_queries_total counter",
+        ]
+        for route, count in sorted(self.queries.items()):
+            lines.append(f'db_queries_total{{route="{escape_label(route)}"}} {count}')
+
+        lines += [
+            "# HELP db_query_duration_seconds_total DB 쿼리 누적 실행 시간 (route 별)",
+            "# TYPE db_query_duration_seconds_total counter",
+        ]
+        for route, seconds in sorted(self.query_seconds.items()):
+            lines.append(f'db_query_duration_seconds_total{{route="{escape_label(route)}"}} {seconds:.6f}')
+
+        lines += [
+            "# HELP db_slow_queries_total 기준 시간을 넘긴 DB 쿼리 수 (route 별)",
+            "# TYPE db_slow_queries_total counter",
+        ]
+        for route, count in sorted(self.slow_queries.items()):
+            lines.append(f'db_slow_queries_total{{route="{escape_label(route)}"}} {count}')
+
+        lines += [
+            "# HELP app_startup_seconds 앱 시작 단계별 소요 시간",
+            "# TYPE app_startup_seconds gauge",
+        ]
+        for phase, seconds in self.startup_seconds.items():
+            lines.append(f'app_startup_seconds{{phase="{escape_label(phase)}"}} {seconds:.6f}')
+
+        for collector in self.collectors:
+            lines += collector()
+
+        return "\n".join(lines) + "\n"
+
+
+# 앱 전체에서 공유하는 지표
+metrics = Metrics()
+
+
+def server_timing(stats: RequestStats, elapsed: float) -> str:
+    """
+    Server-Timing 헤더 값. 브라우저 개발자 도구 Timing 탭에서 DB 시간/쿼리 수를 바로 볼 수 있음.
+    """
+    return (
+        f'db;dur={stats.query_seconds * 1000:.2f};desc="{stats.query_count} queries", '
+        f"app;dur={elapsed * 1000:.2f}"
+    )
+
+
+class MetricsMiddleware:
+    """
+    요청마다 DB 쿼리 통계를 모아 Server-Timing 헤더를 붙이고, 끝나면 route 별 지표에 더함.
+    스트리밍 응답(SSE 등)은 헤더를 보낸 뒤의 쿼리가 헤더에는 빠지고 지표에만 반영됨.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope["method"], scope["path"])
+        token = current_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(stats, time.perf_counter() - started).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_stats.reset(token)
+            # 매칭된 라우트의 경로 템플릿으로 묶음 (/users/1, /users/2 가 따로 쌓이지 않게)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            metrics.observe_request(scope["method"], route_path, status_code, time.perf_counter() - started, stats)
@@ -0,0 +1,49 @@
+from alembic import context
+from sqlalchemy import create_engine, pool
+from dotenv import load_dotenv
+from models import metadata
+import os
+
+load_dotenv()  # .env 파일 읽기
+
+# 코드에서 실행할 때(main.py)는 config 에 넘긴 주소, 아니면 .env 의 DATABASE_URL
+DATABASE_URL = context.config.get_main_option("sqlalchemy.url") or os.getenv("DATABASE_URL")
+
+target_metadata = metadata
+
+# 여러 워커가 동시에 마이그레이션을 시작해도 하나씩 적용하도록 잡는 PostgreSQL advisory lock 키
+MIGRATION_LOCK_KEY = 5130
+
+
+def run_migrations_offline():
+    # DB 연결 없이 SQL 만 출력 (alembic upgrade head --sql)
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    engine = create_engine(DATABASE_URL, poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        # SQLite 는 ALTER TABLE 이 제한적이라 batch 모드 사용
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=True,
+        )
+        with context.begin_transaction():
+            if connection.dialect.name == "postgresql":
+                # 트랜잭션이 끝날 때 풀림. 기다렸던 워커는 현재 버전을 잠금 뒤에 읽으므로 이미 적용된 것은 건너뜀
+                connection.exec_driver_sql(f"SELECT pg_advisory_xact_lock({MIGRATION_LOCK_KEY})")
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,111 @@
+"""initial schema
+
+기존에 metadata.create_all 로 만들어진 DB도 그대로 이어받을 수 있도록
+모든 테이블을 if_not_exists 로 생성함.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("phone_number", sa.String, nullable=False),
+        sa.Column("name", sa.String, nullable=False),
+        sa.Column("age", sa.Integer, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        if_not_exists=True,
+    )
+    op.create_index("ix_users_phone_number", "users", ["phone_number"], unique=True, if_not_exists=True)
+
+    op.create_table(
+        "passes",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String, nullable=False),
+        sa.Column("pass_type", sa.String, nullable=False),
+        sa.Column("duration", sa.Integer, nullable=False),
+        sa.Column("price", sa.Integer, nullable=False),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "seats",
+        sa.Column("id", sa.String, primary_key=True),
+        sa.Column("is_occupied", sa.Boolean),
+        sa.Column("user_pass_id", sa.Integer, nullable=True),
+        sa.Column("start_at", sa.DateTime(timezone=True), nullable=True),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "user_passes",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("pass_id", sa.Integer, sa.ForeignKey("passes.id"), nullable=False),
+        sa.Column("expire_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("remaining_time", sa.Integer, nullable=True),
+        sa.Column("is_active", sa.Boolean, nullable=False),
+        sa.Column("seat_id", sa.String, sa.ForeignKey("seats.id"), nullable=True),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "purchase_logs",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("pass_id", sa.Integer, sa.ForeignKey("passes.id"), nullable=False),
+        sa.Column("purchased_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("price", sa.Integer, nullable=False),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("key", sa.String, nullable=False),
+        sa.Column("response", sa.Text, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("user_id", "key"),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "catalog_versions",
+        sa.Column("name", sa.String, primary_key=True),
+        sa.Column("version", sa.Integer, nullable=False),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "revoked_tokens",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("token_hash", sa.String, nullable=False, unique=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    for table_name in [
+        "revoked_tokens",
+        "catalog_versions",
+        "idempotency_keys",
+        "purchase_logs",
+        "user_passes",
+        "seats",
+        "passes",
+        "users",
+    ]:
+        op.drop_table(table_name)
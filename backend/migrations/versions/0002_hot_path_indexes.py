@@ -0,0 +1,35 @@
+"""hot path indexes
+
+/user/passes, 퇴실, 만료 정리, 매출 집계 쿼리가 풀 스캔하지 않도록 인덱스 추가.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_user_passes_user_id_pass_id", "user_passes", ["user_id", "pass_id"]),
+    ("ix_user_passes_seat_id", "user_passes", ["seat_id"]),
+    ("ix_user_passes_expire_at", "user_passes", ["expire_at"]),
+    ("ix_user_passes_remaining_time", "user_passes", ["remaining_time"]),
+    ("ix_seats_user_pass_id", "seats", ["user_pass_id"]),
+    ("ix_purchase_logs_user_id_purchased_at", "purchase_logs", ["user_id", "purchased_at"]),
+    ("ix_purchase_logs_purchased_at", "purchase_logs", ["purchased_at"]),
+]
+
+
+def upgrade():
+    for index_name, table_name, columns in INDEXES:
+        op.create_index(index_name, table_name, columns, if_not_exists=True)
+
+
+def downgrade():
+    for index_name, table_name, _ in INDEXES:
+        op.drop_index(index_name, table_name=table_name)
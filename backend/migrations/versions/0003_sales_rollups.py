@@ -0,0 +1,41 @@
+"""sales and seat usage rollups
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "sales_rollups",
+        sa.Column("hour", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("pass_id", sa.Integer, sa.ForeignKey("passes.id"), primary_key=True),
+        sa.Column("purchase_count", sa.Integer, nullable=False),
+        sa.Column("revenue", sa.Integer, nullable=False),
+    )
+    op.create_table(
+        "seat_usage_rollups",
+        sa.Column("hour", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("occupied_seconds", sa.Integer, nullable=False),
+        sa.Column("sessions", sa.Integer, nullable=False),
+    )
+    op.create_table(
+        "rollup_watermarks",
+        sa.Column("name", sa.String, primary_key=True),
+        sa.Column("last_id", sa.Integer, nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("rollup_watermarks")
+    op.drop_table("seat_usage_rollups")
+    op.drop_table("sales_rollups")
@@ -0,0 +1,37 @@
+"""seat sessions
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "seat_sessions",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("seat_id", sa.String, nullable=False),
+        sa.Column("user_pass_id", sa.Integer, nullable=False),
+        sa.Column("user_id", sa.Integer, nullable=True),
+        sa.Column("pass_id", sa.Integer, nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("ended_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("used_minutes", sa.Integer, nullable=False),
+        sa.Column("end_reason", sa.String, nullable=False),
+    )
+    op.create_index("ix_seat_sessions_ended_at", "seat_sessions", ["ended_at"])
+    op.create_index("ix_seat_sessions_user_id", "seat_sessions", ["user_id"])
+
+
+def downgrade():
+    op.drop_index("ix_seat_sessions_user_id", table_name="seat_sessions")
+    op.drop_index("ix_seat_sessions_ended_at", table_name="seat_sessions")
+    op.drop_table("seat_sessions")
@@ -0,0 +1,46 @@
+"""branches
+
+여러 지점 운영을 위해 branches 테이블을 만들고 seats, passes, user_passes 에 branch_id 추가.
+기존 데이터는 모두 1번 지점(본점)으로 옮김.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+BRANCH_TABLES = ["seats", "passes", "user_passes"]
+
+
+def upgrade():
+    branches = op.create_table(
+        "branches",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String, nullable=False),
+    )
+    op.bulk_insert(branches, [{"id": 1, "name": "본점"}])
+
+    for table_name in BRANCH_TABLES:
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.add_column(sa.Column("branch_id", sa.Integer, nullable=False, server_default="1"))
+            batch_op.create_foreign_key(f"fk_{table_name}_branch_id", "branches", ["branch_id"], ["id"])
+
+    op.create_index("ix_seats_branch_id", "seats", ["branch_id"])
+    op.create_index("ix_user_passes_branch_id", "user_passes", ["branch_id"])
+
+
+def downgrade():
+    op.drop_index("ix_user_passes_branch_id", table_name="user_passes")
+    op.drop_index("ix_seats_branch_id", table_name="seats")
+    for table_name in reversed(BRANCH_TABLES):
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_constraint(f"fk_{table_name}_branch_id", type_="foreignkey")
+            batch_op.drop_column("branch_id")
+    op.drop_table("branches")
@@ -0,0 +1,35 @@
+"""seat layout
+
+좌석 추천을 위해 seats 에 구역, 격자 좌표, 좌석 특성 컬럼 추가.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+LAYOUT_COLUMNS = [
+    ("zone", sa.String),
+    ("pos_x", sa.Integer),
+    ("pos_y", sa.Integer),
+    ("features", sa.String),
+]
+
+
+def upgrade():
+    with op.batch_alter_table("seats") as batch_op:
+        for column_name, column_type in LAYOUT_COLUMNS:
+            batch_op.add_column(sa.Column(column_name, column_type, nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("seats") as batch_op:
+        for column_name, _ in reversed(LAYOUT_COLUMNS):
+            batch_op.drop_column(column_name)
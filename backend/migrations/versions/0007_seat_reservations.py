@@ -0,0 +1,39 @@
+"""seat reservations
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "seat_reservations",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("seat_id", sa.String, sa.ForeignKey("seats.id"), nullable=False),
+        sa.Column("branch_id", sa.Integer, sa.ForeignKey("branches.id"), nullable=False),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("user_pass_id", sa.Integer, nullable=False),
+        sa.Column("start_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("end_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("status", sa.String, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_seat_reservations_seat_id_start_at", "seat_reservations", ["seat_id", "start_at"])
+    op.create_index("ix_seat_reservations_status_start_at", "seat_reservations", ["status", "start_at"])
+    op.create_index("ix_seat_reservations_user_id", "seat_reservations", ["user_id"])
+
+
+def downgrade():
+    op.drop_index("ix_seat_reservations_user_id", table_name="seat_reservations")
+    op.drop_index("ix_seat_reservations_status_start_at", table_name="seat_reservations")
+    op.drop_index("ix_seat_reservations_seat_id_start_at", table_name="seat_reservations")
+    op.drop_table("seat_reservations")
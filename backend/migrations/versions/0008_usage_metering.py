@@ -0,0 +1,67 @@
+"""usage metering
+
+정액 시간권 남은 시간을 분 단위(remaining_time)에서 초 단위(remaining_seconds)로 바꾸고,
+계량 시작 시각(metered_at)과 외출 시작 시각(paused_at) 추가.
+착석 중인 이용권은 좌석 착석 시각부터 계량이 이어지도록 metered_at 을 채움.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("user_passes") as batch_op:
+        batch_op.add_column(sa.Column("remaining_seconds", sa.Integer, nullable=True))
+        batch_op.add_column(sa.Column("metered_at", sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column("paused_at", sa.DateTime(timezone=True), nullable=True))
+
+    op.execute(
+        "UPDATE user_passes SET remaining_seconds = remaining_time * 60 "
+        "WHERE remaining_time IS NOT NULL"
+    )
+    op.execute(
+        "UPDATE user_passes SET metered_at = "
+        "(SELECT seats.start_at FROM seats WHERE seats.user_pass_id = user_passes.id) "
+        "WHERE remaining_time IS NOT NULL AND seat_id IS NOT NULL"
+    )
+
+    op.drop_index("ix_user_passes_remaining_time", table_name="user_passes")
+    with op.batch_alter_table("user_passes") as batch_op:
+        batch_op.drop_column("remaining_time")
+
+    op.create_index("ix_user_passes_remaining_seconds", "user_passes", ["remaining_seconds"])
+    op.create_index("ix_user_passes_metered_at", "user_passes", ["metered_at"])
+
+
+def downgrade():
+    op.drop_index("ix_user_passes_metered_at", table_name="user_passes")
+    op.drop_index("ix_user_passes_remaining_seconds", table_name="user_passes")
+
+    with op.batch_alter_table("user_passes") as batch_op:
+        batch_op.add_column(sa.Column("remaining_time", sa.Integer, nullable=True))
+
+    # 이전 방식은 좌석 착석 시각부터 남은 시간을 빼므로, 착석 중이면 착석 시각을 마지막 체크포인트로 옮김
+    op.execute(
+        "UPDATE seats SET start_at = "
+        "(SELECT user_passes.metered_at FROM user_passes WHERE user_passes.id = seats.user_pass_id) "
+        "WHERE user_pass_id IN (SELECT id FROM user_passes WHERE metered_at IS NOT NULL)"
+    )
+    op.execute(
+        "UPDATE user_passes SET remaining_time = remaining_seconds / 60 "
+        "WHERE remaining_seconds IS NOT NULL"
+    )
+    op.create_index("ix_user_passes_remaining_time", "user_passes", ["remaining_time"])
+
+    with op.batch_alter_table("user_passes") as batch_op:
+        batch_op.drop_column("paused_at")
+        batch_op.drop_column("metered_at")
+        batch_op.drop_column("remaining_seconds")
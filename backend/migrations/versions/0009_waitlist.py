@@ -0,0 +1,36 @@
+"""waitlist
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "waitlist_entries",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("branch_id", sa.Integer, sa.ForeignKey("branches.id"), nullable=False),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("priority", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("status", sa.String, nullable=False),
+        sa.Column("seat_id", sa.String, nullable=True),
+        sa.Column("offer_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_waitlist_entries_branch_id_status", "waitlist_entries", ["branch_id", "status"])
+    op.create_index("ix_waitlist_entries_user_id", "waitlist_entries", ["user_id"])
+
+
+def downgrade():
+    op.drop_index("ix_waitlist_entries_user_id", table_name="waitlist_entries")
+    op.drop_index("ix_waitlist_entries_branch_id_status", table_name="waitlist_entries")
+    op.drop_table("waitlist_entries")
@@ -0,0 +1,44 @@
+"""change log
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "change_log",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("branch_id", sa.Integer, nullable=False),
+        sa.Column("entity", sa.String, nullable=False),
+        sa.Column("entity_id", sa.String, nullable=False),
+        sa.Column("user_id", sa.Integer, nullable=True),
+        sa.Column("data", sa.Text, nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sqlite_autoincrement=True,
+    )
+    op.create_index("ix_change_log_branch_id_id", "change_log", ["branch_id", "id"])
+    op.create_index("ix_change_log_created_at", "change_log", ["created_at"])
+
+    op.create_table(
+        "change_feed_state",
+        sa.Column("branch_id", sa.Integer, primary_key=True),
+        sa.Column("version", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("pruned_id", sa.Integer, nullable=False, server_default="0"),
+    )
+
+
+def downgrade():
+    op.drop_table("change_feed_state")
+    op.drop_index("ix_change_log_created_at", table_name="change_log")
+    op.drop_index("ix_change_log_branch_id_id", table_name="change_log")
+    op.drop_table("change_log")
@@ -0,0 +1,45 @@
+"""archive tables
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "user_passes_archive",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column("user_id", sa.Integer, nullable=False),
+        sa.Column("pass_id", sa.Integer, nullable=False),
+        sa.Column("branch_id", sa.Integer, nullable=False),
+        sa.Column("expire_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("end_reason", sa.String, nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_user_passes_archive_user_id", "user_passes_archive", ["user_id"])
+
+    op.create_table(
+        "purchase_logs_archive",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column("user_id", sa.Integer, nullable=False),
+        sa.Column("pass_id", sa.Integer, nullable=False),
+        sa.Column("purchased_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("price", sa.Integer, nullable=False),
+    )
+    op.create_index("ix_purchase_logs_archive_user_id", "purchase_logs_archive", ["user_id"])
+
+
+def downgrade():
+    op.drop_index("ix_purchase_logs_archive_user_id", table_name="purchase_logs_archive")
+    op.drop_table("purchase_logs_archive")
+    op.drop_index("ix_user_passes_archive_user_id", table_name="user_passes_archive")
+    op.drop_table("user_passes_archive")
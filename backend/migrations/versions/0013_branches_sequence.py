@@ -0,0 +1,26 @@
+"""branches id sequence
+
+0005 가 본점을 id=1 로 직접 넣고 PostgreSQL 시퀀스를 맞추지 않아 첫 지점 추가가 기본키 충돌로 실패함.
+새로 만드는 DB와 이미 0005 를 적용한 DB 모두 여기서 시퀀스를 현재 최대 id 로 맞춤
+(SQLite 는 할 일 없음, 여러 번 실행해도 같음).
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_context().dialect.name == "postgresql":
+        op.execute("SELECT setval(pg_get_serial_sequence('branches', 'id'), (SELECT max(id) FROM branches))")
+
+
+def downgrade():
+    pass
@@ -0,0 +1,50 @@
+"""never reuse user_passes / purchase_logs ids
+
+보관 테이블(0012)은 원래 id 를 기본키로 쓰는데, SQLite 는 AUTOINCREMENT 가 아니면 지운 가장 큰 rowid 를
+다시 줌. 만료로 옮긴 이용권의 id 를 새 구매가 받으면 다시 옮길 때 보관 테이블 기본키가 겹쳐 만료 정리가 멈춤.
+두 테이블을 AUTOINCREMENT 로 다시 만들고, 이미 옮긴 id 보다 큰 번호부터 주도록 sqlite_sequence 를 맞춤.
+PostgreSQL 은 시퀀스가 되돌아가지 않으므로 할 일 없음.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+# (원래 테이블, 보관 테이블)
+TABLES = [("user_passes", "user_passes_archive"), ("purchase_logs", "purchase_logs_archive")]
+
+
+def upgrade():
+    if op.get_context().dialect.name != "sqlite":
+        return
+
+    for table_name, archive_name in TABLES:
+        with op.batch_alter_table(table_name, recreate="always", table_kwargs={"sqlite_autoincrement": True}):
+            pass
+        # 복사한 행으로 sqlite_sequence 행이 생기지만 빈 테이블이면 없으므로 먼저 넣어 둠
+        op.execute(
+            f"INSERT INTO sqlite_sequence (name, seq) SELECT '{table_name}', 0 "
+            f"WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = '{table_name}')"
+        )
+        op.execute(
+            f"UPDATE sqlite_sequence SET seq = max(seq, "
+            f"(SELECT coalesce(max(id), 0) FROM {table_name}), "
+            f"(SELECT coalesce(max(id), 0) FROM {archive_name})) "
+            f"WHERE name = '{table_name}'"
+        )
+
+
+def downgrade():
+    if op.get_context().dialect.name != "sqlite":
+        return
+
+    for table_name, _ in reversed(TABLES):
+        with op.batch_alter_table(table_name, recreate="always"):
+            pass
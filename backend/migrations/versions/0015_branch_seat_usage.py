@@ -0,0 +1,61 @@
+"""seat usage rollups per branch, rollup watermark time
+
+좌석 점유율 보고서를 지점별로 보도록 seat_usage_rollups 기본키에 branch_id 를 더함.
+기본키가 바뀌므로 새 테이블을 만들어 옮김. 지점 구분 없이 쌓인 기존 집계는 0005 처럼 1번 지점(본점) 것으로 둠.
+보고서가 집계를 직접 돌리지 않고 얼마나 밀렸는지 알려 주도록 rollup_watermarks 에 updated_at 추가.
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0015"
+down_revision = "0014"
+branch_labels = None
+depends_on = None
+
+
+def replace_rollups(columns: list, copy_sql: str):
+    """
+    seat_usage_rollups 를 columns 로 새로 만들고 copy_sql(SELECT ... FROM seat_usage_rollups)로 옮긴 뒤 바꿔 끼움.
+    """
+    op.create_table("seat_usage_rollups_new", *columns)
+    op.execute(f"INSERT INTO seat_usage_rollups_new {copy_sql}")
+    op.drop_table("seat_usage_rollups")
+    op.rename_table("seat_usage_rollups_new", "seat_usage_rollups")
+    if op.get_context().dialect.name == "postgresql":
+        op.execute("ALTER INDEX seat_usage_rollups_new_pkey RENAME TO seat_usage_rollups_pkey")
+
+
+def upgrade():
+    replace_rollups(
+        [
+            sa.Column("hour", sa.DateTime(timezone=True), primary_key=True),
+            sa.Column("branch_id", sa.Integer, sa.ForeignKey("branches.id"), primary_key=True),
+            sa.Column("occupied_seconds", sa.Integer, nullable=False),
+            sa.Column("sessions", sa.Integer, nullable=False),
+        ],
+        "(hour, branch_id, occupied_seconds, sessions) SELECT hour, 1, occupied_seconds, sessions FROM seat_usage_rollups",
+    )
+
+    with op.batch_alter_table("rollup_watermarks") as batch_op:
+        batch_op.add_column(sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("rollup_watermarks") as batch_op:
+        batch_op.drop_column("updated_at")
+
+    # 지점별 집계를 시간대별로 다시 합침
+    replace_rollups(
+        [
+            sa.Column("hour", sa.DateTime(timezone=True), primary_key=True),
+            sa.Column("occupied_seconds", sa.Integer, nullable=False),
+            sa.Column("sessions", sa.Integer, nullable=False),
+        ],
+        "(hour, occupied_seconds, sessions) "
+        "SELECT hour, sum(occupied_seconds), sum(sessions) FROM seat_usage_rollups GROUP BY hour",
+    )
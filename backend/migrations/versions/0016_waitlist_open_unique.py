@@ -0,0 +1,40 @@
+"""one open waitlist entry per user and branch
+
+대기 신청의 중복 확인이 메모리에서만 이뤄져 동시 요청이면 두 건이 들어갈 수 있었음.
+대기열에 남아 있는 항목(waiting/offered)에 (branch_id, user_id) 부분 유니크 인덱스를 만듦.
+이미 겹쳐 있는 항목은 가장 먼저 줄 선 것만 남기고 취소 처리.
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0016"
+down_revision = "0015"
+branch_labels = None
+depends_on = None
+
+OPEN_CONDITION = "status IN ('waiting', 'offered')"
+
+
+def upgrade():
+    op.execute(
+        f"UPDATE waitlist_entries SET status = 'cancelled' "
+        f"WHERE {OPEN_CONDITION} AND id NOT IN ("
+        f"SELECT min(id) FROM waitlist_entries WHERE {OPEN_CONDITION} GROUP BY branch_id, user_id)"
+    )
+    op.create_index(
+        "ix_waitlist_entries_open_branch_id_user_id",
+        "waitlist_entries",
+        ["branch_id", "user_id"],
+        unique=True,
+        sqlite_where=sa.text(OPEN_CONDITION),
+        postgresql_where=sa.text(OPEN_CONDITION),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_waitlist_entries_open_branch_id_user_id", table_name="waitlist_entries")
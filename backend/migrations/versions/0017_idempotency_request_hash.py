@@ -0,0 +1,27 @@
+"""idempotency key request hash
+
+같은 Idempotency-Key 로 다른 내용의 구매를 보내면 처음 응답을 돌려주던 문제를 막도록
+키와 함께 최초 요청 본문의 해시를 저장. 이전에 저장된 키는 NULL 로 두고 비교하지 않음.
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0017"
+down_revision = "0016"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("idempotency_keys") as batch_op:
+        batch_op.add_column(sa.Column("request_hash", sa.String, nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("idempotency_keys") as batch_op:
+        batch_op.drop_column("request_hash")
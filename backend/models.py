@@ -1,7 +1,7 @@
-from sqlalchemy import Table, Column, Integer, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Table, Column, Integer, String, DateTime, ForeignKey, Boolean, Text, UniqueConstraint
 from sqlalchemy.sql import func
 from databases import Database
-from sqlalchemy import MetaData
+from sqlalchemy import MetaData, Index, text
 
 metadata = MetaData()
 
@@ -15,6 +15,14 @@ users = Table(
     Column("created_at", DateTime(timezone=True), server_default=func.now()),
 )
 
+# 지점 (매장). 좌석, 이용권, 보유 이용권은 모두 한 지점에 속함
+branches = Table(
+    "branches",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+)
+
 passes = Table(
     "passes",
     metadata,
@@ -23,6 +31,7 @@ passes = Table(
     Column("pass_type", String, nullable=False),       # 'time' 또는 'time_period' 또는 'day_period'
     Column("duration", Integer, nullable=False),       # 시간권은 분 단위, 기간권은 일 단위
     Column("price", Integer, nullable=False),
+    Column("branch_id", Integer, ForeignKey("branches.id"), nullable=False, server_default="1"),  # 판매 지점
 )
 
 user_passes = Table(
@@ -32,10 +41,13 @@ user_passes = Table(
     Column("user_id", Integer, ForeignKey("users.id"), nullable=False), # ForeignKey는 다른 테이블 컬럼에 꼭 존재하는 값이어야 한다는 뜻
     Column("pass_id", Integer, ForeignKey("passes.id"), nullable=False),
     Column("expire_at", DateTime(timezone=True), nullable=True), # 기간권, 일일권용 
-    Column("remaining_time", Integer, nullable=True),            
+    Column("remaining_seconds", Integer, nullable=True),          # 정액 시간권 남은 시간 (초), metered_at 이후 사용분은 아직 빼지 않은 값
+    Column("metered_at", DateTime(timezone=True), nullable=True),  # 착석 중 계량 시작(마지막 체크포인트) 시각, 외출/퇴실 중이면 비어 있음
+    Column("paused_at", DateTime(timezone=True), nullable=True),   # 외출 시작 시각
     Column("is_active", Boolean, nullable=False),
     Column("seat_id", String, ForeignKey("seats.id"), nullable=True),
-
+    Column("branch_id", Integer, ForeignKey("branches.id"), nullable=False, server_default="1"),  # 이 지점 좌석에만 착석 가능
+    sqlite_autoincrement=True,  # 보관 테이블로 옮긴 id 를 다시 쓰지 않게 (보관 테이블 기본키가 원래 id)
 )
 
 seats = Table(
@@ -44,7 +56,13 @@ seats = Table(
     Column("id", String, primary_key=True),
     Column("is_occupied", Boolean, default=False),
     Column("user_pass_id", Integer, nullable=True),
-    Column("start_at", DateTime(timezone=True), nullable=True)
+    Column("start_at", DateTime(timezone=True), nullable=True),
+    Column("branch_id", Integer, ForeignKey("branches.id"), nullable=False, server_default="1"),
+    # 좌석 배치 (좌석 추천용, 비어 있으면 배치 정보 없는 좌석)
+    Column("zone", String, nullable=True),        # 구역 (예: 'quiet', 'open')
+    Column("pos_x", Integer, nullable=True),      # 구역 안 격자 좌표, 같은 줄(pos_y)에서 pos_x 가 1 차이면 옆자리
+    Column("pos_y", Integer, nullable=True),
+    Column("features", String, nullable=True),    # 쉼표로 구분한 좌석 특성 (예: 'outlet,window')
 )
 
 
@@ -56,4 +74,207 @@ purchase_logs = Table(
     Column("pass_id", Integer, ForeignKey("passes.id"), nullable=False),
     Column("purchased_at", DateTime(timezone=True), server_default=func.now()),
     Column("price", Integer, nullable=False),               # 구매 당시 가격 기록
+    sqlite_autoincrement=True,  # 보관 테이블로 옮긴 id 를 다시 쓰지 않게 (보관 테이블 기본키가 원래 id)
+)
+
+# 구매 요청 중복 방지용 (Idempotency-Key 헤더별 최초 응답 저장)
+idempotency_keys = Table(
+    "idempotency_keys",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("key", String, nullable=False),
+    Column("request_hash", String, nullable=True),           # 최초 요청 본문의 해시 (같은 키로 다른 요청이면 거절)
+    Column("response", Text, nullable=False),                # 최초 요청의 응답(JSON)
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    UniqueConstraint("user_id", "key"),
+)
+
+# 캐시 무효화용 버전 (예: name="passes" 는 이용권 목록이 바뀔 때마다 1씩 증가)
+catalog_versions = Table(
+    "catalog_versions",
+    metadata,
+    Column("name", String, primary_key=True),
+    Column("version", Integer, nullable=False, default=1),
+)
+
+# 로그아웃 등으로 폐기된 토큰 (토큰 원문 대신 sha256 해시 저장)
+revoked_tokens = Table(
+    "revoked_tokens",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("token_hash", String, unique=True, nullable=False),
+    Column("expires_at", DateTime(timezone=True), nullable=False),  # 토큰 원래 만료 시각, 이후엔 정리 가능
+)
+
+
+# 자주 실행되는 쿼리용 인덱스 (기존 DB에는 migrations/ 의 alembic 마이그레이션으로 추가)
+Index("ix_user_passes_user_id_pass_id", user_passes.c.user_id, user_passes.c.pass_id)  # /user/passes
+Index("ix_user_passes_seat_id", user_passes.c.seat_id)                                   # 퇴실
+Index("ix_user_passes_expire_at", user_passes.c.expire_at)                               # 만료 정리
+Index("ix_user_passes_remaining_seconds", user_passes.c.remaining_seconds)               # 만료 정리
+Index("ix_user_passes_metered_at", user_passes.c.metered_at)                             # 사용 시간 체크포인트
+Index("ix_seats_user_pass_id", seats.c.user_pass_id)                                     # 좌석 ↔ 이용권 조인
+Index("ix_purchase_logs_user_id_purchased_at", purchase_logs.c.user_id, purchase_logs.c.purchased_at)
+Index("ix_purchase_logs_purchased_at", purchase_logs.c.purchased_at)                     # 매출 집계
+Index("ix_seats_branch_id", seats.c.branch_id)                                           # 지점별 좌석 스냅샷
+Index("ix_user_passes_branch_id", user_passes.c.branch_id)                               # 지점별 만료 정리
+
+# 매출 집계 (시간 단위 버킷, purchase_logs 를 워터마크 이후만 주기적으로 반영)
+sales_rollups = Table(
+    "sales_rollups",
+    metadata,
+    Column("hour", DateTime(timezone=True), primary_key=True),   # KST 기준 정시
+    Column("pass_id", Integer, ForeignKey("passes.id"), primary_key=True),
+    Column("purchase_count", Integer, nullable=False, default=0),
+    Column("revenue", Integer, nullable=False, default=0),
+)
+
+# 좌석 이용 집계 (지점별 시간 단위 버킷, 퇴실/만료 때 누적)
+seat_usage_rollups = Table(
+    "seat_usage_rollups",
+    metadata,
+    Column("hour", DateTime(timezone=True), primary_key=True),   # KST 기준 정시
+    Column("branch_id", Integer, ForeignKey("branches.id"), primary_key=True),
+    Column("occupied_seconds", Integer, nullable=False, default=0),  # 그 시간대에 지점의 모든 좌석이 점유된 시간 합
+    Column("sessions", Integer, nullable=False, default=0),          # 그 시간대에 끝난 이용 건수
+)
+
+# 집계 작업별로 어디까지 반영했는지 기록
+rollup_watermarks = Table(
+    "rollup_watermarks",
+    metadata,
+    Column("name", String, primary_key=True),
+    Column("last_id", Integer, nullable=False, default=0),
+    Column("updated_at", DateTime(timezone=True), nullable=True),  # 마지막으로 밀린 로그를 모두 반영한 시각
+)
+
+# 좌석 이용 기록 (퇴실/만료 때 한 건씩 추가만 함)
+seat_sessions = Table(
+    "seat_sessions",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("seat_id", String, nullable=False),
+    Column("user_pass_id", Integer, nullable=False),      # 이용권은 만료되면 삭제되므로 FK 없이 보관
+    Column("user_id", Integer, nullable=True),
+    Column("pass_id", Integer, nullable=True),
+    Column("started_at", DateTime(timezone=True), nullable=False),
+    Column("ended_at", DateTime(timezone=True), nullable=False),
+    Column("used_minutes", Integer, nullable=False),
+    Column("end_reason", String, nullable=False),          # 'leave' 또는 'expired'
+)
+Index("ix_seat_sessions_ended_at", seat_sessions.c.ended_at)
+Index("ix_seat_sessions_user_id", seat_sessions.c.user_id)
+
+# 좌석 예약 (시간대 단위, 'booked' → 'checked_in'/'completed' 또는 'cancelled'/'no_show')
+seat_reservations = Table(
+    "seat_reservations",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("seat_id", String, ForeignKey("seats.id"), nullable=False),
+    Column("branch_id", Integer, ForeignKey("branches.id"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("user_pass_id", Integer, nullable=False),       # 착석할 때 쓸 이용권
+    Column("start_at", DateTime(timezone=True), nullable=False),
+    Column("end_at", DateTime(timezone=True), nullable=False),
+    Column("status", String, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+Index("ix_seat_reservations_seat_id_start_at", seat_reservations.c.seat_id, seat_reservations.c.start_at)  # 예약 충돌 확인
+Index("ix_seat_reservations_status_start_at", seat_reservations.c.status, seat_reservations.c.start_at)    # 노쇼 정리
+Index("ix_seat_reservations_user_id", seat_reservations.c.user_id)
+
+# 만석일 때 좌석 대기열 ('waiting' → 'offered' → 'seated', 또는 'cancelled'/'expired')
+waitlist_entries = Table(
+    "waitlist_entries",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("branch_id", Integer, ForeignKey("branches.id"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("priority", Integer, nullable=False, server_default="0"),  # 클수록 먼저, 같으면 먼저 줄 선 순서
+    Column("status", String, nullable=False),
+    Column("seat_id", String, nullable=True),                          # 제안받은 좌석
+    Column("offer_expires_at", DateTime(timezone=True), nullable=True),  # 이 시각까지 착석하지 않으면 다음 대기자에게 넘어감
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+Index("ix_waitlist_entries_branch_id_status", waitlist_entries.c.branch_id, waitlist_entries.c.status)  # 대기열 읽기
+Index("ix_waitlist_entries_user_id", waitlist_entries.c.user_id)
+# 한 사용자는 지점마다 대기열에 하나만 (동시에 대기 신청해도 한 건만 들어감)
+Index(
+    "ix_waitlist_entries_open_branch_id_user_id",
+    waitlist_entries.c.branch_id,
+    waitlist_entries.c.user_id,
+    unique=True,
+    sqlite_where=text("status IN ('waiting', 'offered')"),
+    postgresql_where=text("status IN ('waiting', 'offered')"),
+)
+
+# 좌석/보유 이용권 변경 기록 (GET /changes 증분 동기화). id 가 커서, 같은 지점 안에서는 커밋 순서대로 커짐
+change_log = Table(
+    "change_log",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("branch_id", Integer, nullable=False),
+    Column("entity", String, nullable=False),              # 'seat' 또는 'user_pass'
+    Column("entity_id", String, nullable=False),           # 좌석 id 또는 user_pass id
+    Column("user_id", Integer, nullable=True),             # 보유 이용권 변경은 주인에게만 보냄
+    Column("data", Text, nullable=True),                   # 바뀐 뒤 상태(JSON), 삭제면 NULL
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    sqlite_autoincrement=True,  # 기록을 모두 지워도 id 를 다시 쓰지 않게 (커서가 되돌아가지 않도록)
+)
+Index("ix_change_log_branch_id_id", change_log.c.branch_id, change_log.c.id)  # 커서 이후 변경 읽기
+Index("ix_change_log_created_at", change_log.c.created_at)                  # 오래된 기록 정리
+
+# 지점별 변경 기록 상태
+change_feed_state = Table(
+    "change_feed_state",
+    metadata,
+    Column("branch_id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False, default=0),    # 기록할 때마다 올려 지점별 행 잠금으로 씀
+    Column("pruned_id", Integer, nullable=False, default=0),  # 지운 기록의 마지막 id (이보다 작은 커서는 reset)
+)
+
+# 사용자 알림 아웃박스 (만료 임박, 좌석 자동 반납). 상태를 바꾼 트랜잭션에서 넣고 백그라운드 발송기가 보냄
+notification_outbox = Table(
+    "notification_outbox",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, nullable=False),
+    Column("kind", String, nullable=False),                  # 'expiry_warning' 또는 'seat_freed'
+    Column("dedupe_key", String, nullable=False, unique=True),  # 같은 알림을 두 번 넣지 않도록
+    Column("payload", Text, nullable=False),                 # 보낼 내용(JSON)
+    Column("status", String, nullable=False),                # 'pending' → 'sent' 또는 'failed'
+    Column("attempts", Integer, nullable=False, default=0),
+    Column("next_attempt_at", DateTime(timezone=True), nullable=False),  # 재시도 시각, 발송 중이면 임대 만료 시각
+    Column("last_error", Text, nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("sent_at", DateTime(timezone=True), nullable=True),
+)
+Index("ix_notification_outbox_status_next_attempt_at", notification_outbox.c.status, notification_outbox.c.next_attempt_at)  # 발송 대상
+
+# 보관(cold) 테이블: 만료/소진된 보유 이용권과 오래된 구매 로그를 옮겨 둠. id 는 원래 테이블 id 그대로
+# (원래 테이블은 AUTOINCREMENT 라 옮긴 id 를 다시 쓰지 않음, 0014)
+# 조회가 드물어 사용자별 인덱스 하나만 둠
+user_passes_archive = Table(
+    "user_passes_archive",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("user_id", Integer, nullable=False),
+    Column("pass_id", Integer, nullable=False),
+    Column("branch_id", Integer, nullable=False),
+    Column("expire_at", DateTime(timezone=True), nullable=True),
+    Column("end_reason", String, nullable=False),            # 'expired'(기간 만료) 또는 'used_up'(시간 소진)
+    Column("archived_at", DateTime(timezone=True), nullable=False),
+)
+Index("ix_user_passes_archive_user_id", user_passes_archive.c.user_id)
+
+purchase_logs_archive = Table(
+    "purchase_logs_archive",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("user_id", Integer, nullable=False),
+    Column("pass_id", Integer, nullable=False),
+    Column("purchased_at", DateTime(timezone=True), nullable=False),
+    Column("price", Integer, nullable=False),
 )
+Index("ix_purchase_logs_archive_user_id", purchase_logs_archive.c.user_id)
@@ -0,0 +1,385 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+import urllib.request
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from database import database
+from analytics import upsert
+from models import notification_outbox, seats, user_passes
+from seat_state import to_kst
+from pass_catalog import pass_catalog
+from branches import OWNED_BRANCH_IDS
+from metrics import metrics
+from fast_json import dumps
+import pytz
+KST = pytz.timezone("Asia/Seoul")
+
+logger = logging.getLogger(__name__)
+
+# 알림 발송 방법: log (로그만), file:<경로> (JSON 한 줄씩 파일에 추가), webhook:<URL> (배치를 POST)
+NOTIFY_SENDER = os.getenv("NOTIFY_SENDER", "log")
+# 만료/소진 몇 분 전에 알릴지
+EXPIRY_WARNING_MINUTES = int(os.getenv("EXPIRY_WARNING_MINUTES", "10"))
+
+DISPATCH_SECONDS = 5      # 보낼 알림 확인 간격 (초)
+SCAN_SECONDS = 60         # 만료 임박 이용권 확인 간격 (초)
+BATCH_SIZE = 100          # 한 번에 보내는 알림 수
+LEASE_SECONDS = 60        # 발송 중인 알림을 다른 워커가 가져가지 않는 시간 (초)
+MAX_ATTEMPTS = 8          # 이만큼 실패하면 'failed' 로 두고 더 보내지 않음
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+OUTBOX_RETENTION = timedelta(days=7)  # 보낸 알림 보관 기간
+WEBHOOK_TIMEOUT_SECONDS = 10
+ENQUEUE_BATCH_SIZE = 500  # INSERT 한 번에 넣는 알림 수 (바인드 변수 한도 안)
+
+
+def outbox_row(user_id: int, kind: str, dedupe_key: str, payload: dict, now: datetime) -> dict:
+    return {
+        "user_id": user_id,
+        "kind": kind,
+        "dedupe_key": dedupe_key,
+        "payload": dumps(payload).decode("utf-8"),
+        "status": "pending",
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+    }
+
+
+def seat_freed_row(seat, now: datetime) -> dict:
+    """
+    만료로 자동 반납된 좌석 알림 (seat 는 만료 스위퍼가 읽은 좌석 행).
+    """
+    return outbox_row(
+        seat["user_id"],
+        "seat_freed",
+        f"seat_freed:{seat['user_pass_id']}",
+        {
+            "title": "좌석 자동 반납",
+            "message": f"이용 시간이 끝나 {seat['id']} 좌석이 반납되었습니다.",
+            "seat_id": seat["id"],
+            "user_pass_id": seat["user_pass_id"],
+        },
+        now,
+    )
+
+
+async def enqueue(rows: List[dict]) -> int:
+    """
+    알림을 아웃박스에 넣고 새로 들어간 수를 반환. 상태를 바꾼 트랜잭션 안에서 호출해 변경과 알림이 함께 커밋되게 함.
+    이미 있는 dedupe_key 는 ON CONFLICT DO NOTHING 으로 건너뛰므로, 여러 워커가 같은 알림을 동시에 넣어도
+    한 번만 들어가고 트랜잭션이 실패하지 않음. 실제 발송은 NotificationDispatcher 가 요청 처리와 분리해서 함.
+    """
+    # 같은 묶음 안의 중복은 먼저 하나로 (한 INSERT 안에서 겹치면 PostgreSQL 이 거절함)
+    new_rows = list({row["dedupe_key"]: row for row in rows}.values())
+    added = 0
+    for start in range(0, len(new_rows), ENQUEUE_BATCH_SIZE):
+        inserted = await database.fetch_all(
+            upsert(notification_outbox)
+            .values(new_rows[start:start + ENQUEUE_BATCH_SIZE])
+            .on_conflict_do_nothing(index_elements=["dedupe_key"])
+            .returning(notification_outbox.c.id)
+        )
+        added += len(inserted)
+    return added
+
+
+class LogSender:
+    """
+    로그로만 남기는 발송기 (개발용 기본값).
+    """
+
+    async def send(self, batch: List[dict]) -> List[int]:
+        for notification in batch:
+            logger.info("알림 user=%s %s", notification["user_id"], notification["payload"]["message"])
+        return [notification["id"] for notification in batch]
+
+
+class FileSender:
+    """
+    알림을 JSON 한 줄씩 파일에 덧붙이는 발송기 (로컬 확인, 테스트용).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _write(self, batch: List[dict]):
+        with open(self.path, "a", encoding="utf-8") as file:
+            for notification in batch:
+                file.write(json.dumps(notification, ensure_ascii=False) + "\n")
+
+    async def send(self, batch: List[dict]) -> List[int]:
+        await asyncio.to_thread(self._write, batch)
+        return [notification["id"] for notification in batch]
+
+
+class WebhookSender:
+    """
+    배치를 {"notifications": [...]} 로 한 번에 POST 하는 발송기 (푸시/문자 발송 서비스 앞단).
+    받는 쪽은 알림 id 로 중복을 거르면 됨 (임대 만료 후 재발송될 수 있음).
+    """
+
+    def __init__(self, url: str, timeout: float = WEBHOOK_TIMEOUT_SECONDS):
+        self.url = url
+        self.timeout = timeout
+
+    def _post(self, batch: List[dict]):
+        request = urllib.request.Request(
+            self.url,
+            data=dumps({"notifications": batch}),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    async def send(self, batch: List[dict]) -> List[int]:
+        await asyncio.to_thread(self._post, batch)
+        return [notification["id"] for notification in batch]
+
+
+def sender_from_env(value: str):
+    if value.startswith("file:"):
+        return FileSender(value[len("file:"):])
+    if value.startswith("webhook:"):
+        return WebhookSender(value[len("webhook:"):])
+    return LogSender()
+
+
+def backoff_seconds(attempts: int) -> float:
+    """
+    attempts 번 실패한 알림의 다음 시도까지 대기 시간 (지수 증가, 여러 알림이 한꺼번에 몰리지 않게 조금 흔듦).
+    """
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.9, 1.1)
+
+
+class NotificationDispatcher:
+    """
+    아웃박스의 알림을 배치로 꺼내 발송기(sender)로 보내는 백그라운드 작업.
+    꺼낼 때 next_attempt_at 을 임대 만료 시각으로 밀어 두므로 여러 워커가 같은 알림을 동시에 보내지 않고,
+    실패하면 지수 백오프로 다시 시도함. 만료 임박 이용권도 주기적으로 찾아 알림을 넣음.
+    branch_ids 를 주면 그 지점 이용권만 확인함 (워커별 담당 지점).
+    """
+
+    def __init__(
+        self,
+        sender=None,
+        batch_size: int = BATCH_SIZE,
+        interval: float = DISPATCH_SECONDS,
+        scan_interval: float = SCAN_SECONDS,
+        warning: timedelta = timedelta(minutes=EXPIRY_WARNING_MINUTES),
+        branch_ids: Optional[set] = None,
+    ):
+        self.sender = sender or LogSender()
+        self.batch_size = batch_size
+        self.interval = interval
+        self.scan_interval = scan_interval
+        self.warning = warning
+        self.branch_ids = branch_ids
+        self.sent_count = 0
+        self.failed_count = 0
+        self._wakeup = asyncio.Event()
+
+    def wake(self):
+        """
+        알림을 넣은 트랜잭션이 커밋된 뒤 호출하면 다음 주기를 기다리지 않고 바로 보냄.
+        """
+        self._wakeup.set()
+
+    def _owned(self, query):
+        if self.branch_ids is None:
+            return query
+        return query.where(user_passes.c.branch_id.in_(self.branch_ids))
+
+    async def _warning_row(self, record, deadline: datetime, dedupe_key: str, now: datetime) -> dict:
+        selected_pass = await pass_catalog.get_pass(record["pass_id"])
+        name = selected_pass["name"] if selected_pass else "이용권"
+        minutes = max(int((deadline - now).total_seconds() // 60), 0)
+        return outbox_row(
+            record["user_id"],
+            "expiry_warning",
+            dedupe_key,
+            {
+                "title": "이용권 만료 예정",
+                "message": f"{name} 이용 시간이 {minutes}분 남았습니다.",
+                "user_pass_id": record["id"],
+                "expires_at": deadline,
+            },
+            now,
+        )
+
+    async def scan_expiring(self, now: Optional[datetime] = None) -> int:
+        """
+        만료/소진까지 warning 이하로 남은 이용권에 만료 예정 알림을 넣음.
+        기간권/시간권은 이용권마다 한 번, 정액 시간권은 착석(좌석 이용)마다 한 번.
+        branch_ids(OWNED_BRANCHES) 지점만 확인. 비워 둬서 여러 워커가 같은 지점을 확인해도 dedupe_key 로 한 번만 들어감.
+        """
+        now = now or datetime.now(KST)
+        horizon = now + self.warning
+        rows = []
+
+        expiring = await database.fetch_all(self._owned(
+            select(user_passes.c.id, user_passes.c.user_id, user_passes.c.pass_id, user_passes.c.expire_at)
+            .where(user_passes.c.expire_at > now)
+            .where(user_passes.c.expire_at <= horizon)
+        ))
+        for record in expiring:
+            rows.append(await self._warning_row(record, to_kst(record["expire_at"]), f"expiry_warning:{record['id']}", now))
+
+        # 계량 중인 정액 시간권 (외출 중이면 시간이 멈춰 있으므로 제외)
+        metered = await database.fetch_all(self._owned(
+            select(
+                user_passes.c.id,
+                user_passes.c.user_id,
+                user_passes.c.pass_id,
+                user_passes.c.remaining_seconds,
+                user_passes.c.metered_at,
+                seats.c.start_at,
+            )
+            .select_from(user_passes.join(seats, seats.c.user_pass_id == user_passes.c.id))
+            .where(user_passes.c.remaining_seconds.is_not(None))
+            .where(user_passes.c.metered_at.is_not(None))
+        ))
+        for record in metered:
+            deadline = to_kst(record["metered_at"]) + timedelta(seconds=record["remaining_seconds"])
+            if now < deadline <= horizon:
+                session = f"{to_kst(record['start_at']):%Y%m%d%H%M%S}"
+                rows.append(await self._warning_row(record, deadline, f"expiry_warning:{record['id']}:{session}", now))
+
+        async with database.transaction():
+            added = await enqueue(rows)
+        if added:
+            logger.info("만료 예정 알림 %d건 추가", added)
+        return added
+
+    async def dispatch(self, now: Optional[datetime] = None) -> int:
+        """
+        보낼 차례인 알림을 한 배치 꺼내 보내고, 꺼낸 알림 수를 반환.
+        """
+        now = now or datetime.now(KST)
+        due = (
+            select(notification_outbox.c.id)
+            .where(notification_outbox.c.status == "pending")
+            .where(notification_outbox.c.next_attempt_at <= now)
+            .order_by(notification_outbox.c.id)
+            .limit(self.batch_size)
+        )
+        # 꺼내면서 임대를 걸어 둠. 바깥 조건도 다시 확인해서 동시에 꺼낸 다른 워커와 겹치지 않게 함
+        claimed = await database.fetch_all(
+            notification_outbox.update()
+            .where(notification_outbox.c.id.in_(due.scalar_subquery()))
+            .where(notification_outbox.c.status == "pending")
+            .where(notification_outbox.c.next_attempt_at <= now)
+            .values(next_attempt_at=now + timedelta(seconds=LEASE_SECONDS))
+            .returning(
+                notification_outbox.c.id,
+                notification_outbox.c.user_id,
+                notification_outbox.c.kind,
+                notification_outbox.c.payload,
+                notification_outbox.c.attempts,
+            )
+        )
+        if not claimed:
+            return 0
+
+        batch = [
+            {
+                "id": record["id"],
+                "user_id": record["user_id"],
+                "kind": record["kind"],
+                "payload": json.loads(record["payload"]),
+            }
+            for record in claimed
+        ]
+        error = None
+        try:
+            delivered = set(await self.sender.send(batch))
+        except Exception as exc:
+            logger.warning("알림 %d건 발송 실패: %s", len(batch), exc)
+            delivered = set()
+            error = str(exc)
+
+        finished_at = datetime.now(KST)
+        if delivered:
+            await database.execute(
+                notification_outbox.update()
+                .where(notification_outbox.c.id.in_(delivered))
+                .values(status="sent", sent_at=finished_at, last_error=None)
+            )
+
+        # 실패한 알림은 실패 횟수가 같은 것끼리 모아 다음 시도 시각을 정함
+        failed_by_attempts: Dict[int, List[int]] = defaultdict(list)
+        for record in claimed:
+            if record["id"] not in delivered:
+                failed_by_attempts[record["attempts"] + 1].append(record["id"])
+        for attempts, ids in failed_by_attempts.items():
+            await database.execute(
+                notification_outbox.update()
+                .where(notification_outbox.c.id.in_(ids))
+                .values(
+                    attempts=attempts,
+                    status="failed" if attempts >= MAX_ATTEMPTS else "pending",
+                    next_attempt_at=finished_at + timedelta(seconds=backoff_seconds(attempts)),
+                    last_error=error or "발송기가 전달하지 못함",
+                )
+            )
+
+        self.sent_count += len(delivered)
+        self.failed_count += len(claimed) - len(delivered)
+        return len(claimed)
+
+    async def prune(self, now: Optional[datetime] = None):
+        now = now or datetime.now(KST)
+        await database.execute(
+            notification_outbox.delete()
+            .where(notification_outbox.c.status == "sent")
+            .where(notification_outbox.c.sent_at < now - OUTBOX_RETENTION)
+        )
+
+    async def run(self):
+        """
+        lifespan 에서 백그라운드 태스크로 실행하는 발송 루프. 배치가 가득 차면 쉬지 않고 이어서 보냄.
+        """
+        last_scan = None
+        while True:
+            claimed = 0
+            # 발송하는 동안 들어온 wake() 를 놓치지 않도록 먼저 지움
+            self._wakeup.clear()
+            try:
+                if last_scan is None or time.monotonic() - last_scan >= self.scan_interval:
+                    last_scan = time.monotonic()
+                    await self.scan_expiring()
+                    await self.prune()
+                claimed = await self.dispatch()
+            except Exception:
+                logger.exception("알림 발송 실패")
+
+            if claimed >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+# 앱 전체에서 공유하는 알림 발송기 (이 워커가 맡은 지점만 만료 예정 확인)
+notification_dispatcher = NotificationDispatcher(sender=sender_from_env(NOTIFY_SENDER), branch_ids=OWNED_BRANCH_IDS)
+
+
+def render_notification_metrics() -> List[str]:
+    return [
+        "# HELP notifications_total 이 워커가 처리한 알림 발송 시도 (result=sent|failed)",
+        "# TYPE notifications_total counter",
+        f'notifications_total{{result="sent"}} {notification_dispatcher.sent_count}',
+        f'notifications_total{{result="failed"}} {notification_dispatcher.failed_count}',
+    ]
+
+
+metrics.add_collector(render_notification_metrics)
@@ -0,0 +1,133 @@
+import asyncio
+import hashlib
+import time
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select
+from database import database, reader
+from models import passes, catalog_versions
+from fast_json import dumps
+
+# 다른 워커가 이용권 목록을 바꿨는지 버전 행을 확인하는 간격 (초)
+CATALOG_CHECK_SECONDS = 30
+# 목록에 없는 pass_id 로 요청이 와도 버전 확인/다시 읽기는 이 간격(초)에 한 번까지만
+CATALOG_MISS_CHECK_SECONDS = 5
+CATALOG_NAME = "passes"
+
+
+async def bump_catalog_version():
+    """
+    이용권 목록을 바꾼 트랜잭션 안에서 호출. 모든 워커가 다음 확인 때 목록을 다시 읽게 됨.
+    """
+    updated = await database.fetch_one(
+        catalog_versions.update()
+        .where(catalog_versions.c.name == CATALOG_NAME)
+        .values(version=catalog_versions.c.version + 1)
+        .returning(catalog_versions.c.version)
+    )
+    if not updated:
+        await database.execute(catalog_versions.insert().values(name=CATALOG_NAME, version=1))
+
+
+def serialize(items: list) -> Tuple[bytes, str]:
+    body = dumps(items)
+    return body, '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+
+
+EMPTY_LISTING = serialize([])
+
+
+class PassCatalog:
+    """
+    자주 바뀌지 않는 이용권 목록을 프로세스 메모리에 올려 두는 캐시.
+    지점별 /passes 응답은 미리 직렬화한 JSON 바이트와 ETag 로 내려주고,
+    구매 시 pass_id 조회도 DB 없이 처리함.
+    """
+
+    def __init__(
+        self,
+        check_interval: float = CATALOG_CHECK_SECONDS,
+        miss_check_interval: float = CATALOG_MISS_CHECK_SECONDS,
+    ):
+        self.check_interval = check_interval
+        self.miss_check_interval = miss_check_interval
+        self._miss_checked_at: Optional[float] = None
+        self.version: Optional[int] = None
+        self._listings: Dict[int, Tuple[bytes, str]] = {}  # branch_id → (JSON 바이트, ETag)
+        self._by_id: Dict[int, dict] = {}
+        self._checked_at = 0.0
+        self._loaded = False
+        self._written_at: Optional[float] = None  # 이 워커에서 목록을 바꾼 시각, 복제 지연 동안은 주 DB에서 읽음
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        """
+        이 워커에서 이용권을 추가/수정한 뒤 호출. 다음 조회 때 주 DB에서 다시 읽음.
+        """
+        self._loaded = False
+        self._written_at = time.monotonic()
+
+    async def _read_version(self) -> Optional[int]:
+        record = await reader(self._written_at).fetch_one(
+            select(catalog_versions.c.version).where(catalog_versions.c.name == CATALOG_NAME)
+        )
+        return record["version"] if record else None
+
+    async def load(self):
+        """
+        DB에서 이용권 목록을 읽어 캐시를 다시 만듦. 앱 시작(lifespan) 때 호출.
+        """
+        version = await self._read_version()
+        records = await reader(self._written_at).fetch_all(passes.select().order_by(passes.c.id))
+        items = [dict(record) for record in records]
+
+        by_branch: Dict[int, list] = {}
+        for item in items:
+            by_branch.setdefault(item["branch_id"], []).append(item)
+
+        self._by_id = {item["id"]: item for item in items}
+        self._listings = {branch_id: serialize(branch_items) for branch_id, branch_items in by_branch.items()}
+        self.version = version
+        self._checked_at = time.monotonic()
+        self._loaded = True
+
+    async def refresh(self, force: bool = False):
+        """
+        확인 간격이 지났으면 버전 행만 읽어 보고, 바뀌었을 때만 목록을 다시 읽음.
+        """
+        if self._loaded and not force and time.monotonic() - self._checked_at < self.check_interval:
+            return
+
+        async with self._lock:
+            if self._loaded and not force and time.monotonic() - self._checked_at < self.check_interval:
+                return
+
+            if not self._loaded or await self._read_version() != self.version:
+                await self.load()
+            else:
+                self._checked_at = time.monotonic()
+
+    async def listing(self, branch_id: int) -> Tuple[bytes, str]:
+        """
+        지점의 이용권 목록 (JSON 바이트, ETag).
+        """
+        await self.refresh()
+        return self._listings.get(branch_id, EMPTY_LISTING)
+
+    async def get_pass(self, pass_id: int) -> Optional[dict]:
+        await self.refresh()
+        selected_pass = self._by_id.get(pass_id)
+
+        # 다른 워커에서 방금 추가된 이용권일 수 있으니 없을 때만 한 번 더 확인
+        # (없는 id 를 바꿔 가며 요청해도 miss_check_interval 에 한 번까지만 DB를 봄)
+        if selected_pass is None and (
+            self._miss_checked_at is None or time.monotonic() - self._miss_checked_at >= self.miss_check_interval
+        ):
+            self._miss_checked_at = time.monotonic()
+            await self.refresh(force=True)
+            selected_pass = self._by_id.get(pass_id)
+
+        return selected_pass
+
+
+# 앱 전체에서 공유하는 이용권 목록 캐시
+pass_catalog = PassCatalog()
@@ -0,0 +1,137 @@
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, List, Optional
+from fastapi import Depends, HTTPException, Request, status
+from metrics import metrics
+
+# 0 이면 제한하지 않음 (부하 테스트 등)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+# 앱 앞에 있는 신뢰하는 프록시(nginx, 로드밸런서 등) 수. 0 이면 X-Forwarded-For 를 보지 않고 접속 주소를 씀.
+# N 이면 X-Forwarded-For 의 오른쪽에서 N 번째 주소(가장 바깥 신뢰 프록시가 붙인 주소)를 클라이언트 IP로 씀.
+# 왼쪽 주소들은 클라이언트가 마음대로 넣을 수 있으므로 쓰면 안 됨 (바꿔 가며 IP 기준 제한을 피할 수 있음).
+# 예: nginx 하나 → 1, 로드밸런서 → nginx → 2
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+# 제한기 하나가 기억하는 최대 키 수 (넘으면 가장 오래 안 쓴 키부터 버림)
+MAX_KEYS = 100000
+# hit 한 번마다 앞쪽에서 확인하는 다 찬(유휴) 키 수
+EVICT_PER_HIT = 2
+
+# 만들어진 제한기 목록 (메트릭용)
+limiters: List["RateLimiter"] = []
+
+
+class RateLimiter:
+    """
+    키별 토큰 버킷 제한기 (GCRA). period 초 동안 limit 번까지, 한꺼번에 limit 번 몰아서 써도 됨.
+    키마다 "버킷이 다시 가득 차는 시각" 하나만 저장하므로 키당 메모리가 일정하고,
+    버킷이 가득 찬(그동안 요청이 없던) 키는 hit 할 때마다 조금씩 앞에서부터 지움.
+    워커 프로세스마다 따로 세므로 실제 허용량은 워커 수만큼 늘어남.
+    """
+
+    def __init__(self, name: str, limit: int, period: float, max_keys: int = MAX_KEYS):
+        self.name = name
+        self.limit = limit
+        self.period = period
+        self.interval = period / limit
+        self.max_keys = max_keys
+        self._full_at: "OrderedDict[Hashable, float]" = OrderedDict()
+        self.rejected_count = 0
+        limiters.append(self)
+
+    def __len__(self):
+        return len(self._full_at)
+
+    def hit(self, key: Hashable, now: Optional[float] = None) -> float:
+        """
+        요청 한 번을 셈. 허용되면 0, 아니면 다시 시도할 수 있을 때까지 남은 초.
+        """
+        now = time.monotonic() if now is None else now
+        full_at = max(self._full_at.get(key, now), now) + self.interval
+        allowed_at = full_at - self.period
+        if allowed_at > now:
+            # 거절된 요청은 버킷을 쓰지 않음 (계속 두드려도 대기 시간이 늘지 않음)
+            self.rejected_count += 1
+            return allowed_at - now
+
+        self._full_at[key] = full_at
+        self._full_at.move_to_end(key)
+        self._evict(now)
+        return 0.0
+
+    def _evict(self, now: float):
+        # 맨 앞은 가장 오래전에 쓴 키. 버킷이 다 찼으면 기억할 필요가 없음
+        for _ in range(EVICT_PER_HIT):
+            if not self._full_at:
+                return
+            key, full_at = next(iter(self._full_at.items()))
+            if full_at > now:
+                break
+            del self._full_at[key]
+        while len(self._full_at) > self.max_keys:
+            self._full_at.popitem(last=False)
+
+
+def enforce(limiter: RateLimiter, key: Hashable):
+    """
+    제한을 넘었으면 429 (Retry-After 헤더에 다시 시도할 수 있는 초).
+    """
+    if not RATE_LIMIT_ENABLED:
+        return
+    retry_after = limiter.hit(key)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="요청이 너무 많습니다. 잠시 후 다시 시도해 주세요.",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def client_ip(request: Request, trusted_hops: int = TRUSTED_PROXY_HOPS) -> str:
+    if trusted_hops > 0:
+        # 프록시는 받은 요청의 접속 주소를 오른쪽 끝에 붙이므로 오른쪽에서 trusted_hops 번째가 신뢰 프록시가 본 주소
+        forwarded = [
+            address.strip()
+            for header in request.headers.getlist("x-forwarded-for")
+            for address in header.split(",")
+            if address.strip()
+        ]
+        if len(forwarded) >= trusted_hops:
+            return forwarded[-trusted_hops]
+    return request.client.host if request.client else "unknown"
+
+
+def limit_by_ip(limiter: RateLimiter) -> Callable:
+    """
+    클라이언트 IP 기준 제한 의존성. 라우트의 dependencies=[Depends(...)] 로 씀 (본문 검증/DB 조회 전에 걸러짐).
+    """
+    async def dependency(request: Request):
+        enforce(limiter, client_ip(request))
+    return dependency
+
+
+def limit_by_user(limiter: RateLimiter, get_user: Callable) -> Callable:
+    """
+    로그인 사용자 기준 제한 의존성. get_user 는 라우트와 같은 의존성을 넘겨 요청당 한 번만 실행되게 함.
+    """
+    async def dependency(user_id: int = Depends(get_user)):
+        enforce(limiter, user_id)
+    return dependency
+
+
+def render_rate_limit_metrics() -> List[str]:
+    lines = [
+        "# HELP rate_limited_total 이 워커에서 횟수 제한으로 거절한 요청",
+        "# TYPE rate_limited_total counter",
+    ]
+    lines += [f'rate_limited_total{{policy="{limiter.name}"}} {limiter.rejected_count}' for limiter in limiters]
+    lines += [
+        "# HELP rate_limit_keys 횟수 제한기가 기억하고 있는 키 수",
+        "# TYPE rate_limit_keys gauge",
+    ]
+    lines += [f'rate_limit_keys{{policy="{limiter.name}"}} {len(limiter)}' for limiter in limiters]
+    return lines
+
+
+metrics.add_collector(render_rate_limit_metrics)
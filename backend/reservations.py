@@ -0,0 +1,227 @@
+import asyncio
+import logging
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from database import database
+from models import seat_reservations
+from seat_state import to_kst
+from branches import OWNED_BRANCH_IDS
+import pytz
+KST = pytz.timezone("Asia/Seoul")
+
+logger = logging.getLogger(__name__)
+
+# 예약 시작 후 이 시간 안에 착석하지 않으면 노쇼로 보고 좌석을 풀어 줌
+NO_SHOW_GRACE = timedelta(minutes=15)
+# 예약 시작 전 이 시간부터는 예약자 외에 착석할 수 없음
+WALK_IN_BUFFER = timedelta(minutes=30)
+# 노쇼 정리 + 다른 워커에서 생긴 예약 반영 주기 (초)
+RESERVATION_CHECK_SECONDS = 30
+
+# 좌석을 막고 있는 예약 상태 (이 상태인 예약끼리는 시간이 겹칠 수 없음)
+ACTIVE_STATUSES = ("booked", "checked_in")
+
+
+class SeatIntervals:
+    """
+    한 좌석의 예약 시간대 목록. 같은 좌석의 예약은 서로 겹치지 않으므로
+    시작 시각 순으로 정렬하면 종료 시각도 정렬되어, 겹침 확인과 구간 조회를 이진 탐색으로 처리함.
+    """
+
+    def __init__(self):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+        self.items: List[dict] = []
+
+    def conflict(self, start_at: datetime, end_at: datetime) -> Optional[dict]:
+        # [start_at, end_at) 와 겹치는 예약. 겹칠 수 있는 건 end_at 보다 먼저 시작하는 마지막 예약뿐
+        index = bisect_left(self.starts, end_at) - 1
+        if index >= 0 and self.ends[index] > start_at:
+            return self.items[index]
+        return None
+
+    def overlapping(self, start_at: datetime, end_at: datetime) -> List[dict]:
+        first = bisect_right(self.ends, start_at)
+        last = bisect_left(self.starts, end_at)
+        return self.items[first:last]
+
+    def add(self, reservation: dict):
+        index = bisect_left(self.starts, reservation["start_at"])
+        self.starts.insert(index, reservation["start_at"])
+        self.ends.insert(index, reservation["end_at"])
+        self.items.insert(index, reservation)
+
+    def remove(self, reservation: dict):
+        for index, item in enumerate(self.items):
+            if item is reservation:
+                del self.starts[index], self.ends[index], self.items[index]
+                return
+
+
+def reservation_values(record) -> dict:
+    return {
+        "id": record["id"],
+        "seat_id": record["seat_id"],
+        "branch_id": record["branch_id"],
+        "user_id": record["user_id"],
+        "user_pass_id": record["user_pass_id"],
+        "start_at": to_kst(record["start_at"]),
+        "end_at": to_kst(record["end_at"]),
+        "status": record["status"],
+    }
+
+
+class ReservationBook:
+    """
+    끝나지 않은 좌석 예약을 좌석별 SeatIntervals 로 들고 있는 메모리 인덱스.
+    앱 시작 때 DB에서 읽고, 주기적으로 다시 읽어 다른 워커의 예약을 반영함.
+    예약 가능 여부/하루 예약 현황 조회는 DB 없이 여기서 처리하고,
+    예약 저장 때만 같은 좌석 예약을 DB에서 한 번 더 확인함.
+    branch_ids 를 주면 그 지점 예약만 다룸 (워커별 담당 지점).
+    """
+
+    def __init__(self, check_interval: float = RESERVATION_CHECK_SECONDS, branch_ids: Optional[set] = None):
+        self.check_interval = check_interval
+        self.branch_ids = branch_ids
+        self._by_seat: Dict[str, SeatIntervals] = {}
+        self._by_id: Dict[int, dict] = {}
+
+    def _owned(self, query):
+        if self.branch_ids is None:
+            return query
+        return query.where(seat_reservations.c.branch_id.in_(self.branch_ids))
+
+    async def load(self, now: Optional[datetime] = None):
+        """
+        끝나지 않은 예약으로 인덱스를 다시 만듦. 앱 시작(lifespan) 때와 주기적으로 호출.
+        """
+        now = now or datetime.now(KST)
+        records = await database.fetch_all(self._owned(
+            seat_reservations.select()
+            .where(seat_reservations.c.status.in_(ACTIVE_STATUSES))
+            .where(seat_reservations.c.end_at > now)
+        ))
+
+        by_seat: Dict[str, SeatIntervals] = {}
+        by_id: Dict[int, dict] = {}
+        for record in records:
+            reservation = reservation_values(record)
+            by_seat.setdefault(reservation["seat_id"], SeatIntervals()).add(reservation)
+            by_id[reservation["id"]] = reservation
+
+        # 읽는 동안 이 워커에서 저장 중이던 예약(id 없음)은 유지
+        for seat_id, intervals in self._by_seat.items():
+            for reservation in intervals.items:
+                if reservation["id"] is None:
+                    by_seat.setdefault(seat_id, SeatIntervals()).add(reservation)
+
+        self._by_seat = by_seat
+        self._by_id = by_id
+
+    def conflict(self, seat_id: str, start_at: datetime, end_at: datetime) -> Optional[dict]:
+        intervals = self._by_seat.get(seat_id)
+        return intervals.conflict(start_at, end_at) if intervals else None
+
+    def overlapping(self, seat_id: str, start_at: datetime, end_at: datetime) -> List[dict]:
+        intervals = self._by_seat.get(seat_id)
+        return intervals.overlapping(start_at, end_at) if intervals else []
+
+    def get(self, reservation_id: int) -> Optional[dict]:
+        return self._by_id.get(reservation_id)
+
+    def hold(self, reservation: dict) -> Optional[dict]:
+        """
+        저장 전에 먼저 인덱스에 넣어서 같은 프로세스의 동시 예약이 같은 시간대를 잡지 못하게 함.
+        겹침 확인과 추가 사이에 await 가 없으므로 동시 예약 중 하나만 잡고, 겹치면 넣지 않고 겹치는 예약을 반환.
+        """
+        conflicting = self.conflict(reservation["seat_id"], reservation["start_at"], reservation["end_at"])
+        if conflicting is not None:
+            return conflicting
+        self._by_seat.setdefault(reservation["seat_id"], SeatIntervals()).add(reservation)
+        if reservation["id"] is not None:
+            self._by_id[reservation["id"]] = reservation
+        return None
+
+    def confirm(self, reservation: dict):
+        # hold() 로 잡아 둔 예약이 저장되어 id 가 생긴 뒤 호출
+        self._by_id[reservation["id"]] = reservation
+
+    def release(self, reservation: dict):
+        intervals = self._by_seat.get(reservation["seat_id"])
+        if intervals:
+            intervals.remove(reservation)
+        if reservation["id"] is not None:
+            self._by_id.pop(reservation["id"], None)
+
+    def upcoming(self, seat_id: str, now: datetime) -> Optional[dict]:
+        """
+        지금 진행 중이거나 WALK_IN_BUFFER 안에 시작하는 좌석 예약 (있으면 예약자만 착석 가능).
+        """
+        reservations = self.overlapping(seat_id, now, now + WALK_IN_BUFFER)
+        return reservations[0] if reservations else None
+
+    async def check_in(self, reservation: dict):
+        """
+        예약자가 착석하면 노쇼 정리 대상에서 빠지도록 checked_in 으로 바꿈.
+        """
+        await database.execute(
+            seat_reservations.update()
+            .where(seat_reservations.c.id == reservation["id"])
+            .where(seat_reservations.c.status == "booked")
+            .values(status="checked_in")
+        )
+        reservation["status"] = "checked_in"
+
+    async def complete(self, seat_id: str, user_id: int, now: datetime):
+        """
+        예약자가 예약 시간보다 일찍 퇴실하면 남은 예약 시간을 다른 사람이 쓸 수 있게 풀어 줌.
+        """
+        # 예약 시작 전에 일찍 착석한 경우도 있으므로 upcoming() 과 같은 범위를 봄
+        for reservation in self.overlapping(seat_id, now, now + WALK_IN_BUFFER):
+            if reservation["user_id"] == user_id and reservation["status"] == "checked_in":
+                await database.execute(
+                    seat_reservations.update()
+                    .where(seat_reservations.c.id == reservation["id"])
+                    .values(status="completed")
+                )
+                reservation["status"] = "completed"
+                self.release(reservation)
+
+    async def release_no_shows(self, now: Optional[datetime] = None) -> int:
+        """
+        시작 후 NO_SHOW_GRACE 가 지나도록 착석하지 않은 예약을 한 번의 UPDATE 로 노쇼 처리.
+        """
+        now = now or datetime.now(KST)
+        released = await database.fetch_all(self._owned(
+            seat_reservations.update()
+            .where(seat_reservations.c.status == "booked")
+            .where(seat_reservations.c.start_at <= now - NO_SHOW_GRACE)
+            .values(status="no_show")
+        ).returning(seat_reservations.c.id))
+
+        for record in released:
+            reservation = self._by_id.get(record["id"])
+            if reservation is not None:
+                reservation["status"] = "no_show"
+                self.release(reservation)
+
+        if released:
+            logger.info("노쇼 예약 %d건 해제", len(released))
+        return len(released)
+
+    async def run(self):
+        """
+        lifespan 에서 백그라운드 태스크로 실행하는 노쇼 정리/인덱스 갱신 루프.
+        """
+        while True:
+            try:
+                await self.release_no_shows()
+                await self.load()
+            except Exception:
+                logger.exception("예약 정리 실패")
+            await asyncio.sleep(self.check_interval)
+
+
+# 앱 전체에서 공유하는 예약 인덱스 (이 워커가 맡은 지점만)
+reservation_book = ReservationBook(branch_ids=OWNED_BRANCH_IDS)
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from database import database
+from models import branches
+from routes.protected import get_admin_user
+from branches import DEFAULT_BRANCH_ID, branch_directory, owns_branch
+
+router = APIRouter()
+
+# 지점 추가 요청 데이터 형식 (관리자)
+class BranchCreate(BaseModel):
+    name: str
+
+
+# 지점별 API 공통 확인: 이 워커가 맡은 지점인지, 존재하는 지점인지
+async def get_branch(branch_id: int = DEFAULT_BRANCH_ID) -> int:
+    if not owns_branch(branch_id):
+        # 다른 워커 담당 지점 (프록시 라우팅 설정 확인 필요)
+        raise HTTPException(status_code=421, detail="이 서버가 담당하지 않는 지점입니다.")
+
+    if not await branch_directory.get(branch_id):
+        raise HTTPException(status_code=404, detail="존재하지 않는 지점입니다.")
+
+    return branch_id
+
+
+# 전체 지점 목록
+@router.get("/branches")
+async def get_branches():
+    return branch_directory.all()
+
+# 지점 추가 (관리자)
+@router.post("/branches")
+async def create_branch(request: BranchCreate, admin_id: int = Depends(get_admin_user)):
+    branch_id = await database.execute(branches.insert().values(name=request.name))
+    await branch_directory.load()
+    return {"message": "지점이 추가되었습니다.", "branch_id": branch_id}
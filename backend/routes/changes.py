@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from typing import Any, List, Optional
+from routes.protected import get_current_user
+from routes.branches import get_branch
+from change_feed import change_feed
+from fast_json import FastJSONResponse
+router = APIRouter()
+
+# 롱폴링 최대 대기 시간 (초)
+MAX_WAIT_SECONDS = 30
+
+class ChangeItem(BaseModel):
+    entity: str                # 'seat' 또는 'user_pass'
+    id: str                    # 좌석 id 또는 user_pass id
+    deleted: bool              # 보유 이용권이 만료/소진되어 없어짐
+    data: Optional[Any] = None  # 바뀐 뒤 상태 (SeatStatusResponse / UserPassResponse 모양)
+
+class ChangesResponse(BaseModel):
+    cursor: int                # 다음 요청의 since
+    reset: bool                # True 면 /status, /user/passes 를 전체로 다시 읽고 cursor 부터 이어 받기
+    has_more: bool             # True 면 바로 다시 요청
+    changes: List[ChangeItem]
+
+
+@router.get("/changes", response_model=ChangesResponse)
+@router.get("/branches/{branch_id}/changes", response_model=ChangesResponse)
+async def get_changes(
+    since: Optional[int] = Query(None, description="이전 응답의 cursor (처음이면 비움)"),
+    wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS, description="변경이 없으면 이 시간(초)까지 기다림"),
+    branch_id: int = Depends(get_branch),
+    user_id: int = Depends(get_current_user),
+):
+    """
+    증분 동기화 API. since 이후 바뀐 지점 좌석과 내 보유 이용권만, 항목별 마지막 상태로 줄여서 반환.
+    wait 를 주면 변경이 생길 때까지 기다림 (롱폴링). 오래 꺼져 있던 키오스크도 응답 한두 번으로 따라잡음.
+    """
+    result = await change_feed.poll(branch_id, user_id, since, wait)
+    return FastJSONResponse(result)
@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+from database import read_database
+from routes.protected import get_current_user
+from pass_catalog import pass_catalog
+from archive import purchase_history, ended_passes
+from fast_json import FastJSONResponse
+router = APIRouter()
+
+class PurchaseHistoryItem(BaseModel):
+    purchase_id: int
+    pass_id: int
+    name: Optional[str] = None
+    purchased_at: datetime
+    price: int
+    archived: bool                            # 보관 테이블에서 읽은 오래된 구매
+
+class EndedPassItem(BaseModel):
+    user_pass_id: int
+    pass_id: int
+    name: Optional[str] = None
+    branch_id: int
+    expire_at: Optional[datetime] = None
+    end_reason: str                           # 'expired'(기간 만료) 또는 'used_up'(시간 소진)
+    archived_at: datetime
+
+
+async def pass_name(pass_id: int) -> Optional[str]:
+    selected_pass = await pass_catalog.get_pass(pass_id)
+    return selected_pass["name"] if selected_pass else None
+
+
+# 내 구매 내역 (최근 것부터, 다음 페이지는 마지막 purchase_id 를 before_id 로)
+@router.get("/user/purchases", response_model=List[PurchaseHistoryItem])
+async def get_purchase_history(
+    before_id: Optional[int] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    include_archived: bool = Query(False, description="보관 테이블로 옮긴 오래된 구매까지 포함"),
+    user_id: int = Depends(get_current_user),
+):
+    records = await purchase_history(read_database, user_id, before_id, limit, include_archived)
+    return FastJSONResponse([
+        {
+            "purchase_id": record["id"],
+            "pass_id": record["pass_id"],
+            "name": await pass_name(record["pass_id"]),
+            "purchased_at": record["purchased_at"],
+            "price": record["price"],
+            "archived": bool(record["archived"]),
+        }
+        for record in records
+    ])
+
+
+# 만료/소진된 내 이용권 (보관 테이블)
+@router.get("/user/passes/history", response_model=List[EndedPassItem])
+async def get_ended_passes(
+    before_id: Optional[int] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    user_id: int = Depends(get_current_user),
+):
+    records = await ended_passes(read_database, user_id, before_id, limit)
+    return FastJSONResponse([
+        {
+            "user_pass_id": record["id"],
+            "pass_id": record["pass_id"],
+            "name": await pass_name(record["pass_id"]),
+            "branch_id": record["branch_id"],
+            "expire_at": record["expire_at"],
+            "end_reason": record["end_reason"],
+            "archived_at": record["archived_at"],
+        }
+        for record in records
+    ])
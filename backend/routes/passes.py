@@ -1,28 +1,82 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Header, Response, status
 from pydantic import BaseModel
 from datetime import datetime, timezone, timedelta, tzinfo
-from database import database
+from database import database, reader, REPLICA_LAG_SECONDS
 from models import passes, user_passes, users, purchase_logs, seats
-from routes.protected import get_current_user
+from routes.protected import get_current_user, get_admin_user, ADMIN_USER_IDS
+from routes.branches import get_branch
+from branches import DEFAULT_BRANCH_ID, branch_directory
+from idempotency import fetch_response, request_hash, store_response
+from pass_catalog import pass_catalog, bump_catalog_version
+from sqlalchemy import select
+from seat_state import seat_maps, seat_status, free_seat_status, occupied_entry, to_kst
+from seat_hub import seat_hubs
+from expiry import expiry_sweeper
+from seat_engine import claim_seat, release_seat
+from ttl_cache import TTLCache
+from rate_limit import RateLimiter, enforce
+from fast_json import FastJSONResponse
+from analytics import record_seat_session
+from archive import archive_user_passes
+from reservations import reservation_book
+from metering import settle, MAX_PAUSE
+from waitlist import waitlist
+from change_feed import change_feed, record_changes, seat_change, user_pass_change, user_pass_payload, user_pass_changed
+from collections import defaultdict
 from typing import List, Optional
+import time
 import pytz
 KST = pytz.timezone("Asia/Seoul")
 router = APIRouter()
 
+# /me 응답용 사용자 정보 캐시
+user_cache = TTLCache(maxsize=10000, ttl=60)
+# 최근에 보유 이용권이 바뀐 사용자 → 바뀐 시각(time.monotonic). 복제 지연 동안 /user/passes 는 주 DB에서 읽음
+recent_writes = TTLCache(maxsize=100000, ttl=REPLICA_LAG_SECONDS)
+
+
+# 사용자별 구매 요청 횟수 제한 (같은 Idempotency-Key 재시도는 세지 않도록 구매 함수 안에서 셈)
+purchase_limiter = RateLimiter("purchase_user", limit=10, period=60)
+# 일괄 구매에서 INSERT 한 번에 넣는 보유 이용권 수 (바인드 변수 한도 안에서 RETURNING 으로 id 를 받음)
+BULK_PURCHASE_BATCH = 500
+
+
+def mark_written(user_id: int):
+    recent_writes.set(user_id, time.monotonic())
+
+# 이용권 추가 요청 데이터 형식 (관리자)
+class PassCreate(BaseModel):
+    name: str
+    pass_type: str
+    duration: int
+    price: int
+    branch_id: int = DEFAULT_BRANCH_ID
+
 # 구매 요청 받을 데이터 형식
 class PurchaseRequest(BaseModel):
     pass_id: int
 
+# 일괄 구매 항목 (프런트 데스크용)
+class BulkPurchaseItem(BaseModel):
+    user_id: int
+    pass_id: int
+
+class BulkPurchaseRequest(BaseModel):
+    items: List[BulkPurchaseItem]
+
 # 로그인 후 사용자별 보유 이용권
 class UserPassResponse(BaseModel):
     user_pass_id: int
     pass_id: int
     name: str
     pass_type: str
-    remaining_time: Optional[int] = None
+    remaining_time: Optional[int] = None      # 분
+    remaining_seconds: Optional[int] = None
     expire_at: Optional[datetime] = None
     is_active: bool
+    is_paused: bool = False
     seat_id: Optional[str] = None
+    branch_id: int
 
 # 착석 처리 데이터 형식
 class SeatRequest(BaseModel):
@@ -36,66 +90,234 @@ class LeaveRequest(BaseModel):
 # 사용자 이름 가져오기
 @router.get("/me")
 async def read_users_me(user_id: int = Depends(get_current_user)):
-    query = users.select().where(users.c.id == user_id)
-    user = await database.fetch_one(query)
+    # 자주 바뀌지 않는 사용자 정보는 잠깐 메모리에 캐시
+    profile = user_cache.get(user_id)
+    if profile is None:
+        query = users.select().where(users.c.id == user_id)
+        user = await database.fetch_one(query)
+
+        if not user:
+            raise HTTPException(status_code=404, detail="사용자 정보를 찾을 수 없습니다.")
 
-    if not user:
-        raise HTTPException(status_code=404, detail="사용자 정보를 찾을 수 없습니다.")
+        profile = {"name": user["name"]}
+        user_cache.set(user_id, profile)
 
-    return {"name": user["name"]}
+    return profile
 
-# 전체 이용권 목록 조회
+# 지점 이용권 목록 조회 (/passes 는 기본 지점)
 @router.get("/passes")
-async def get_all_passes():
-    query = passes.select().order_by(passes.c.id)
-    result = await database.fetch_all(query)
-    return result
+@router.get("/branches/{branch_id}/passes")
+async def get_all_passes(branch_id: int = Depends(get_branch), if_none_match: Optional[str] = Header(None)):
+    # 메모리에 미리 직렬화해 둔 지점별 목록을 그대로 반환, 바뀐 게 없으면 304
+    body, etag = await pass_catalog.listing(branch_id)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
 
-# 이용권 구매
-@router.post("/purchase")
-async def purchase_pass(request: PurchaseRequest, user_id: int = Depends(get_current_user)):
-    # 1. 이용권 존재 확인
-    query = passes.select().where(passes.c.id == request.pass_id)
-    selected_pass = await database.fetch_one(query)
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
 
-    if not selected_pass:
-        raise HTTPException(status_code=404, detail="해당 이용권이 존재하지 않습니다.")
+    return Response(content=body, media_type="application/json", headers=headers)
 
+# 이용권 추가 (관리자)
+@router.post("/passes")
+async def create_pass(request: PassCreate, admin_id: int = Depends(get_admin_user)):
+    if request.pass_type not in ["time", "time_period", "day"]:
+        raise HTTPException(status_code=400, detail="알 수 없는 이용권 유형입니다.")
 
-    # 2. user_passes에 구매 정보 생성
-    now = datetime.now(KST)
+    if not await branch_directory.get(request.branch_id):
+        raise HTTPException(status_code=404, detail="존재하지 않는 지점입니다.")
+
+    # 이용권 추가와 버전 증가를 한 트랜잭션으로 (다른 워커도 다음 확인 때 새 목록을 읽음)
+    async with database.transaction():
+        pass_id = await database.execute(passes.insert().values(**request.model_dump()))
+        await bump_catalog_version()
+
+    pass_catalog.invalidate()
+    await pass_catalog.refresh()
+    return {"message": "이용권이 추가되었습니다.", "pass_id": pass_id}
+
+# 구매한 이용권의 user_passes 행 값 만들기
+def build_user_pass_values(selected_pass, user_id: int, now: datetime) -> dict:
+    # executemany 로 여러 행을 한 번에 넣을 수 있도록 모든 행이 같은 컬럼을 갖게 함
     values = {
         "user_id": user_id,
         "pass_id": selected_pass["id"],
+        "expire_at": None,
+        "remaining_seconds": None,
+        "is_active": False,
+        "branch_id": selected_pass["branch_id"],
     }
 
     if selected_pass["pass_type"] == "time":
         values["expire_at"] = now + timedelta(minutes=selected_pass["duration"])
-        values["is_active"] = False
     elif selected_pass["pass_type"] == "time_period":
-        values["remaining_time"] = selected_pass["duration"]
-        values["is_active"] = False
+        values["remaining_seconds"] = selected_pass["duration"] * 60
     elif selected_pass["pass_type"] == "day":
         values["expire_at"] = now + timedelta(days=selected_pass["duration"])
-        values["is_active"] = False
     else:
         raise HTTPException(status_code=400, detail="알 수 없는 이용권 유형입니다.")
 
-    query = user_passes.insert().values(**values)
-    await database.execute(query)
+    return values
 
-    # 3. purchase_logs 테이블에 구매 내역 기록
-    log_values = {
-        "user_id": user_id,
-        "pass_id": selected_pass["id"],
-        "purchased_at": now,
-        "price": selected_pass["price"],
-    }
-    query = purchase_logs.insert().values(**log_values)
-    await database.execute(query)
+# 이용권 구매
+@router.post("/purchase")
+async def purchase_pass(
+    request: PurchaseRequest,
+    user_id: int = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None),
+):
+    # 0. 같은 Idempotency-Key 로 이미 처리된 구매면 그때 응답을 그대로 반환 (키오스크 재시도 대비)
+    body_hash = request_hash(request)
+    if idempotency_key:
+        saved = await fetch_response(user_id, idempotency_key, body_hash)
+        if saved is not None:
+            return saved
+
+    # 재시도 응답은 횟수 제한에 세지 않고, 새 구매만 셈
+    enforce(purchase_limiter, user_id)
+
+    # 1. 이용권 존재 확인 (메모리 캐시에서)
+    selected_pass = await pass_catalog.get_pass(request.pass_id)
 
+    if not selected_pass:
+        raise HTTPException(status_code=404, detail="해당 이용권이 존재하지 않습니다.")
+
+    now = datetime.now(KST)
+    values = build_user_pass_values(selected_pass, user_id, now)
+
+    try:
+        # 2. user_passes 생성, purchase_logs 기록, 멱등키 저장을 한 트랜잭션으로
+        async with database.transaction():
+            user_pass_id = await database.execute(user_passes.insert().values(**values))
+
+            log_values = {
+                "user_id": user_id,
+                "pass_id": selected_pass["id"],
+                "purchased_at": now,
+                "price": selected_pass["price"],
+            }
+            await database.execute(purchase_logs.insert().values(**log_values))
+
+            user_pass = {**values, "id": user_pass_id, "seat_id": None, "metered_at": None, "paused_at": None}
+            await record_changes(selected_pass["branch_id"], [
+                user_pass_change(user_id, user_pass_id, user_pass_payload(user_pass, selected_pass, now)),
+            ], now)
+
+            response = {
+                "message": "이용권이 성공적으로 구매되고 구매 기록이 저장되었습니다.",
+                "user_pass_id": user_pass_id,
+            }
+            if idempotency_key:
+                await store_response(user_id, idempotency_key, body_hash, response)
+
+    except Exception:
+        # 같은 키의 요청이 동시에 처리되어 먼저 커밋된 경우: 그 결과를 반환
+        if idempotency_key:
+            saved = await fetch_response(user_id, idempotency_key, body_hash)
+            if saved is not None:
+                return saved
+        raise
+
+    mark_written(user_id)
+    change_feed.notify(selected_pass["branch_id"])
+    if values["expire_at"] is not None:
+        expiry_sweeper.schedule(user_pass_id, values["expire_at"])
+
+    return response
+
+# 이용권 일괄 구매 (프런트 데스크 일괄 판매, 프로모션 지급)
+@router.post("/purchase/bulk")
+async def purchase_passes_bulk(
+    request: BulkPurchaseRequest,
+    admin_id: int = Depends(get_admin_user),
+    idempotency_key: Optional[str] = Header(None),
+):
+    body_hash = request_hash(request)
+    if idempotency_key:
+        saved = await fetch_response(admin_id, idempotency_key, body_hash)
+        if saved is not None:
+            return saved
+
+    if not request.items:
+        raise HTTPException(status_code=400, detail="구매할 항목이 없습니다.")
+
+    # 1. 이용권(메모리 캐시), 사용자(쿼리 1번) 존재 확인
+    pass_ids = {item.pass_id for item in request.items}
+    pass_by_id = {}
+    for pass_id in pass_ids:
+        selected_pass = await pass_catalog.get_pass(pass_id)
+        if selected_pass:
+            pass_by_id[pass_id] = selected_pass
+
+    missing_pass_ids = pass_ids - pass_by_id.keys()
+    if missing_pass_ids:
+        raise HTTPException(status_code=404, detail=f"존재하지 않는 이용권입니다: {sorted(missing_pass_ids)}")
+
+    user_ids = {item.user_id for item in request.items}
+    user_records = await database.fetch_all(select(users.c.id).where(users.c.id.in_(user_ids)))
+    missing_user_ids = user_ids - {record["id"] for record in user_records}
+    if missing_user_ids:
+        raise HTTPException(status_code=404, detail=f"존재하지 않는 사용자입니다: {sorted(missing_user_ids)}")
+
+    # 2. 행 값 만들기
+    now = datetime.now(KST)
+    user_pass_rows = []
+    log_rows = []
+    for item in request.items:
+        selected_pass = pass_by_id[item.pass_id]
+        user_pass_rows.append(build_user_pass_values(selected_pass, item.user_id, now))
+        log_rows.append({
+            "user_id": item.user_id,
+            "pass_id": item.pass_id,
+            "purchased_at": now,
+            "price": selected_pass["price"],
+        })
+
+    response = {
+        "message": "이용권 일괄 구매가 완료되었습니다.",
+        "count": len(user_pass_rows),
+        "total_price": sum(row["price"] for row in log_rows),
+    }
 
-    return {"message": "이용권이 성공적으로 구매되고 구매 기록이 저장되었습니다."}
+    try:
+        # 3. 한 트랜잭션 안에서 저장. 보유 이용권은 여러 행 INSERT ... RETURNING 으로 id 를 받아 변경 기록도 함께 남김
+        async with database.transaction():
+            created = []
+            for start in range(0, len(user_pass_rows), BULK_PURCHASE_BATCH):
+                created += await database.fetch_all(
+                    user_passes.insert()
+                    .values(user_pass_rows[start:start + BULK_PURCHASE_BATCH])
+                    .returning(*user_passes.c)
+                )
+            await database.execute_many(purchase_logs.insert(), log_rows)
+
+            changes_by_branch = defaultdict(list)
+            for user_pass in created:
+                changes_by_branch[user_pass["branch_id"]].append(user_pass_change(
+                    user_pass["user_id"], user_pass["id"],
+                    user_pass_payload(user_pass, pass_by_id[user_pass["pass_id"]], now),
+                ))
+            for branch_id in sorted(changes_by_branch):
+                await record_changes(branch_id, changes_by_branch[branch_id], now)
+
+            if idempotency_key:
+                await store_response(admin_id, idempotency_key, body_hash, response)
+
+    except Exception:
+        if idempotency_key:
+            saved = await fetch_response(admin_id, idempotency_key, body_hash)
+            if saved is not None:
+                return saved
+        raise
+
+    for user_id in user_ids:
+        mark_written(user_id)
+    for branch_id in changes_by_branch:
+        change_feed.notify(branch_id)
+    for user_pass in created:
+        if user_pass["expire_at"] is not None:
+            expiry_sweeper.schedule(user_pass["id"], user_pass["expire_at"])
+
+    return response
 
 # 사용자 이용권 보유 현황
 @router.get("/user/passes", response_model=List[UserPassResponse])
@@ -108,153 +330,235 @@ async def get_user_passes(user_id: int = Depends(get_current_user)):
         .select()
         .where(user_passes.c.user_id == user_id)
     )
-    records = await database.fetch_all(join_query)
+    # 방금 구매/착석/퇴실한 사용자가 아니면 복제 DB에서 읽음
+    records = await reader(recent_writes.get(user_id)).fetch_all(join_query)
 
     valid_passes = []
 
+    # 만료된 이용권은 응답에서만 제외하고 삭제는 expiry 스위퍼가 담당
     for record in records:
-        pass_type = record["pass_type"]
+        item = user_pass_payload(record, record, now)
         expired = False
 
-        if pass_type in ["time", "day"]:
-            expire_at = KST.localize(record["expire_at"])
-            if expire_at < now:
-                await database.execute(
-                    user_passes.delete().where(user_passes.c.id == record["id"])
-                )
-                expired = True
+        if item["pass_type"] in ["time", "day"]:
+            expired = to_kst(record["expire_at"]) < now
 
-        elif pass_type == "time_period":
-            if record["remaining_time"] is not None and record["remaining_time"] <= 0:
-                await database.execute(
-                    user_passes.delete().where(user_passes.c.id == record["id"])
-                )
-                expired = True
+        elif item["pass_type"] == "time_period":
+            expired = item["remaining_seconds"] is not None and item["remaining_seconds"] <= 0
 
         if not expired:
-            valid_passes.append(
-                UserPassResponse(
-                    user_pass_id=record["id"],
-                    pass_id=record["pass_id"],
-                    name=record["name"],
-                    pass_type=pass_type,
-                    remaining_time=record["remaining_time"],
-                    expire_at=record["expire_at"],
-                    is_active=record["is_active"],
-                    seat_id=record["seat_id"]
-                )
-            )
+            valid_passes.append(item)
 
-    return valid_passes
+    return FastJSONResponse(valid_passes)
 
 
-# 착석처리 
+# 사용자가 지금 앉아 있는 좌석의 이용권
+async def find_seated_pass(seat_id: str, branch_id: int, user_id: int):
+    user_pass = await database.fetch_one(
+        user_passes.select()
+        .where(user_passes.c.seat_id == seat_id)
+        .where(user_passes.c.user_id == user_id)
+        .where(user_passes.c.branch_id == branch_id)
+    )
+    if not user_pass:
+        raise HTTPException(status_code=404, detail="착석 중인 좌석이 아닙니다.")
+    return user_pass
+
+
+# 착석처리 (/seat 는 기본 지점)
 @router.post("/seat")
-async def occupy_seat(request: SeatRequest, user_id: int = Depends(get_current_user)):
+@router.post("/branches/{branch_id}/seat")
+async def occupy_seat(
+    request: SeatRequest,
+    branch_id: int = Depends(get_branch),
+    user_id: int = Depends(get_current_user),
+):
 
     now = datetime.now(KST)
 
-    # 이미 점유된 좌석인지 확인 
-    seat_record = await database.fetch_one(
-        seats.select().where(seats.c.id == request.seat_id)
-    )
+    # 곧 시작하거나 진행 중인 예약이 있으면 예약자만 착석 가능
+    reservation = reservation_book.upcoming(request.seat_id, now)
+    if reservation is not None and reservation["user_id"] != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{reservation['start_at']:%H:%M}부터 예약된 좌석입니다.",
+        )
 
-    if seat_record and seat_record["is_occupied"]:
-        raise HTTPException(status_code=400, detail="이미 점유된 좌석입니다")
+    # 대기자에게 제안 중인 좌석은 제안받은 사람만 착석 가능
+    offer = waitlist.offer_for(request.seat_id)
+    if offer is not None and offer["user_id"] != user_id:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="대기자에게 배정 중인 좌석입니다.")
 
-    # user_passes 업데이트: 좌석 지정, 착석 시간 기록, 활성화 처리
-    await database.execute(
-        user_passes.update()
-        .where(user_passes.c.id == request.user_pass_id)
-        .values(is_active=True, seat_id=request.seat_id)
-    )
+    # 좌석 점유 + 이용권 착석 처리를 한 트랜잭션으로 (동시 요청 시 한 명만 성공), 변경 기록도 함께 커밋
+    async with database.transaction():
+        user_pass = await claim_seat(request.seat_id, request.user_pass_id, user_id, now, branch_id)
+        seated_status = seat_status(occupied_entry(request.seat_id, user_pass), now)
+        await record_changes(branch_id, [seat_change(seated_status), await user_pass_changed(user_pass, now)], now)
+    seat_maps.invalidate(branch_id)
+    mark_written(user_id)
+    change_feed.notify(branch_id)
 
-    # seats 업데이트: 좌석 점유 상태 변경
-    await database.execute(
-        seats.update()
-        .where(seats.c.id == request.seat_id)
-        .values(is_occupied=True, user_pass_id=request.user_pass_id, start_at=now)
-    )
+    if reservation is not None:
+        await reservation_book.check_in(reservation)
+    await waitlist.seated(branch_id, user_id, request.seat_id, now)
+
+    seat_hubs.channel(branch_id).publish_seat(seated_status)
+
+    # 정액 시간권은 착석 시점부터 남은 시간이 흐르므로 만료 시각 등록
+    if user_pass["remaining_seconds"] is not None:
+        expiry_sweeper.schedule(user_pass["id"], now + timedelta(seconds=user_pass["remaining_seconds"]))
 
     return {"message": "좌석 착석 완료", "seat_id": request.seat_id}
 
-# 퇴실처리
+# 퇴실처리 (/leave 는 기본 지점)
 @router.post("/leave")
-async def leave_seat(request: LeaveRequest, user_id: int = Depends(get_current_user)):
+@router.post("/branches/{branch_id}/leave")
+async def leave_seat(
+    request: LeaveRequest,
+    branch_id: int = Depends(get_branch),
+    user_id: int = Depends(get_current_user),
+):
     """
-    좌석 퇴실 처리 API. 사용자가 착석 중인 좌석이 있으면 퇴실 처리하고,
+    좌석 퇴실 처리 API. 본인 이용권으로 앉은 좌석(관리자는 모든 좌석)을 비우고,
     남은 시간을 user_passes에 저장함.
     """
-    # 1. 사용자가 착석 중인 좌석 찾기 
-
-    user_seat = None
-    user_seat = await database.fetch_one(
-        seats.select().where(seats.c.id == request.seat_id)
-    )
-    
-    if not user_seat:
-        raise HTTPException(status_code=404, detail="퇴실 처리할 좌석이 없습니다.")
-    
-    # 2. user_pass의 남은 시간 계산
-
-    user_pass_query = user_passes.select().where(user_passes.c.id == user_seat["user_pass_id"])
-    user_pass = await database.fetch_one(user_pass_query)
     now = datetime.now(KST)
-    
-    if user_pass["remaining_time"] is not None:
-        start_at = KST.localize(user_seat["start_at"])
-        elapsed_minutes = int((now - start_at).total_seconds() // 60)
-
-        update_remaining_time = user_pass["remaining_time"] - elapsed_minutes
-
-        # user_pass 만료처리: 삭제
-        if update_remaining_time <=0:
-                delete_pass = user_passes.delete().where(user_passes.c.id == user_seat["user_pass_id"])
-                await database.execute(delete_pass)
-
-        # 시간이 남았다면 이용권 남은시간 갱신 
-        else:
-            await database.execute(
-                user_passes.update()
-                .where(user_passes.c.id == user_pass["id"])
-                .values(
-                    remaining_time=update_remaining_time,
-                    is_active=False,
-                    seat_id=None
-                )
-            )
-    
-    else:
-        # user_pass 만료처리: 삭제
-        expire_at = KST.localize(user_pass["expire_at"])
-        elapsed_minutes = expire_at - now
-        update_remaining_time = int(elapsed_minutes.total_seconds() // 60)
-
-
-        if update_remaining_time <=0:
-                delete_pass = user_passes.delete().where(user_passes.c.id == user_seat["user_pass_id"])
-                await database.execute(delete_pass)
-
-        else:
-            # 기간 남았다면 그대로 저장
-            await database.execute(
-                user_passes.update()
-                .where(user_passes.c.id == user_pass["id"])
-                .values(
-                    is_active=False,
-                    seat_id=None
-                )
-            )
-    
-    # 3. 좌석 비우기
-    await database.execute(
-        seats.update()
-        .where(seats.c.id == user_seat["id"])
-        .values(
-            is_occupied=False,
-            user_pass_id=None,
-            start_at=None
+
+    # 좌석 비우기, 이용권 갱신, 이용 기록 저장을 한 트랜잭션으로
+    async with database.transaction():
+        # 1. 좌석 비우기 (조건부 UPDATE 로 차지한 요청만 아래 정산/기록을 함, 동시 퇴실/만료 정리는 404)
+        user_seat = await release_seat(
+            request.seat_id,
+            None if user_id in ADMIN_USER_IDS else user_id,
+            branch_id,
+        )
+        start_at = to_kst(user_seat["start_at"])
+
+        # 2. 앉아 있던 이용권 정산 (좌석을 비운 뒤 읽으므로 계량 체크포인트까지 반영된 값)
+        user_pass = await database.fetch_one(
+            user_passes.select().where(user_passes.c.id == user_seat["user_pass_id"])
         )
-    )
+
+        # 변경 피드에 남길 좌석/보유 이용권 변경
+        changes = [seat_change(free_seat_status(user_seat["id"]))]
+
+        if user_pass is not None:
+            if user_pass["remaining_seconds"] is not None:
+                # 마지막 체크포인트 이후 사용 시간을 초 단위로 정산 (외출 중이면 더 뺄 시간 없음)
+                settled = settle(user_pass, now)
+                used_up = settled["remaining_seconds"] <= 0
+            else:
+                settled = {}
+                used_up = to_kst(user_pass["expire_at"]) <= now
+
+            if used_up:
+                # user_pass 만료처리: 보관 테이블로 옮김
+                await archive_user_passes([user_pass["id"]], now)
+                changes.append(user_pass_change(user_pass["user_id"], user_pass["id"]))
+            else:
+                # 시간/기간이 남았다면 남은 시간 갱신 후 퇴실 상태로 저장
+                left_values = dict(settled, paused_at=None, is_active=False, seat_id=None)
+                await database.execute(
+                    user_passes.update()
+                    .where(user_passes.c.id == user_pass["id"])
+                    .values(**left_values)
+                )
+                changes.append(await user_pass_changed({**user_pass, **left_values}, now))
+
+        # 3. 이용 기록 저장 및 좌석 이용 시간 집계
+        await record_seat_session({
+            "seat_id": user_seat["id"],
+            "user_pass_id": user_seat["user_pass_id"],
+            "user_id": user_pass["user_id"] if user_pass else None,
+            "pass_id": user_pass["pass_id"] if user_pass else None,
+            "started_at": start_at,
+            "ended_at": now,
+            "end_reason": "leave",
+        }, branch_id)
+
+        await record_changes(branch_id, changes, now)
+
+    seat_maps.invalidate(branch_id)
+    if user_pass is not None:
+        mark_written(user_pass["user_id"])
+    change_feed.notify(branch_id)
+    seat_hubs.channel(branch_id).publish_freed([user_seat["id"]])
+
+    # 예약으로 앉은 좌석이면 남은 예약 시간을 풀어 줌
+    if user_pass is not None:
+        await reservation_book.complete(user_seat["id"], user_pass["user_id"], now)
+
+    # 빈 좌석을 대기열 맨 앞사람에게 제안
+    await waitlist.seats_freed(branch_id, [user_seat["id"]], now)
 
     return {"message": "퇴실 처리가 완료되었습니다."}
+
+
+# 외출 (좌석은 그대로 두고 정액 시간권은 시간을 멈춤, MAX_PAUSE 가 지나면 자동 복귀)
+@router.post("/seat/pause")
+@router.post("/branches/{branch_id}/seat/pause")
+async def pause_seat(
+    request: LeaveRequest,
+    branch_id: int = Depends(get_branch),
+    user_id: int = Depends(get_current_user),
+):
+    now = datetime.now(KST)
+    user_pass = await find_seated_pass(request.seat_id, branch_id, user_id)
+    if user_pass["paused_at"] is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="이미 외출 중입니다.")
+
+    # 지금까지 쓴 시간을 정산하고 계량을 멈춤 (동시에 들어온 외출 요청은 한 번만 처리)
+    async with database.transaction():
+        paused = await database.fetch_one(
+            user_passes.update()
+            .where(user_passes.c.id == user_pass["id"])
+            .where(user_passes.c.paused_at.is_(None))
+            .values(**settle(user_pass, now), paused_at=now)
+            .returning(*user_passes.c)
+        )
+        if not paused:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="이미 외출 중입니다.")
+        paused_status = seat_status(occupied_entry(request.seat_id, paused), now)
+        await record_changes(branch_id, [seat_change(paused_status), await user_pass_changed(paused, now)], now)
+
+    seat_maps.invalidate(branch_id)
+    mark_written(user_id)
+    change_feed.notify(branch_id)
+    seat_hubs.channel(branch_id).publish_seat(paused_status)
+
+    return {"message": "외출 처리되었습니다.", "resume_by": now + MAX_PAUSE}
+
+# 외출 복귀
+@router.post("/seat/resume")
+@router.post("/branches/{branch_id}/seat/resume")
+async def resume_seat(
+    request: LeaveRequest,
+    branch_id: int = Depends(get_branch),
+    user_id: int = Depends(get_current_user),
+):
+    now = datetime.now(KST)
+    user_pass = await find_seated_pass(request.seat_id, branch_id, user_id)
+
+    async with database.transaction():
+        resumed = await database.fetch_one(
+            user_passes.update()
+            .where(user_passes.c.id == user_pass["id"])
+            .where(user_passes.c.paused_at.is_not(None))
+            .values(paused_at=None, metered_at=now if user_pass["remaining_seconds"] is not None else None)
+            .returning(*user_passes.c)
+        )
+        if not resumed:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="외출 중이 아닙니다.")
+        resumed_status = seat_status(occupied_entry(request.seat_id, resumed), now)
+        await record_changes(branch_id, [seat_change(resumed_status), await user_pass_changed(resumed, now)], now)
+
+    seat_maps.invalidate(branch_id)
+    mark_written(user_id)
+    change_feed.notify(branch_id)
+    seat_hubs.channel(branch_id).publish_seat(resumed_status)
+
+    # 정액 시간권은 복귀 시점부터 다시 시간이 흐르므로 만료 시각 등록
+    if resumed["remaining_seconds"] is not None:
+        expiry_sweeper.schedule(resumed["id"], now + timedelta(seconds=resumed["remaining_seconds"]))
+
+    return {"message": "외출 복귀 처리되었습니다."}
@@ -2,6 +2,15 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from dotenv import load_dotenv
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from sqlalchemy import select
+from database import database
+from models import revoked_tokens
+from ttl_cache import TTLCache
+import asyncio
+import hashlib
+import time
 import os
 
 load_dotenv()
@@ -16,6 +25,107 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 # 라우터 생성
 router = APIRouter()
 
+# 디코드한 토큰 캐시 설정 (같은 토큰을 반복해서 보내는 키오스크용)
+TOKEN_CACHE_SIZE = 10000
+TOKEN_CACHE_SECONDS = 300
+# 다른 워커에서 폐기한 토큰 목록을 다시 읽는 간격 (초)
+REVOCATION_CHECK_SECONDS = 10
+# 원래 만료 시각이 지난 폐기 토큰을 DB/메모리에서 지우는 간격 (초). 만료된 토큰은 exp 검증에서 이미 거절됨
+REVOCATION_PRUNE_SECONDS = 600
+
+# token → (user_id, token_hash), 토큰 exp 를 넘겨서 캐시하지 않음
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_SECONDS)
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def expiry_timestamp(expires_at: datetime) -> float:
+    # revoked_tokens.expires_at 은 UTC 로 저장 (SQLite 는 시간대 없이 읽힘)
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at.timestamp()
+
+
+class RevokedTokens:
+    """
+    폐기된 토큰 해시 목록. DB 의 revoked_tokens 를 주기적으로 새 행만 읽어 와서
+    요청마다 DB 를 조회하지 않고 메모리에서 확인함.
+    원래 만료 시각이 지난 토큰은 REVOCATION_PRUNE_SECONDS 마다 DB와 메모리에서 지워 목록이 계속 커지지 않게 함.
+    """
+
+    def __init__(self, check_interval: float = REVOCATION_CHECK_SECONDS, prune_interval: float = REVOCATION_PRUNE_SECONDS):
+        self.check_interval = check_interval
+        self.prune_interval = prune_interval
+        self._hashes: Dict[str, float] = {}  # token_hash → 토큰 만료 시각 (epoch 초)
+        self._last_id = 0
+        self._checked_at: Optional[float] = None
+        self._pruned_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def __contains__(self, token_hash: str) -> bool:
+        return token_hash in self._hashes
+
+    def __len__(self):
+        return len(self._hashes)
+
+    async def refresh(self):
+        if self._checked_at is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return
+
+        async with self._lock:
+            if self._checked_at is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return
+
+            records = await database.fetch_all(
+                select(revoked_tokens.c.id, revoked_tokens.c.token_hash, revoked_tokens.c.expires_at)
+                .where(revoked_tokens.c.id > self._last_id)
+                .order_by(revoked_tokens.c.id)
+            )
+            for record in records:
+                self._hashes[record["token_hash"]] = expiry_timestamp(record["expires_at"])
+                self._last_id = record["id"]
+
+            if self._pruned_at is None or time.monotonic() - self._pruned_at >= self.prune_interval:
+                await self.prune()
+            self._checked_at = time.monotonic()
+
+    async def prune(self, now: Optional[datetime] = None) -> int:
+        """
+        원래 만료 시각이 지난 폐기 토큰을 DB와 메모리에서 지우고 DB에서 지운 행 수를 반환.
+        """
+        now = now or datetime.now(timezone.utc)
+        deleted = await database.fetch_all(
+            revoked_tokens.delete()
+            .where(revoked_tokens.c.expires_at < now)
+            .returning(revoked_tokens.c.id)
+        )
+        cutoff = now.timestamp()
+        self._hashes = {token_hash: expires for token_hash, expires in self._hashes.items() if expires >= cutoff}
+        self._pruned_at = time.monotonic()
+        return len(deleted)
+
+    async def revoke(self, token: str, expires_at: datetime):
+        token_hash = hash_token(token)
+        if token_hash not in self._hashes:
+            await database.execute(
+                revoked_tokens.insert().values(token_hash=token_hash, expires_at=expires_at)
+            )
+        self._hashes[token_hash] = expiry_timestamp(expires_at)
+        token_cache.pop(token)
+
+
+revoked = RevokedTokens()
+
+
+def decode_token(token: str) -> dict:
+    """
+    서명과 만료 시간(exp)을 검증하고 payload 를 반환. 실패하면 JWTError.
+    """
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
 # JWT 토큰 검증 함수
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> int:
     credentials_exception = HTTPException(
@@ -24,15 +134,53 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> int:
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        # 토큰 디코드해서 payload 추출
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id_str: str = payload.get("sub")
+    # 1. 이미 검증한 토큰이면 디코드 생략
+    cached = token_cache.get(token)
+
+    if cached is None:
+        try:
+            # 토큰 디코드해서 payload 추출
+            payload = decode_token(token)
+        except JWTError:
+            raise credentials_exception
 
+        user_id_str: str = payload.get("sub")
         if user_id_str is None:
             raise credentials_exception
 
-        return int(user_id_str)
+        cached = (int(user_id_str), hash_token(token))
+        # 토큰 만료 시각까지만 캐시
+        token_cache.set(token, cached, ttl=payload.get("exp", 0) - time.time())
 
-    except JWTError:
+    user_id, token_hash = cached
+
+    # 2. 폐기된 토큰인지 확인 (메모리)
+    await revoked.refresh()
+    if token_hash in revoked:
+        token_cache.pop(token)
         raise credentials_exception
+
+    return user_id
+
+
+# 로그아웃: 현재 토큰 폐기
+@router.post("/logout")
+async def logout(token: str = Depends(oauth2_scheme), user_id: int = Depends(get_current_user)):
+    payload = decode_token(token)
+    expires_at = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+    await revoked.revoke(token, expires_at)
+    return {"message": "로그아웃 되었습니다."}
+
+# 관리자(프런트 데스크) 사용자 id 목록, 예: ADMIN_USER_IDS=1,2
+ADMIN_USER_IDS = {
+    int(user_id) for user_id in os.getenv("ADMIN_USER_IDS", "").split(",") if user_id.strip()
+}
+
+# 관리자 권한 확인 함수
+async def get_admin_user(user_id: int = Depends(get_current_user)) -> int:
+    if user_id not in ADMIN_USER_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="관리자 권한이 필요합니다.",
+        )
+    return user_id
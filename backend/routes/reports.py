@@ -0,0 +1,181 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from datetime import date, datetime, time, timedelta
+from typing import AsyncIterator, List, Optional
+from sqlalchemy import select, func
+from database import read_database
+from models import passes, sales_rollups, seats, seat_sessions
+from routes.protected import get_admin_user
+from routes.branches import get_branch
+from analytics import iter_revenue, iter_seat_utilization, sales_rollup_lag
+import json
+import pytz
+KST = pytz.timezone("Asia/Seoul")
+router = APIRouter(prefix="/admin/reports")
+
+# 이용 기록 내보내기 때 한 번에 읽는 행 수
+EXPORT_PAGE_SIZE = 1000
+SESSION_COLUMNS = [
+    "id", "seat_id", "user_pass_id", "user_id", "pass_id",
+    "started_at", "ended_at", "used_minutes", "end_reason",
+]
+# 매출 보고서가 몇 초 전 구매까지 반영했는지 알려 주는 응답 헤더 (집계는 run_rollups 가 주기적으로 함)
+ROLLUP_LAG_HEADER = "X-Rollup-Lag-Seconds"
+
+
+# 날짜 범위를 KST 기준 [시작일 00시, 종료일 다음날 00시) 로 변환
+def date_range(start: date, end: date):
+    if end < start:
+        raise HTTPException(status_code=400, detail="종료일이 시작일보다 빠릅니다.")
+    return (
+        KST.localize(datetime.combine(start, time.min)),
+        KST.localize(datetime.combine(end + timedelta(days=1), time.min)),
+    )
+
+
+# 행을 한 줄씩 CSV 로 내보내는 스트리밍 응답
+def csv_response(rows: AsyncIterator[dict], columns: List[str], filename: str):
+    async def stream():
+        yield ",".join(columns) + "\n"
+        async for row in rows:
+            yield ",".join("" if row[column] is None else str(row[column]) for column in columns) + "\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# 집계가 얼마나 밀렸는지 헤더로 알려 줌 (아직 한 번도 집계되지 않았으면 생략)
+def set_rollup_lag(response: Response, lag: Optional[int]):
+    if lag is not None:
+        response.headers[ROLLUP_LAG_HEADER] = str(lag)
+
+
+# 기간별 지점 매출 (시간/일/주). 보고서는 읽기만 하고, 최근 구매는 다음 집계 주기에 반영됨
+@router.get("/revenue")
+async def revenue_report(
+    response: Response,
+    start: date,
+    end: date,
+    period: str = Query("day", pattern="^(hour|day|week)$"),
+    format: str = Query("json", pattern="^(json|csv)$"),
+    branch_id: int = Depends(get_branch),
+    admin_id: int = Depends(get_admin_user),
+):
+    start_at, end_at = date_range(start, end)
+    lag = await sales_rollup_lag()
+
+    rows = iter_revenue(period, start_at, end_at, branch_id)
+    if format == "csv":
+        csv = csv_response(rows, ["bucket", "purchase_count", "revenue"], f"revenue_{period}_{start}_{end}.csv")
+        set_rollup_lag(csv, lag)
+        return csv
+
+    set_rollup_lag(response, lag)
+    return [row async for row in rows]
+
+
+# 지점에서 많이 팔린 이용권
+@router.get("/top-passes")
+async def top_passes_report(
+    response: Response,
+    start: date,
+    end: date,
+    limit: int = Query(10, ge=1, le=100),
+    branch_id: int = Depends(get_branch),
+    admin_id: int = Depends(get_admin_user),
+):
+    start_at, end_at = date_range(start, end)
+    set_rollup_lag(response, await sales_rollup_lag())
+
+    purchase_count = func.sum(sales_rollups.c.purchase_count).label("purchase_count")
+    query = (
+        select(
+            passes.c.id.label("pass_id"),
+            passes.c.name,
+            passes.c.pass_type,
+            purchase_count,
+            func.sum(sales_rollups.c.revenue).label("revenue"),
+        )
+        .select_from(sales_rollups.join(passes, sales_rollups.c.pass_id == passes.c.id))
+        .where(passes.c.branch_id == branch_id)
+        .where(sales_rollups.c.hour >= start_at)
+        .where(sales_rollups.c.hour < end_at)
+        .group_by(passes.c.id, passes.c.name, passes.c.pass_type)
+        .order_by(purchase_count.desc())
+        .limit(limit)
+    )
+    return [dict(record) for record in await read_database.fetch_all(query)]
+
+
+# 지점의 시간대별 좌석 점유율
+@router.get("/seat-utilization")
+async def seat_utilization_report(
+    start: date,
+    end: date,
+    format: str = Query("json", pattern="^(json|csv)$"),
+    branch_id: int = Depends(get_branch),
+    admin_id: int = Depends(get_admin_user),
+):
+    start_at, end_at = date_range(start, end)
+    seat_count = await read_database.fetch_val(
+        select(func.count()).select_from(seats).where(seats.c.branch_id == branch_id)
+    )
+
+    rows = iter_seat_utilization(start_at, end_at, branch_id, seat_count)
+    if format == "csv":
+        return csv_response(
+            rows,
+            ["bucket", "occupied_minutes", "sessions", "utilization"],
+            f"seat_utilization_{start}_{end}.csv",
+        )
+
+    return [row async for row in rows]
+
+
+# 좌석 이용 기록을 id 기준 키셋 페이지로 끝까지 읽음 (OFFSET 없이, 한 페이지만 메모리에 둠)
+async def iter_seat_sessions(start_at: datetime, end_at: datetime, after_id: int) -> AsyncIterator[dict]:
+    last_id = after_id
+    while True:
+        records = await read_database.fetch_all(
+            seat_sessions.select()
+            .where(seat_sessions.c.id > last_id)
+            .where(seat_sessions.c.ended_at >= start_at)
+            .where(seat_sessions.c.ended_at < end_at)
+            .order_by(seat_sessions.c.id)
+            .limit(EXPORT_PAGE_SIZE)
+        )
+        for record in records:
+            yield dict(record)
+
+        if len(records) < EXPORT_PAGE_SIZE:
+            return
+        last_id = records[-1]["id"]
+
+
+# 좌석 이용 기록 내보내기 (NDJSON/CSV 스트리밍)
+@router.get("/sessions")
+async def export_seat_sessions(
+    start: date,
+    end: date,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    after_id: int = Query(0, ge=0),
+    admin_id: int = Depends(get_admin_user),
+):
+    """
+    기간 내 끝난 좌석 이용 기록을 id 순서로 내보냄.
+    끊긴 다운로드는 마지막으로 받은 id 를 after_id 로 넘겨 이어 받을 수 있음.
+    """
+    start_at, end_at = date_range(start, end)
+    rows = iter_seat_sessions(start_at, end_at, after_id)
+
+    if format == "csv":
+        return csv_response(rows, SESSION_COLUMNS, f"seat_sessions_{start}_{end}.csv")
+
+    async def stream():
+        async for row in rows:
+            yield json.dumps(row, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -0,0 +1,240 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional
+from sqlalchemy import select
+from database import database
+from models import seats, seat_reservations, user_passes
+from routes.protected import get_current_user
+from routes.branches import get_branch
+from reservations import reservation_book, reservation_values, ACTIVE_STATUSES
+from fast_json import FastJSONResponse
+from seat_state import seat_maps, remaining_minutes, live_remaining_seconds, to_kst
+import pytz
+KST = pytz.timezone("Asia/Seoul")
+router = APIRouter()
+
+# 예약 한 건의 최대 길이 / 최대 며칠 뒤까지 예약 가능한지
+MAX_RESERVATION_HOURS = 12
+MAX_ADVANCE_DAYS = 14
+
+# 좌석 예약 요청 데이터 형식 (tz 정보가 없으면 KST 로 봄)
+class ReservationRequest(BaseModel):
+    seat_id: str
+    user_pass_id: int
+    start_at: datetime
+    end_at: datetime
+
+class ReservationResponse(BaseModel):
+    id: int
+    seat_id: str
+    branch_id: int
+    user_pass_id: int
+    start_at: datetime
+    end_at: datetime
+    status: str
+
+class BookedInterval(BaseModel):
+    start_at: datetime
+    end_at: datetime
+
+class SeatAvailability(BaseModel):
+    seat_id: str
+    is_occupied: bool
+    reservations: List[BookedInterval]
+
+
+# 지점 좌석 스냅샷에서 좌석 하나 찾기 (DB 조회 없음)
+async def find_seat_entry(branch_id: int, seat_id: str) -> dict:
+    for entry in await seat_maps.get(branch_id):
+        if entry["seat_id"] == seat_id:
+            return entry
+    raise HTTPException(status_code=404, detail="존재하지 않는 좌석입니다.")
+
+
+# 지금 앉아 있는 사람이 이용권 기준으로 최대 언제까지 앉아 있을 수 있는지
+def occupied_until(entry: dict, now: datetime) -> Optional[datetime]:
+    if not entry["is_occupied"]:
+        return None
+    return now + timedelta(minutes=remaining_minutes(entry, now) or 0)
+
+
+# 좌석 예약
+@router.post("/reservations", response_model=ReservationResponse)
+@router.post("/branches/{branch_id}/reservations", response_model=ReservationResponse)
+async def create_reservation(
+    request: ReservationRequest,
+    branch_id: int = Depends(get_branch),
+    user_id: int = Depends(get_current_user),
+):
+    now = datetime.now(KST)
+    start_at = to_kst(request.start_at)
+    end_at = to_kst(request.end_at)
+
+    # 1. 예약 시간 확인
+    if end_at <= start_at:
+        raise HTTPException(status_code=400, detail="종료 시각이 시작 시각보다 빠릅니다.")
+    if end_at - start_at > timedelta(hours=MAX_RESERVATION_HOURS):
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {MAX_RESERVATION_HOURS}시간까지 예약할 수 있습니다.")
+    if start_at < now - timedelta(minutes=1) or start_at > now + timedelta(days=MAX_ADVANCE_DAYS):
+        raise HTTPException(status_code=400, detail=f"지금부터 {MAX_ADVANCE_DAYS}일 안의 시간만 예약할 수 있습니다.")
+
+    # 2. 지금 이용 중인 사람, 다른 예약과 겹치는지 메모리에서 먼저 확인
+    entry = await find_seat_entry(branch_id, request.seat_id)
+    busy_until = occupied_until(entry, now)
+    if busy_until is not None and start_at < busy_until:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{busy_until:%m/%d %H:%M}까지 이용 중인 좌석입니다.",
+        )
+    if reservation_book.conflict(request.seat_id, start_at, end_at):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="이미 예약된 시간입니다.")
+
+    # 3. 예약에 쓸 이용권 확인 (본인 소유, 같은 지점, 예약 시간 동안 쓸 수 있는지)
+    user_pass = await database.fetch_one(
+        user_passes.select()
+        .where(user_passes.c.id == request.user_pass_id)
+        .where(user_passes.c.user_id == user_id)
+    )
+    if not user_pass:
+        raise HTTPException(status_code=404, detail="보유하지 않은 이용권입니다.")
+    if user_pass["branch_id"] != branch_id:
+        raise HTTPException(status_code=400, detail="다른 지점의 이용권입니다.")
+    if user_pass["expire_at"] is not None and to_kst(user_pass["expire_at"]) < end_at:
+        raise HTTPException(status_code=400, detail="예약 시간 안에 만료되는 이용권입니다.")
+    remaining_seconds = live_remaining_seconds(user_pass["remaining_seconds"], user_pass["metered_at"], now)
+    if remaining_seconds is not None and remaining_seconds < (end_at - start_at).total_seconds():
+        raise HTTPException(status_code=400, detail="이용권 남은 시간이 예약 시간보다 짧습니다.")
+
+    # 4. 인덱스에 먼저 잡아 두고 저장. 위 확인 뒤 await 하는 동안 들어온 같은 워커 예약은 hold() 가 걸러내고,
+    #    다른 워커의 예약은 좌석 행을 잠근 뒤 DB에서 한 번 더 확인
+    reservation = {
+        "id": None,
+        "seat_id": request.seat_id,
+        "branch_id": branch_id,
+        "user_id": user_id,
+        "user_pass_id": request.user_pass_id,
+        "start_at": start_at,
+        "end_at": end_at,
+        "status": "booked",
+    }
+    if reservation_book.hold(reservation) is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="이미 예약된 시간입니다.")
+    try:
+        async with database.transaction():
+            # 좌석 행 잠금: 값을 바꾸지 않는 UPDATE 로 PostgreSQL 은 행 잠금, SQLite 는 쓰기 잠금을 잡아
+            # 같은 좌석 예약의 아래 확인과 저장이 워커 사이에서도 차례로 실행됨 (SELECT FOR UPDATE 는 SQLite 에서 무시됨)
+            await database.execute(
+                seats.update().where(seats.c.id == request.seat_id).values(branch_id=seats.c.branch_id)
+            )
+            overlapping = await database.fetch_one(
+                select(seat_reservations.c.id)
+                .where(seat_reservations.c.seat_id == request.seat_id)
+                .where(seat_reservations.c.status.in_(ACTIVE_STATUSES))
+                .where(seat_reservations.c.start_at < end_at)
+                .where(seat_reservations.c.end_at > start_at)
+            )
+            if overlapping:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="이미 예약된 시간입니다.")
+
+            reservation_id = await database.execute(
+                seat_reservations.insert().values({
+                    key: value for key, value in reservation.items() if key != "id"
+                })
+            )
+    except Exception:
+        reservation_book.release(reservation)
+        raise
+
+    reservation["id"] = reservation_id
+    reservation_book.confirm(reservation)
+    return ReservationResponse(**reservation)
+
+
+# 내 예약 목록 (끝나지 않은 예약)
+@router.get("/reservations/me", response_model=List[ReservationResponse])
+async def get_my_reservations(user_id: int = Depends(get_current_user)):
+    now = datetime.now(KST)
+    records = await database.fetch_all(
+        seat_reservations.select()
+        .where(seat_reservations.c.user_id == user_id)
+        .where(seat_reservations.c.status.in_(ACTIVE_STATUSES))
+        .where(seat_reservations.c.end_at > now)
+        .order_by(seat_reservations.c.start_at)
+    )
+    return [ReservationResponse(**reservation_values(record)) for record in records]
+
+
+# 예약 취소 (착석 전 예약만)
+@router.delete("/reservations/{reservation_id}")
+async def cancel_reservation(reservation_id: int, user_id: int = Depends(get_current_user)):
+    cancelled = await database.fetch_one(
+        seat_reservations.update()
+        .where(seat_reservations.c.id == reservation_id)
+        .where(seat_reservations.c.user_id == user_id)
+        .where(seat_reservations.c.status == "booked")
+        .values(status="cancelled")
+        .returning(seat_reservations.c.id)
+    )
+    if not cancelled:
+        raise HTTPException(status_code=404, detail="취소할 수 있는 예약이 없습니다.")
+
+    reservation = reservation_book.get(reservation_id)
+    if reservation is not None:
+        reservation_book.release(reservation)
+
+    return {"message": "예약이 취소되었습니다."}
+
+
+# 하루 동안의 지점 좌석별 예약 현황
+@router.get("/reservations/availability", response_model=List[SeatAvailability])
+@router.get("/branches/{branch_id}/reservations/availability", response_model=List[SeatAvailability])
+async def get_availability(
+    day: date,
+    branch_id: int = Depends(get_branch),
+    user_id: int = Depends(get_current_user),
+):
+    """
+    좌석마다 그날 잡혀 있는 예약 시간대. 좌석 목록과 예약 모두 메모리 인덱스에서 읽음.
+    SeatAvailability 모양의 dict 를 모델 없이 바로 직렬화.
+    """
+    day_start = KST.localize(datetime.combine(day, time.min))
+    day_end = day_start + timedelta(days=1)
+
+    return FastJSONResponse([
+        {
+            "seat_id": entry["seat_id"],
+            "is_occupied": entry["is_occupied"],
+            "reservations": [
+                {"start_at": reservation["start_at"], "end_at": reservation["end_at"]}
+                for reservation in reservation_book.overlapping(entry["seat_id"], day_start, day_end)
+            ],
+        }
+        for entry in await seat_maps.get(branch_id)
+    ])
+
+
+# 주어진 시간대에 예약할 수 있는 좌석
+@router.get("/reservations/free", response_model=List[str])
+@router.get("/branches/{branch_id}/reservations/free", response_model=List[str])
+async def get_free_seats(
+    start_at: datetime,
+    end_at: datetime,
+    branch_id: int = Depends(get_branch),
+    user_id: int = Depends(get_current_user),
+):
+    now = datetime.now(KST)
+    start_at = to_kst(start_at)
+    end_at = to_kst(end_at)
+    if end_at <= start_at:
+        raise HTTPException(status_code=400, detail="종료 시각이 시작 시각보다 빠릅니다.")
+
+    free = []
+    for entry in await seat_maps.get(branch_id):
+        busy_until = occupied_until(entry, now)
+        if busy_until is not None and start_at < busy_until:
+            continue
+        if reservation_book.conflict(entry["seat_id"], start_at, end_at):
+            continue
+        free.append(entry["seat_id"])
+    return free
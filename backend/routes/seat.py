@@ -1,97 +1,89 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime, timezone, timedelta, tzinfo
 from database import database
 from models import seats, user_passes, passes
 from routes.protected import get_current_user
+from routes.branches import get_branch
+from seat_state import seat_maps, seat_status
+from seat_hub import seat_hubs, format_sse
+from fast_json import FastJSONResponse
+import asyncio
 import pytz
 KST = pytz.timezone("Asia/Seoul")
 router=APIRouter()
 
+# SSE 연결 유지용 주석 전송 간격 (초)
+KEEPALIVE_SECONDS = 15
+
 class SeatStatusResponse(BaseModel):
     seat_name: str
     is_occupied: bool
     occupant_user_pass_id: Optional[int] = None
     occupant_remaining_time: Optional[int] = None  # 분 단위로 예시
+    is_paused: bool = False  # 외출 중 (좌석은 유지, 정액 시간권은 시간이 흐르지 않음)
 
 
+# /status 는 기본 지점(본점), /branches/{branch_id}/status 는 해당 지점
 @router.get("/status", response_model=List[SeatStatusResponse])
-async def get_seat_status(user_id: int = Depends(get_current_user)):
+@router.get("/branches/{branch_id}/status", response_model=List[SeatStatusResponse])
+async def get_seat_status(branch_id: int = Depends(get_branch), user_id: int = Depends(get_current_user)):
     """
-    모든 좌석 상태 조회 API.
+    지점의 모든 좌석 상태 조회 API.
     착석 중인 좌석은 occupant 정보와 남은 시간(분)을 포함해 반환.
     """
 
-    # 1. 모든 좌석 조회
-    query = seats.select()
-    seat_records = await database.fetch_all(query)
-
-    seat_status_list = []
-
-    # 2. 착석중인 좌석에 대한 user_pass, pass 정보 조회 및 남은 시간 계산
-    for seat in seat_records:
-        if seat["is_occupied"] is not None:
-            user_pass_query = user_passes.select().where(user_passes.c.id == seat["user_pass_id"])
-            user_pass = await database.fetch_one(user_pass_query)
-
-            if not user_pass:
-                # 데이터 이상한 경우 대비: 착석 좌석에 user_pass_id가 없으면 비우기
-                occupant_user_pass_id = None
-                occupant_remaining_time = None
-            else:
-
-                occupant_user_pass_id = seat["user_pass_id"]
-
-                # 남은 시간 계산 (분 단위)
-                remaining_time = None
-                now = datetime.now(KST)
-
-                if user_pass["expire_at"]:
-                    expire_at = KST.localize(user_pass["expire_at"])
-                    remaining_delta = expire_at - now
-                    remaining_time = max(int(remaining_delta.total_seconds() // 60), 0)
-
-                elif user_pass["remaining_time"]:
-                    # 예: 남은 시간이 직접 저장된 경우
-                    start_at = KST.localize(seat["start_at"])
-                    usetime_delta = now - start_at
-                    remaining_time = max(int(user_pass["remaining_time"] - int(usetime_delta.total_seconds() // 60)),0)
-                
+    # 1. 지점 좌석 스냅샷 조회 (좌석 + user_pass + pass 를 한 번의 조인 쿼리로 읽고 지점별로 캐시)
+    entries = await seat_maps.get(branch_id)
+    now = datetime.now(KST)
 
-                # 남은 시간이 0 이하라면 만료 처리
-                if remaining_time is not None and remaining_time <= 0:
-                    # 1. 좌석 비우기
-                    seat_update = (
-                        seats.update()
-                        .where(seats.c.id == seat["id"])
-                        .values(is_occupied=False, user_pass_id=None, start_at=None)
-                    )
-                    await database.execute(seat_update)
+    # 2. 스냅샷으로 남은 시간 계산 (좌석별 추가 쿼리 없음, 만료 처리는 expiry 스위퍼가 담당)
+    #    seat_status() 가 이미 SeatStatusResponse 모양이라 모델 없이 바로 직렬화
+    return FastJSONResponse([seat_status(entry, now) for entry in entries])
 
-                    # 2. user_pass 만료처리: 삭제
-                    delete_pass = user_passes.delete().where(user_passes.c.id == user_pass["id"])
-                    await database.execute(delete_pass)
-
-                    # 3. 반환용 데이터
-                    occupant_user_pass_id = None
-                    remaining_time = None
-
-
-                occupant_remaining_time = remaining_time
-
-        else:
-            occupant_user_pass_id = None
-            occupant_remaining_time = None
-
-        seat_status_list.append(
-            SeatStatusResponse(
-                seat_name=seat["id"],
-                is_occupied=seat["is_occupied"],
-                occupant_user_pass_id=occupant_user_pass_id,
-                occupant_remaining_time=occupant_remaining_time,
-            )
-        )
-
-    return seat_status_list
 
+@router.get("/status/stream")
+@router.get("/branches/{branch_id}/status/stream")
+async def stream_seat_status(token: str = Query(...), branch_id: int = Depends(get_branch)):
+    """
+    지점 좌석 상태 실시간 구독 API (Server-Sent Events).
+    연결 직후 지점 전체 좌석 스냅샷(snapshot)을 보내고, 이후 착석/퇴실/만료로 바뀐 좌석만(seat) 보냄.
+    EventSource 는 헤더를 붙일 수 없어서 토큰을 쿼리 파라미터로 받음.
+    """
+    await get_current_user(token)
+
+    # 스냅샷을 읽기 전에 구독해서 그 사이에 생긴 변경을 놓치지 않게 함
+    hub = seat_hubs.channel(branch_id)
+    queue = hub.subscribe()
+    try:
+        entries = await seat_maps.get(branch_id)
+    except Exception:
+        hub.unsubscribe(queue)
+        raise
+    now = datetime.now(KST)
+    snapshot = [seat_status(entry, now) for entry in entries]
+
+    async def event_stream():
+        try:
+            yield format_sse("snapshot", snapshot)
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # 프록시가 유휴 연결을 끊지 않도록 주석 한 줄 전송
+                    yield ": keepalive\n\n"
+                    continue
+
+                if message is None:
+                    break
+                yield message
+        finally:
+            hub.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,164 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from typing import List, Optional, Set
+from sqlalchemy import select
+from database import database
+from models import seats
+from routes.protected import get_current_user, get_admin_user
+from routes.branches import get_branch
+from seat_layout import seat_layouts, recommend_seats, recommend_group
+from seat_state import seat_maps
+
+router = APIRouter()
+
+# 한 번에 추천하는 최대 좌석 수 / 함께 앉는 최대 인원
+MAX_RECOMMEND_COUNT = 20
+MAX_GROUP_SIZE = 10
+
+# 좌석 배치 한 칸 (관리자 배치 등록, 배치 조회 응답)
+class SeatLayoutItem(BaseModel):
+    seat_id: str
+    zone: Optional[str] = None
+    x: Optional[int] = None
+    y: Optional[int] = None
+    features: List[str] = []
+
+class SeatLayoutRequest(BaseModel):
+    seats: List[SeatLayoutItem] = Field(..., min_length=1)
+
+class SeatRecommendation(SeatLayoutItem):
+    matched_features: List[str] = []
+
+
+def parse_feature_query(features: Optional[str]) -> Set[str]:
+    if not features:
+        return set()
+    return {feature.strip() for feature in features.split(",") if feature.strip()}
+
+
+# 지금 점유 중인 좌석 (지점 좌석 스냅샷에서, DB 조회 없음)
+async def occupied_seats(branch_id: int) -> Set[str]:
+    return {entry["seat_id"] for entry in await seat_maps.get(branch_id) if entry["is_occupied"]}
+
+
+# 지점 좌석 배치 조회
+@router.get("/seats/layout", response_model=List[SeatLayoutItem])
+@router.get("/branches/{branch_id}/seats/layout", response_model=List[SeatLayoutItem])
+async def get_seat_layout(branch_id: int = Depends(get_branch), user_id: int = Depends(get_current_user)):
+    layout = await seat_layouts.get(branch_id)
+    return [
+        SeatLayoutItem(
+            seat_id=seat["seat_id"],
+            zone=seat["zone"],
+            x=seat["x"],
+            y=seat["y"],
+            features=sorted(seat["features"]),
+        )
+        for seat in sorted(layout.seats.values(), key=lambda seat: seat["seat_id"])
+    ]
+
+
+# 지점 좌석 배치 등록/수정 (관리자), 없는 좌석은 새로 만듦
+@router.put("/seats/layout")
+@router.put("/branches/{branch_id}/seats/layout")
+async def update_seat_layout(
+    request: SeatLayoutRequest,
+    branch_id: int = Depends(get_branch),
+    admin_id: int = Depends(get_admin_user),
+):
+    seat_ids = [item.seat_id for item in request.seats]
+    if len(set(seat_ids)) != len(seat_ids):
+        raise HTTPException(status_code=400, detail="중복된 좌석이 있습니다.")
+
+    rows = [
+        {
+            "seat_id": item.seat_id,
+            "zone": item.zone,
+            "pos_x": item.x,
+            "pos_y": item.y,
+            "features": ",".join(sorted(set(item.features))) or None,
+        }
+        for item in request.seats
+    ]
+
+    async with database.transaction():
+        # 1. 이미 있는 좌석 확인 (좌석 id 는 모든 지점에서 하나뿐이라 다른 지점 좌석이면 거절)
+        existing = {
+            record["id"]: record["branch_id"]
+            for record in await database.fetch_all(
+                select(seats.c.id, seats.c.branch_id).where(seats.c.id.in_(seat_ids))
+            )
+        }
+        other_branch = sorted(seat_id for seat_id, owner in existing.items() if owner != branch_id)
+        if other_branch:
+            raise HTTPException(status_code=409, detail=f"다른 지점의 좌석입니다: {other_branch}")
+
+        # 2. 있는 좌석은 배치만 갱신, 없는 좌석은 빈 좌석으로 추가
+        updates = [row for row in rows if row["seat_id"] in existing]
+        inserts = [row for row in rows if row["seat_id"] not in existing]
+        for row in updates:
+            await database.execute(
+                seats.update()
+                .where(seats.c.id == row["seat_id"])
+                .values(zone=row["zone"], pos_x=row["pos_x"], pos_y=row["pos_y"], features=row["features"])
+            )
+        if inserts:
+            await database.execute_many(
+                seats.insert(),
+                [
+                    {
+                        "id": row["seat_id"],
+                        "is_occupied": False,
+                        "branch_id": branch_id,
+                        "zone": row["zone"],
+                        "pos_x": row["pos_x"],
+                        "pos_y": row["pos_y"],
+                        "features": row["features"],
+                    }
+                    for row in inserts
+                ],
+            )
+
+    seat_layouts.invalidate(branch_id)
+    seat_maps.invalidate(branch_id)
+    return {"message": "좌석 배치가 저장되었습니다.", "updated": len(updates), "created": len(inserts)}
+
+
+# 빈 좌석 추천
+@router.get("/seats/recommend", response_model=List[SeatRecommendation])
+@router.get("/branches/{branch_id}/seats/recommend", response_model=List[SeatRecommendation])
+async def get_seat_recommendations(
+    count: int = Query(1, ge=1, le=MAX_RECOMMEND_COUNT),
+    features: Optional[str] = Query(None, description="원하는 좌석 특성, 쉼표로 구분 (예: outlet,window)"),
+    zone: Optional[str] = None,
+    branch_id: int = Depends(get_branch),
+    user_id: int = Depends(get_current_user),
+):
+    """
+    원하는 특성을 많이 갖추고 주변이 한산한 빈 좌석 순서로 count 개 추천.
+    배치와 점유 상태 모두 메모리 캐시에서 계산함.
+    """
+    layout = await seat_layouts.get(branch_id)
+    occupied = await occupied_seats(branch_id)
+    return recommend_seats(layout, occupied, count, parse_feature_query(features), zone)
+
+
+# 여러 명이 붙어 앉을 좌석 추천
+@router.get("/seats/recommend/group", response_model=List[SeatRecommendation])
+@router.get("/branches/{branch_id}/seats/recommend/group", response_model=List[SeatRecommendation])
+async def get_group_seat_recommendation(
+    size: int = Query(..., ge=1, le=MAX_GROUP_SIZE),
+    features: Optional[str] = Query(None, description="원하는 좌석 특성, 쉼표로 구분 (예: outlet,window)"),
+    zone: Optional[str] = None,
+    branch_id: int = Depends(get_branch),
+    user_id: int = Depends(get_current_user),
+):
+    """
+    size 명이 함께 앉을 수 있는 빈 좌석 묶음 추천. 같은 줄 연속 좌석을 먼저, 없으면 앞뒤로 이어진 좌석.
+    """
+    layout = await seat_layouts.get(branch_id)
+    occupied = await occupied_seats(branch_id)
+    group = recommend_group(layout, occupied, size, parse_feature_query(features), zone)
+    if group is None:
+        raise HTTPException(status_code=404, detail="함께 앉을 수 있는 빈 좌석이 없습니다.")
+    return group
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 # 사용자의 입력값을 검증하고 구조화할 수 있는 도구 (Pydantic의 BaseModel)
 from pydantic import BaseModel
 # 우리가 만든 비동기 DB 연결 객체
@@ -9,6 +9,8 @@ from models import users
 from datetime import datetime, timezone, timedelta, tzinfo
 # JWT 생성을 위한 라이브러리 
 from jose import jwt
+# 로그인/가입 시도 횟수 제한 (무차별 대입, 번호 조회 방지)
+from rate_limit import RateLimiter, enforce, limit_by_ip
 # FastAPI 라우터 객체 생성 (user 관련 경로 전용)
 router = APIRouter()
 
@@ -25,6 +27,12 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM="HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
+# 요청 횟수 제한: IP 기준(공용 키오스크/와이파이를 고려해 넉넉히)과 핸드폰 번호 기준
+login_ip_limiter = RateLimiter("login_ip", limit=30, period=60)
+login_phone_limiter = RateLimiter("login_phone", limit=5, period=60)
+signup_ip_limiter = RateLimiter("signup_ip", limit=10, period=600)
+signup_phone_limiter = RateLimiter("signup_phone", limit=3, period=600)
+
 
 # 사용자가 회원가입 시 보내는 데이터 형식 정의
 class UserCreate(BaseModel):
@@ -49,13 +57,16 @@ def create_access_token(data: dict, expires_delta: timedelta):
 
 
 # 회원가입 API 엔드포인트 정의
-@router.post("/signup")
+@router.post("/signup", dependencies=[Depends(limit_by_ip(signup_ip_limiter))])
 async def signup(user: UserCreate):
     """
     사용자 회원가입 처리 함수
     :param user: 요청 바디로 전달된 회원 정보 (name, age, phone_number)
     """
 
+    # 0. 같은 번호로 너무 자주 시도하면 429 (IP 기준 제한은 의존성에서 먼저 검사)
+    enforce(signup_phone_limiter, user.phone_number)
+
     # 1. 핸드폰 번호로 이미 등록된 사용자인지 DB 조회
     query = users.select().where(users.c.phone_number == user.phone_number)
     existing_user = await database.fetch_one(query)
@@ -77,7 +88,7 @@ async def signup(user: UserCreate):
     return {"message": "회원가입 성공"}
 
 # 로그인 API 라우터
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(limit_by_ip(login_ip_limiter))])
 async def login(user: UserLogin):
     """
     핸드폰 번호로 로그인 요청을 처리합니다.
@@ -85,6 +96,9 @@ async def login(user: UserLogin):
     등록되지 않은 번호일 경우 에러를 반환합니다.
     """
 
+    # 0. 같은 번호로 너무 자주 시도하면 429 (IP 기준 제한은 의존성에서 먼저 검사)
+    enforce(login_phone_limiter, user.phone_number)
+
     # 1. 해당 번호로 등록된 사용자가 있는지 데이터베이스에서 조회
     query = users.select().where(users.c.phone_number == user.phone_number)
     existing_user = await database.fetch_one(query)
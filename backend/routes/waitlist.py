@@ -0,0 +1,134 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select
+from database import database
+from models import user_passes
+from routes.protected import get_current_user, get_admin_user
+from routes.branches import get_branch
+from waitlist import waitlist
+import asyncio
+import pytz
+KST = pytz.timezone("Asia/Seoul")
+router = APIRouter()
+
+# SSE 연결 유지용 주석 전송 간격 (초)
+KEEPALIVE_SECONDS = 15
+
+class WaitlistResponse(BaseModel):
+    entry_id: int
+    branch_id: int
+    status: str                               # 'waiting' 또는 'offered'
+    position: int                             # 내 앞 대기자 포함 순번, 좌석을 제안받았으면 0
+    seat_id: Optional[str] = None             # 제안받은 좌석
+    offer_expires_at: Optional[datetime] = None
+
+class PriorityRequest(BaseModel):
+    priority: int
+
+
+def waitlist_response(entry: dict) -> WaitlistResponse:
+    return WaitlistResponse(
+        entry_id=entry["id"],
+        branch_id=entry["branch_id"],
+        status=entry["status"],
+        position=waitlist.position(entry),
+        seat_id=entry["seat_id"] if entry["status"] == "offered" else None,
+        offer_expires_at=entry["offer_expires_at"] if entry["status"] == "offered" else None,
+    )
+
+
+# 좌석 대기 신청 (빈 좌석이 있으면 바로 제안받음)
+@router.post("/waitlist", response_model=WaitlistResponse)
+@router.post("/branches/{branch_id}/waitlist", response_model=WaitlistResponse)
+async def join_waitlist(branch_id: int = Depends(get_branch), user_id: int = Depends(get_current_user)):
+    if waitlist.find(branch_id, user_id) is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="이미 대기 중입니다.")
+
+    # 이 지점에서 착석에 쓸 수 있는 (기간이 남고 남은 시간도 있는) 이용권이 있어야 대기 가능
+    now = datetime.now(KST)
+    owned_passes = await database.fetch_all(
+        select(user_passes.c.id, user_passes.c.seat_id)
+        .where(user_passes.c.user_id == user_id)
+        .where(user_passes.c.branch_id == branch_id)
+        .where(user_passes.c.expire_at.is_(None) | (user_passes.c.expire_at > now))
+        .where(user_passes.c.remaining_seconds.is_(None) | (user_passes.c.remaining_seconds > 0))
+    )
+    if any(record["seat_id"] is not None for record in owned_passes):
+        raise HTTPException(status_code=400, detail="이미 착석 중입니다.")
+    if not owned_passes:
+        raise HTTPException(status_code=400, detail="이 지점에서 쓸 수 있는 이용권이 없습니다.")
+
+    entry = await waitlist.join(branch_id, user_id, now)
+    if entry is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="이미 대기 중입니다.")
+    return waitlist_response(entry)
+
+
+# 내 대기 상태 (순번, 제안받은 좌석)
+@router.get("/waitlist/me", response_model=WaitlistResponse)
+@router.get("/branches/{branch_id}/waitlist/me", response_model=WaitlistResponse)
+async def get_my_waitlist(branch_id: int = Depends(get_branch), user_id: int = Depends(get_current_user)):
+    entry = waitlist.find(branch_id, user_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="대기 중이 아닙니다.")
+    return waitlist_response(entry)
+
+
+# 대기 취소 (제안받은 좌석이 있으면 다음 대기자에게 넘어감)
+@router.delete("/waitlist/me")
+@router.delete("/branches/{branch_id}/waitlist/me")
+async def cancel_waitlist(branch_id: int = Depends(get_branch), user_id: int = Depends(get_current_user)):
+    entry = waitlist.find(branch_id, user_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="대기 중이 아닙니다.")
+    await waitlist.leave(entry, "cancelled", datetime.now(KST))
+    return {"message": "대기가 취소되었습니다."}
+
+
+# 대기 우선순위 변경 (관리자)
+@router.put("/waitlist/{entry_id}/priority")
+async def update_waitlist_priority(
+    entry_id: int,
+    request: PriorityRequest,
+    admin_id: int = Depends(get_admin_user),
+):
+    entry = waitlist.get(entry_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="대기 중인 항목이 없습니다.")
+    await waitlist.set_priority(entry, request.priority)
+    return waitlist_response(entry)
+
+
+@router.get("/waitlist/stream")
+async def stream_waitlist(token: str = Query(...)):
+    """
+    내 대기 알림 실시간 구독 API (Server-Sent Events).
+    좌석을 제안받으면(offer) 좌석과 제안 만료 시각을, 시간 안에 앉지 않으면(expired) 만료를 보냄.
+    /status 를 반복 조회하는 대신 내 차례가 왔을 때 이벤트 한 건만 받음.
+    """
+    user_id = await get_current_user(token)
+    queue = waitlist.subscribe(user_id)
+
+    async def event_stream():
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if message is None:
+                    break
+                yield message
+        finally:
+            waitlist.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,137 @@
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, Set
+from fastapi import HTTPException, status
+from sqlalchemy import case, select, or_
+from database import database
+from models import seats, user_passes
+
+# 지금 이 프로세스에서 배정 처리 중인 좌석 (같은 좌석 동시 요청은 DB까지 가지 않고 바로 409)
+_claiming_seats: Set[str] = set()
+
+
+@contextmanager
+def seat_guard(seat_id: str):
+    """
+    좌석별 프로세스 내 잠금. 이미 처리 중인 좌석이면 기다리지 않고 바로 409.
+    """
+    if seat_id in _claiming_seats:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="다른 사용자가 착석 처리 중인 좌석입니다",
+        )
+
+    _claiming_seats.add(seat_id)
+    try:
+        yield
+    finally:
+        _claiming_seats.discard(seat_id)
+
+
+async def claim_seat(seat_id: str, user_pass_id: int, user_id: int, now: datetime, branch_id: Optional[int] = None):
+    """
+    좌석 배정. 좌석 점유와 이용권 착석 처리를 한 트랜잭션 안의 조건부 UPDATE로 처리해
+    동시에 같은 좌석을 요청해도 한 명만 성공함.
+    branch_id 를 주면 그 지점 좌석만 배정. 이용권은 좌석과 같은 지점 것이어야 함.
+    성공하면 배정된 user_pass 행을 반환.
+    """
+    seat_filter = seats.c.id == seat_id
+    if branch_id is not None:
+        seat_filter = seat_filter & (seats.c.branch_id == branch_id)
+
+    with seat_guard(seat_id):
+        async with database.transaction():
+            # 1. 비어 있는 좌석일 때만 점유 (다른 워커와의 경쟁도 여기서 걸러짐)
+            claimed = await database.fetch_one(
+                seats.update()
+                .where(seat_filter)
+                .where(or_(seats.c.is_occupied == False, seats.c.is_occupied.is_(None)))
+                .values(is_occupied=True, user_pass_id=user_pass_id, start_at=now)
+                .returning(seats.c.id, seats.c.branch_id)
+            )
+
+            if not claimed:
+                exists = await database.fetch_one(select(seats.c.id).where(seat_filter))
+                if not exists:
+                    raise HTTPException(status_code=404, detail="존재하지 않는 좌석입니다")
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="이미 점유된 좌석입니다")
+
+            # 2. 본인 소유이고 같은 지점이며 아직 착석하지 않은, 기간과 남은 시간이 있는 이용권일 때만 착석 처리
+            #    (만료 정리 전의 만료 이용권으로는 앉을 수 없음). 정액 시간권은 지금부터 사용 시간 계량 시작
+            user_pass = await database.fetch_one(
+                user_passes.update()
+                .where(user_passes.c.id == user_pass_id)
+                .where(user_passes.c.user_id == user_id)
+                .where(user_passes.c.branch_id == claimed["branch_id"])
+                .where(user_passes.c.seat_id.is_(None))
+                .where(user_passes.c.expire_at.is_(None) | (user_passes.c.expire_at > now))
+                .where(user_passes.c.remaining_seconds.is_(None) | (user_passes.c.remaining_seconds > 0))
+                .values(
+                    is_active=True,
+                    seat_id=seat_id,
+                    metered_at=case((user_passes.c.remaining_seconds.is_not(None), now), else_=None),
+                    paused_at=None,
+                )
+                .returning(*user_passes.c)
+            )
+
+            # 실패하면 예외로 트랜잭션이 롤백되어 1번의 좌석 점유도 취소됨
+            if not user_pass:
+                owned = await database.fetch_one(
+                    user_passes.select()
+                    .where(user_passes.c.id == user_pass_id)
+                    .where(user_passes.c.user_id == user_id)
+                )
+                if not owned:
+                    raise HTTPException(status_code=404, detail="보유하지 않은 이용권입니다")
+                if owned["branch_id"] != claimed["branch_id"]:
+                    raise HTTPException(status_code=400, detail="다른 지점의 이용권입니다")
+                if owned["seat_id"] is None:
+                    raise HTTPException(status_code=400, detail="만료된 이용권입니다")
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="이미 착석 중인 이용권입니다")
+
+    return user_pass
+
+
+async def release_seat(seat_id: str, user_id: Optional[int], branch_id: Optional[int] = None):
+    """
+    퇴실할 좌석 비우기. 이용권 정산/이용 기록과 같은 트랜잭션 안에서 호출.
+    점유 중일 때만 is_occupied 를 내리는 조건부 UPDATE 로 먼저 차지하므로 같은 좌석에 동시에 들어온
+    퇴실/만료 정리 중 하나만 행을 돌려받고 나머지는 404 (읽기 없이 쓰기부터 해서 SQLite 에서도 잠금을 기다림).
+    user_id 를 주면 그 사용자 이용권으로 앉은 좌석만 비움 (None 이면 관리자: 누구 좌석이든).
+    성공하면 비우기 전 좌석 행(id, branch_id, start_at, user_pass_id)을 반환.
+    """
+    seat_filter = seats.c.id == seat_id
+    if branch_id is not None:
+        seat_filter = seat_filter & (seats.c.branch_id == branch_id)
+    if user_id is not None:
+        seat_filter = seat_filter & seats.c.user_pass_id.in_(
+            select(user_passes.c.id).where(user_passes.c.user_id == user_id)
+        )
+
+    # 1. 점유 해제 차지. user_pass_id/start_at 은 아직 바꾸지 않으므로 RETURNING 이 비우기 전 값을 돌려줌
+    seat = await database.fetch_one(
+        seats.update()
+        .where(seat_filter)
+        .where(seats.c.is_occupied == True)
+        .values(is_occupied=False)
+        .returning(seats.c.id, seats.c.branch_id, seats.c.start_at, seats.c.user_pass_id)
+    )
+    if not seat:
+        # 남의 좌석이면 403, 없는 좌석이거나 빈 좌석, 또는 그 사이 다른 퇴실/만료 정리가 먼저 비웠으면 404
+        if user_id is not None:
+            owner = await database.fetch_val(
+                select(user_passes.c.user_id)
+                .select_from(seats.join(user_passes, seats.c.user_pass_id == user_passes.c.id))
+                .where(seats.c.id == seat_id)
+                .where(seats.c.is_occupied == True)
+            )
+            if owner is not None and owner != user_id:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="본인이 착석한 좌석이 아닙니다.")
+        raise HTTPException(status_code=404, detail="퇴실 처리할 좌석이 없습니다.")
+
+    # 2. 나머지 점유 정보 지우기 (같은 트랜잭션이라 다른 요청은 중간 상태를 보지 못함)
+    await database.execute(
+        seats.update().where(seats.c.id == seat_id).values(user_pass_id=None, start_at=None)
+    )
+    return seat
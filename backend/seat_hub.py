@@ -0,0 +1,91 @@
+import asyncio
+import json
+import logging
+from typing import Dict, Iterable, Set
+from seat_state import free_seat_status
+
+logger = logging.getLogger(__name__)
+
+# 클라이언트 하나가 밀린 이벤트를 이만큼 쌓으면 연결을 끊고 재접속(전체 스냅샷)하게 함
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+def format_sse(event: str, data) -> str:
+    """
+    Server-Sent Events 형식의 메시지 한 건을 만듦.
+    """
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+class SeatHub:
+    """
+    한 지점의 좌석 변경 이벤트를 구독 중인 모든 클라이언트에게 나눠 주는 프로세스 내 pub/sub.
+    이벤트는 발행할 때 한 번만 직렬화하고, 각 구독자는 자기 큐에서 꺼내 씀.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: str, data):
+        if not self._subscribers:
+            return
+
+        message = format_sse(event, data)
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # 너무 느린 구독자는 끊어서 다른 구독자를 막지 않게 함
+                logger.warning("좌석 이벤트 구독자 큐가 가득 차서 연결을 끊습니다")
+                self._subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def publish_seat(self, status: dict):
+        """
+        좌석 하나의 바뀐 상태(SeatStatusResponse 형태)를 발행.
+        """
+        self.publish("seat", status)
+
+    def publish_freed(self, seat_ids: Iterable[str]):
+        for seat_id in seat_ids:
+            self.publish_seat(free_seat_status(seat_id))
+
+
+class SeatHubs:
+    """
+    지점별 좌석 이벤트 채널. 구독자는 자기 지점 이벤트만 받고, 발행도 그 지점 구독자에게만 직렬화/전달함.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._channels: Dict[int, SeatHub] = {}
+
+    def channel(self, branch_id: int) -> SeatHub:
+        hub = self._channels.get(branch_id)
+        if hub is None:
+            hub = self._channels[branch_id] = SeatHub(self.queue_size)
+        return hub
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(hub.subscriber_count for hub in self._channels.values())
+
+
+# 앱 전체에서 공유하는 지점별 좌석 이벤트 허브
+seat_hubs = SeatHubs()
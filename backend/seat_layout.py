@@ -0,0 +1,219 @@
+import asyncio
+import heapq
+import time
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import select
+from database import database
+from models import seats
+
+# 좌석 배치는 관리자가 바꿀 때만 바뀌므로 길게 캐시, 다른 워커의 변경은 이 시간 안에 반영 (초)
+SEAT_LAYOUT_TTL_SECONDS = 60
+
+
+def parse_features(value: Optional[str]) -> FrozenSet[str]:
+    if not value:
+        return frozenset()
+    return frozenset(feature.strip() for feature in value.split(",") if feature.strip())
+
+
+class BranchLayout:
+    """
+    한 지점의 좌석 배치 인덱스. 좌석별 구역/좌표/특성과 인접 좌석 목록, 줄(구역, pos_y)별 좌석 순서를 들고 있음.
+    인접: 같은 구역에서 격자 좌표가 상하좌우로 1칸 차이인 좌석.
+    """
+
+    def __init__(self, records: Iterable[dict]):
+        self.seats: Dict[str, dict] = {}
+        self.neighbors: Dict[str, List[str]] = {}
+        self.rows: Dict[Tuple[str, int], List[Tuple[int, str]]] = defaultdict(list)  # (구역, pos_y) → [(pos_x, seat_id)]
+
+        by_position: Dict[Tuple[str, int, int], str] = {}
+        for record in records:
+            seat = {
+                "seat_id": record["id"],
+                "zone": record["zone"],
+                "x": record["pos_x"],
+                "y": record["pos_y"],
+                "features": parse_features(record["features"]),
+            }
+            self.seats[seat["seat_id"]] = seat
+            if seat["x"] is not None and seat["y"] is not None:
+                by_position[(seat["zone"], seat["x"], seat["y"])] = seat["seat_id"]
+                self.rows[(seat["zone"], seat["y"])].append((seat["x"], seat["seat_id"]))
+
+        for row in self.rows.values():
+            row.sort()
+
+        for seat_id, seat in self.seats.items():
+            if seat["x"] is None or seat["y"] is None:
+                self.neighbors[seat_id] = []
+                continue
+            zone, x, y = seat["zone"], seat["x"], seat["y"]
+            self.neighbors[seat_id] = [
+                by_position[position]
+                for position in ((zone, x - 1, y), (zone, x + 1, y), (zone, x, y - 1), (zone, x, y + 1))
+                if position in by_position
+            ]
+
+
+class SeatLayouts:
+    """
+    지점별 BranchLayout 캐시. 배치를 바꾸면 invalidate() 로 다음 조회 때 다시 읽음.
+    """
+
+    def __init__(self, ttl: float = SEAT_LAYOUT_TTL_SECONDS):
+        self.ttl = ttl
+        self._layouts: Dict[int, Tuple[float, BranchLayout]] = {}
+        self._locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    def invalidate(self, branch_id: int):
+        self._layouts.pop(branch_id, None)
+
+    def _fresh(self, branch_id: int) -> Optional[BranchLayout]:
+        cached = self._layouts.get(branch_id)
+        if cached and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+        return None
+
+    async def get(self, branch_id: int) -> BranchLayout:
+        layout = self._fresh(branch_id)
+        if layout is not None:
+            return layout
+
+        async with self._locks[branch_id]:
+            layout = self._fresh(branch_id)
+            if layout is None:
+                records = await database.fetch_all(
+                    select(seats.c.id, seats.c.zone, seats.c.pos_x, seats.c.pos_y, seats.c.features)
+                    .where(seats.c.branch_id == branch_id)
+                )
+                layout = BranchLayout(records)
+                self._layouts[branch_id] = (time.monotonic(), layout)
+            return layout
+
+
+# 앱 전체에서 공유하는 지점별 좌석 배치
+seat_layouts = SeatLayouts()
+
+
+def rank_keys(layout: BranchLayout, occupied: Set[str], features: Set[str], zone: Optional[str]) -> Dict[str, tuple]:
+    """
+    빈 좌석별 순위 키 (-갖춘 특성 수, -비어 있는 옆자리 수, 좌석 id). 작을수록 먼저 추천.
+    """
+    ranks = {}
+    neighbors = layout.neighbors
+    for seat_id, seat in layout.seats.items():
+        if seat_id in occupied or (zone is not None and seat["zone"] != zone):
+            continue
+        matched = len(features & seat["features"]) if features else 0
+        free_neighbors = 0
+        for neighbor in neighbors[seat_id]:
+            if neighbor not in occupied:
+                free_neighbors += 1
+        ranks[seat_id] = (-matched, -free_neighbors, seat_id)
+    return ranks
+
+
+def recommendation(layout: BranchLayout, seat_id: str, features: Set[str]) -> dict:
+    seat = layout.seats[seat_id]
+    return {
+        "seat_id": seat_id,
+        "zone": seat["zone"],
+        "x": seat["x"],
+        "y": seat["y"],
+        "features": sorted(seat["features"]),
+        "matched_features": sorted(features & seat["features"]),
+    }
+
+
+def recommend_seats(
+    layout: BranchLayout,
+    occupied: Set[str],
+    count: int,
+    features: Set[str],
+    zone: Optional[str] = None,
+) -> List[dict]:
+    """
+    빈 좌석 중 원하는 특성을 많이 갖추고 주변이 한산한 순서로 count 개.
+    """
+    best = heapq.nsmallest(count, rank_keys(layout, occupied, features, zone).values())
+    return [recommendation(layout, seat_id, features) for _, _, seat_id in best]
+
+
+def recommend_group(
+    layout: BranchLayout,
+    occupied: Set[str],
+    size: int,
+    features: Set[str],
+    zone: Optional[str] = None,
+) -> Optional[List[dict]]:
+    """
+    size 명이 붙어 앉을 빈 좌석 묶음. 같은 줄에 연달아 있는 좌석을 먼저 찾고,
+    없으면 옆자리로 이어진(상하좌우) 좌석 묶음을 찾음. 못 찾으면 None.
+    """
+    if size == 1:
+        best = recommend_seats(layout, occupied, 1, features, zone)
+        return best or None
+
+    # 빈 좌석마다 순위 키를 한 번만 계산해 두고 아래 두 단계에서 같이 씀
+    ranks = rank_keys(layout, occupied, features, zone)
+
+    def group_key(group: List[str]) -> tuple:
+        # 작을수록 좋은 묶음: 갖춘 특성 합이 많고, 같으면 앞쪽 줄/앞쪽 좌석
+        first = layout.seats[group[0]]
+        return sum(ranks[seat_id][0] for seat_id in group), first["y"], first["x"], group[0]
+
+    # 1. 같은 줄에서 pos_x 가 연속된 빈 좌석 size 개 (줄마다 한 번 훑으며 연속 구간 길이를 셈)
+    best_row = None
+    for (row_zone, _), row in layout.rows.items():
+        if zone is not None and row_zone != zone:
+            continue
+        run: List[str] = []
+        previous_x = None
+        for x, seat_id in row:
+            if seat_id not in ranks:
+                run = []
+            else:
+                if previous_x is None or x != previous_x + 1:
+                    run = []
+                run.append(seat_id)
+                if len(run) >= size:
+                    group = run[-size:]
+                    key = group_key(group)
+                    if best_row is None or key < best_row[0]:
+                        best_row = (key, group)
+            previous_x = x
+
+    if best_row is not None:
+        return [recommendation(layout, seat_id, features) for seat_id in best_row[1]]
+
+    # 2. 인접 좌석으로 이어진 묶음 (앞뒤 자리 포함), 시작 좌석마다 가장 좋은 이웃부터 넓혀 감
+    #    이미 찾은 묶음에 들어간 좌석에서 다시 시작하지는 않음
+    best_cluster = None
+    covered: Set[str] = set()
+    for start in sorted(ranks, key=ranks.__getitem__):
+        if start in covered or not layout.neighbors[start]:
+            continue
+        group = [start]
+        frontier = {neighbor for neighbor in layout.neighbors[start] if neighbor in ranks}
+        while len(group) < size and frontier:
+            chosen = min(frontier, key=ranks.__getitem__)
+            frontier.discard(chosen)
+            group.append(chosen)
+            frontier.update(
+                neighbor for neighbor in layout.neighbors[chosen]
+                if neighbor in ranks and neighbor not in group
+            )
+        if len(group) < size:
+            continue
+
+        covered.update(group)
+        group.sort(key=lambda seat_id: (layout.seats[seat_id]["y"], layout.seats[seat_id]["x"]))
+        key = group_key(group)
+        if best_cluster is None or key < best_cluster[0]:
+            best_cluster = (key, group)
+
+    if best_cluster is None:
+        return None
+    return [recommendation(layout, seat_id, features) for seat_id in best_cluster[1]]
@@ -0,0 +1,215 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from database import reader
+from models import seats, user_passes, passes
+import pytz
+KST = pytz.timezone("Asia/Seoul")
+
+# 다른 워커 프로세스에서 일어난 변경도 이 시간 안에는 반영되도록 스냅샷 수명 제한 (초)
+SEAT_MAP_TTL_SECONDS = 5
+
+
+def to_kst(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    DB에서 읽은 시간을 KST aware datetime으로 맞춤.
+    SQLite는 tz 정보 없이 저장되므로 localize, PostgreSQL은 변환만 함.
+    """
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return KST.localize(value)
+    return value.astimezone(KST)
+
+
+def unbilled_seconds(metered_at: Optional[datetime], now: datetime) -> int:
+    """
+    계량 시작(마지막 체크포인트) 이후 아직 남은 시간에서 빼지 않은 사용 시간(초). 외출/퇴실 중이면 0.
+    """
+    if metered_at is None:
+        return 0
+    return max(int((now - to_kst(metered_at)).total_seconds()), 0)
+
+
+def live_remaining_seconds(remaining_seconds: Optional[int], metered_at: Optional[datetime], now: datetime) -> Optional[int]:
+    """
+    정액 시간권의 현재 시점 남은 시간(초). 정액 시간권이 아니면 None.
+    """
+    if remaining_seconds is None:
+        return None
+    return remaining_seconds - unbilled_seconds(metered_at, now)
+
+
+def remaining_minutes(entry: dict, now: datetime) -> Optional[int]:
+    """
+    스냅샷의 좌석 항목으로 현재 시점의 남은 시간(분)을 계산.
+    기간권/시간권은 expire_at 기준, 정액 시간권은 저장된 남은 초에서 계량 중인 사용분을 뺌.
+    """
+    if entry["expire_at"] is not None:
+        remaining_delta = entry["expire_at"] - now
+        return max(int(remaining_delta.total_seconds() // 60), 0)
+
+    remaining = live_remaining_seconds(entry["remaining_seconds"], entry["metered_at"], now)
+    if remaining is not None:
+        return max(remaining // 60, 0)
+
+    return None
+
+
+def seat_status(entry: dict, now: datetime) -> dict:
+    """
+    스냅샷의 좌석 항목을 /status 응답(SeatStatusResponse) 형태의 dict로 변환.
+    """
+    occupant_user_pass_id = None
+    occupant_remaining_time = None
+
+    if entry["is_occupied"] and entry["user_pass_id"] is not None:
+        occupant_user_pass_id = entry["user_pass_id"]
+        occupant_remaining_time = remaining_minutes(entry, now)
+
+    return {
+        "seat_name": entry["seat_id"],
+        "is_occupied": entry["is_occupied"],
+        "occupant_user_pass_id": occupant_user_pass_id,
+        "occupant_remaining_time": occupant_remaining_time,
+        "is_paused": entry["is_occupied"] and entry["paused_at"] is not None,
+    }
+
+
+def occupied_entry(seat_id: str, user_pass) -> dict:
+    """
+    착석 중인 좌석의 스냅샷 항목 (좌석 이벤트 발행용).
+    """
+    return {
+        "seat_id": seat_id,
+        "is_occupied": True,
+        "user_pass_id": user_pass["id"],
+        "expire_at": to_kst(user_pass["expire_at"]),
+        "remaining_seconds": user_pass["remaining_seconds"],
+        "metered_at": to_kst(user_pass["metered_at"]),
+        "paused_at": to_kst(user_pass["paused_at"]),
+    }
+
+
+def free_seat_status(seat_id: str) -> dict:
+    """
+    퇴실/만료로 비워진 좌석의 /status 응답 형태 dict.
+    """
+    return {
+        "seat_name": seat_id,
+        "is_occupied": False,
+        "occupant_user_pass_id": None,
+        "occupant_remaining_time": None,
+        "is_paused": False,
+    }
+
+
+class SeatMap:
+    """
+    한 지점의 좌석 → user_passes → passes 를 한 번의 조인 쿼리로 읽어 프로세스 메모리에 보관하는 스냅샷.
+    착석/퇴실/만료 처리 후 invalidate() 를 호출하면 다음 조회 때 다시 읽음.
+    """
+
+    def __init__(self, branch_id: int, ttl: float = SEAT_MAP_TTL_SECONDS):
+        self.branch_id = branch_id
+        self.ttl = ttl
+        self._entries: Optional[List[dict]] = None
+        self._loaded_at = 0.0
+        self._version = 0
+        self._written_at: Optional[float] = None  # 마지막 무효화 시각, 복제 지연 동안은 주 DB에서 읽음
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        self._entries = None
+        self._version += 1
+        self._written_at = time.monotonic()
+
+    def _is_fresh(self) -> bool:
+        return self._entries is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    async def get(self) -> List[dict]:
+        if self._is_fresh():
+            return self._entries
+
+        # 동시에 들어온 조회가 모두 DB를 치지 않도록 한 요청만 다시 읽음
+        async with self._lock:
+            if self._is_fresh():
+                return self._entries
+
+            # 읽는 도중 invalidate() 가 불렸다면 결과는 이번 요청에만 쓰고 저장하지 않음
+            version = self._version
+            entries = await self._load()
+            if version == self._version:
+                self._entries = entries
+                self._loaded_at = time.monotonic()
+            return entries
+
+    async def _load(self) -> List[dict]:
+        query = (
+            select(
+                seats.c.id,
+                seats.c.is_occupied,
+                seats.c.start_at,
+                user_passes.c.id.label("user_pass_id"),
+                user_passes.c.expire_at,
+                user_passes.c.remaining_seconds,
+                user_passes.c.metered_at,
+                user_passes.c.paused_at,
+                passes.c.pass_type,
+            )
+            .select_from(
+                seats.outerjoin(user_passes, seats.c.user_pass_id == user_passes.c.id)
+                .outerjoin(passes, user_passes.c.pass_id == passes.c.id)
+            )
+            .where(seats.c.branch_id == self.branch_id)
+            .order_by(seats.c.id)
+        )
+        records = await reader(self._written_at).fetch_all(query)
+
+        return [
+            {
+                "seat_id": record["id"],
+                "is_occupied": bool(record["is_occupied"]),
+                "user_pass_id": record["user_pass_id"],
+                "start_at": to_kst(record["start_at"]),
+                "expire_at": to_kst(record["expire_at"]),
+                "remaining_seconds": record["remaining_seconds"],
+                "metered_at": to_kst(record["metered_at"]),
+                "paused_at": to_kst(record["paused_at"]),
+                "pass_type": record["pass_type"],
+            }
+            for record in records
+        ]
+
+
+class SeatMaps:
+    """
+    지점별 SeatMap 샤드. 지점마다 스냅샷, 잠금, 무효화가 따로라서
+    한 지점에서 착석/퇴실이 몰려도 다른 지점의 좌석 조회는 캐시를 그대로 씀.
+    """
+
+    def __init__(self, ttl: float = SEAT_MAP_TTL_SECONDS):
+        self.ttl = ttl
+        self._shards: Dict[int, SeatMap] = {}
+
+    def shard(self, branch_id: int) -> SeatMap:
+        seat_map = self._shards.get(branch_id)
+        if seat_map is None:
+            seat_map = self._shards[branch_id] = SeatMap(branch_id, self.ttl)
+        return seat_map
+
+    async def get(self, branch_id: int) -> List[dict]:
+        return await self.shard(branch_id).get()
+
+    def invalidate(self, branch_id: int):
+        self.shard(branch_id).invalidate()
+
+    def invalidate_all(self):
+        for seat_map in self._shards.values():
+            seat_map.invalidate()
+
+
+# 앱 전체에서 공유하는 지점별 좌석 스냅샷
+seat_maps = SeatMaps()
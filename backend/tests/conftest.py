@@ -0,0 +1,136 @@
+import itertools
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# 앱 모듈이 읽기 전에 테스트용 SQLite 파일 DB와 설정을 지정
+_db_dir = tempfile.mkdtemp(prefix="study-cafe-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ["RATE_LIMIT_ENABLED"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import pytz
+
+KST = pytz.timezone("Asia/Seoul")
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def migrated():
+    from main import run_migrations
+    run_migrations()
+
+
+@pytest.fixture
+async def db(migrated):
+    from database import database
+    await database.connect()
+    try:
+        yield database
+    finally:
+        await database.disconnect()
+
+
+_ids = itertools.count(1)
+
+
+@pytest.fixture
+def next_id():
+    """
+    테스트끼리 겹치지 않는 번호 (좌석 id, 전화번호 등). 테스트가 같은 DB 파일을 함께 씀.
+    """
+    return lambda: next(_ids)
+
+
+@pytest.fixture
+def make_pass(db, next_id):
+    """
+    이용권 상품을 만들고 이용권 목록 캐시를 비움 (이용권 추가 API 처럼).
+    """
+    from models import passes
+    from pass_catalog import pass_catalog
+
+    async def make(pass_type: str = "day", duration: int = 1, price: int = 9000, branch_id: int = 1) -> int:
+        pass_id = await db.execute(passes.insert().values(
+            name=f"{pass_type}{next_id()}", pass_type=pass_type, duration=duration, price=price, branch_id=branch_id,
+        ))
+        pass_catalog.invalidate()
+        return pass_id
+    return make
+
+
+@pytest.fixture
+def make_seat(db, next_id):
+    from models import seats
+
+    async def make(prefix: str = "T", branch_id: int = 1, **values) -> str:
+        seat_id = f"{prefix}{next_id()}"
+        await db.execute(seats.insert().values(id=seat_id, is_occupied=False, branch_id=branch_id, **values))
+        return seat_id
+    return make
+
+
+@pytest.fixture
+def make_user_pass(db, next_id):
+    """
+    사용자 한 명과 그 사람의 보유 이용권 하나를 만듦. 기본은 days 일 뒤 만료되는 기간권, values 로 컬럼을 바꿈.
+    """
+    from models import user_passes, users
+    from routes.user import create_access_token
+
+    async def make(pass_id: int, days: int = 1, **values) -> dict:
+        n = next_id()
+        user_id = await db.execute(users.insert().values(
+            name=f"user{n}", age=20, phone_number=f"010-test-{n}", created_at=datetime.now(KST),
+        ))
+        user_pass_id = await db.execute(user_passes.insert().values(**{
+            "user_id": user_id, "pass_id": pass_id, "expire_at": datetime.now(KST) + timedelta(days=days),
+            "is_active": False, "branch_id": 1, **values,
+        }))
+        token = create_access_token(data={"sub": str(user_id)}, expires_delta=timedelta(minutes=10))
+        return {"user_id": user_id, "user_pass_id": user_pass_id, "headers": {"Authorization": f"Bearer {token}"}}
+    return make
+
+
+@pytest.fixture
+def admin(make_user_pass, make_pass):
+    """
+    관리자 사용자 (ADMIN_USER_IDS 에 잠시 넣음).
+    """
+    from routes.protected import ADMIN_USER_IDS
+
+    added = []
+
+    async def make() -> dict:
+        user = await make_user_pass(await make_pass())
+        ADMIN_USER_IDS.add(user["user_id"])
+        added.append(user["user_id"])
+        return user
+    yield make
+    ADMIN_USER_IDS.difference_update(added)
+
+
+@pytest.fixture
+async def branch(client, admin, next_id):
+    """
+    다른 테스트의 좌석/매출/대기열과 섞이지 않는 새 지점. headers 는 그 지점을 만든 관리자 토큰.
+    """
+    headers = (await admin())["headers"]
+    response = await client.post("/branches", headers=headers, json={"name": f"지점{next_id()}"})
+    return {"id": response.json()["branch_id"], "headers": headers}
+
+
+@pytest.fixture
+async def client():
+    import httpx
+    from main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+        yield c
@@ -0,0 +1,27 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+import pytz
+from sqlalchemy import select
+
+from analytics import add_to_bucket
+from models import seat_usage_rollups
+
+KST = pytz.timezone("Asia/Seoul")
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_adds_to_new_bucket_all_count(db):
+    hour = KST.localize(datetime(2020, 1, 1, 9))
+
+    async def add():
+        async with db.transaction():
+            await add_to_bucket(seat_usage_rollups, {"hour": hour, "branch_id": 1}, {"occupied_seconds": 60, "sessions": 1})
+
+    await asyncio.gather(*[add() for _ in range(5)])
+
+    row = await db.fetch_one(select(seat_usage_rollups).where(seat_usage_rollups.c.hour == hour))
+    assert row["sessions"] == 5
+    assert row["occupied_seconds"] == 300
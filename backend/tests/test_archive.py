@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from sqlalchemy import func, select
+
+from analytics import fold_purchase_logs
+from archive import Archiver, archive_user_passes, ended_passes, purchase_history
+from models import purchase_logs, purchase_logs_archive, user_passes, user_passes_archive
+
+KST = pytz.timezone("Asia/Seoul")
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_archive_survives_reused_user_pass_id(db, make_pass, make_user_pass):
+    """
+    가장 큰 id 의 이용권을 옮긴 뒤 새로 산 이용권이 같은 id 를 받으면 보관 테이블 기본키가 겹쳐 만료 정리가 멈췄음.
+    """
+    pass_id = await make_pass()
+    now = datetime.now(KST)
+
+    first = await make_user_pass(pass_id)
+    assert [record["id"] for record in await archive_user_passes([first["user_pass_id"]], now)] == [first["user_pass_id"]]
+
+    # 같은 사람이 다시 구매: 지운 id 를 다시 쓰지 않아야 함
+    second_id = await db.execute(user_passes.insert().values(
+        user_id=first["user_id"], pass_id=pass_id, expire_at=now, is_active=False, branch_id=1,
+    ))
+    assert second_id > first["user_pass_id"]
+    await archive_user_passes([second_id], now)
+
+    archived = await ended_passes(db, first["user_id"], None, 10)
+    assert [record["id"] for record in archived] == [second_id, first["user_pass_id"]]
+    assert {record["end_reason"] for record in archived} == {"expired"}
+    assert await db.fetch_one(user_passes.select().where(user_passes.c.id.in_([first["user_pass_id"], second_id]))) is None
+
+
+async def test_archive_moves_only_folded_old_logs_and_history_unions_both(db, make_pass, make_user_pass):
+    pass_id = await make_pass(price=5000)
+    holder = await make_user_pass(pass_id)
+    now = datetime.now(KST)
+    old_at = now - timedelta(days=400)
+
+    old_id = await db.execute(purchase_logs.insert().values(user_id=holder["user_id"], pass_id=pass_id, purchased_at=old_at, price=5000))
+    await fold_purchase_logs(now)
+    # 집계에 아직 반영되지 않은 오래된 로그는 남겨 둠 (옮기면 매출에서 빠짐)
+    unfolded_id = await db.execute(purchase_logs.insert().values(user_id=holder["user_id"], pass_id=pass_id, purchased_at=old_at, price=5000))
+    recent_id = await db.execute(purchase_logs.insert().values(user_id=holder["user_id"], pass_id=pass_id, purchased_at=now, price=5000))
+
+    assert await Archiver(hot_period=timedelta(days=180), pause=0).archive_purchase_logs(now) == 1
+    archived_ids = [record["id"] for record in await db.fetch_all(select(purchase_logs_archive.c.id))]
+    assert old_id in archived_ids and unfolded_id not in archived_ids
+
+    # 옮긴 id 를 새 구매가 다시 쓰지 않아 두 테이블을 합친 내역에서 id 가 겹치지 않음
+    await db.execute(purchase_logs.delete().where(purchase_logs.c.id == recent_id))
+    newest_id = await db.execute(purchase_logs.insert().values(user_id=holder["user_id"], pass_id=pass_id, purchased_at=now, price=5000))
+    assert newest_id > recent_id
+
+    history = await purchase_history(db, holder["user_id"], None, 10, include_archived=True)
+    assert [(record["id"], bool(record["archived"])) for record in history] == [
+        (newest_id, False), (unfolded_id, False), (old_id, True),
+    ]
+    hot_only = await purchase_history(db, holder["user_id"], None, 10, include_archived=False)
+    assert [record["id"] for record in hot_only] == [newest_id, unfolded_id]
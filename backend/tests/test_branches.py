@@ -0,0 +1,43 @@
+import pytest
+from fastapi import HTTPException
+
+import branches as branches_module
+from branches import BranchDirectory
+from models import branches
+from routes.branches import get_branch
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_unknown_branch_reloads_at_most_once_per_interval(db, monkeypatch):
+    directory = BranchDirectory(miss_reload_interval=60)
+    await directory.load()
+    loads = []
+    original_load = directory.load
+
+    async def counting_load():
+        loads.append(1)
+        await original_load()
+
+    monkeypatch.setattr(directory, "load", counting_load)
+
+    for branch_id in range(900000, 900020):
+        assert await directory.get(branch_id) is None
+    assert loads == []
+    assert (await directory.get(1))["id"] == 1
+
+
+async def test_branch_added_by_another_worker_is_found_after_interval(db, next_id):
+    directory = BranchDirectory(miss_reload_interval=0)
+    await directory.load()
+    branch_id = await db.execute(branches.insert().values(name=f"지점{next_id()}"))
+
+    assert (await directory.get(branch_id))["id"] == branch_id
+
+
+async def test_branch_owned_by_another_worker_is_421(db, monkeypatch):
+    monkeypatch.setattr(branches_module, "OWNED_BRANCH_IDS", {2})
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_branch(1)
+    assert exc_info.value.status_code == 421
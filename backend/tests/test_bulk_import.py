@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from sqlalchemy import func, select
+
+from bulk_import import Importer, PurchaseImporter, UserImporter, run_import
+from models import purchase_logs, users
+
+KST = pytz.timezone("Asia/Seoul")
+
+pytestmark = pytest.mark.anyio
+
+
+def test_importer_requires_parse():
+    with pytest.raises(TypeError):
+        Importer(1)
+
+
+async def test_purchase_in_the_future_is_a_row_error(db, make_pass, make_user_pass):
+    pass_id = await make_pass(price=7000)
+    buyer = await make_user_pass(pass_id)
+    now = datetime.now(KST)
+    records = [
+        {"user_id": buyer["user_id"], "pass_id": pass_id, "purchased_at": (now - timedelta(days=30)).isoformat()},
+        {"user_id": buyer["user_id"], "pass_id": pass_id, "purchased_at": (now + timedelta(days=30)).isoformat()},
+        {"user_id": buyer["user_id"], "pass_id": pass_id, "purchased_at": "어제"},
+    ]
+
+    stats = await run_import(PurchaseImporter(1), records, batch_size=2)
+
+    assert (stats.read, stats.inserted, stats.errors) == (3, 1, 2)
+    imported = await db.fetch_all(purchase_logs.select().where(purchase_logs.c.user_id == buyer["user_id"]))
+    assert [(record["pass_id"], record["price"]) for record in imported] == [(pass_id, 7000)]
+
+
+async def test_users_are_deduplicated_by_phone_across_batches_and_reruns(db, next_id):
+    phone = f"010-import-{next_id()}"
+    records = [
+        {"phone_number": phone, "name": "가", "age": "20"},
+        {"phone_number": f"{phone}-2", "name": "나", "age": "-1"},
+        {"phone_number": phone, "name": "다", "age": "30"},
+    ]
+
+    first = await run_import(UserImporter(1), records, batch_size=2)
+    again = await run_import(UserImporter(1), records, batch_size=2)
+
+    assert (first.inserted, first.duplicates, first.errors) == (1, 1, 1)
+    assert (again.inserted, again.duplicates) == (0, 2)
+    count = await db.fetch_val(select(func.count()).select_from(users).where(users.c.phone_number == phone))
+    assert count == 1
@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from sqlalchemy import select
+
+from change_feed import ChangeFeed, record_changes, seat_change, user_pass_change
+from models import change_feed_state
+
+KST = pytz.timezone("Asia/Seoul")
+
+pytestmark = pytest.mark.anyio
+
+
+def seat_status(seat_id: str, occupied: bool) -> dict:
+    return {"seat_name": seat_id, "is_occupied": occupied}
+
+
+async def record(branch_id: int, changes: list, now: datetime):
+    from database import database
+    async with database.transaction():
+        await record_changes(branch_id, changes, now)
+
+
+async def test_cursor_reads_latest_state_per_entity_and_only_own_passes(db, next_id):
+    feed = ChangeFeed()
+    branch_id = 1000 + next_id()
+    now = datetime.now(KST)
+
+    start = await feed.read(branch_id, user_id=1, since=None)
+    assert start["reset"] and start["changes"] == []
+
+    await record(branch_id, [seat_change(seat_status("A1", True))], now)
+    await record(branch_id, [
+        seat_change(seat_status("A1", False)),
+        user_pass_change(1, 10, {"user_pass_id": 10}),
+        user_pass_change(2, 20, {"user_pass_id": 20}),
+    ], now)
+    await record(branch_id, [user_pass_change(1, 11)], now)
+
+    result = await feed.read(branch_id, user_id=1, since=start["cursor"])
+    assert not result["reset"] and not result["has_more"]
+    # A1 은 마지막 상태 하나, 남(user 2)의 이용권은 빠지고, 지운 이용권은 deleted
+    assert result["changes"] == [
+        {"entity": "seat", "id": "A1", "deleted": False, "data": seat_status("A1", False)},
+        {"entity": "user_pass", "id": "10", "deleted": False, "data": {"user_pass_id": 10}},
+        {"entity": "user_pass", "id": "11", "deleted": True, "data": None},
+    ]
+
+    # 이어 읽으면 새 변경 없음, 커서 그대로
+    again = await feed.read(branch_id, user_id=1, since=result["cursor"])
+    assert again["changes"] == [] and again["cursor"] == result["cursor"]
+
+    # 다른 지점 기록은 섞이지 않음
+    other = await feed.read(branch_id + 1, user_id=1, since=start["cursor"])
+    assert other["changes"] == []
+
+
+async def test_pages_and_resets_cursor_older_than_pruned(db, next_id):
+    feed = ChangeFeed(page_size=2, retention=timedelta(days=1))
+    branch_id = 1000 + next_id()
+    now = datetime.now(KST)
+    start = (await feed.read(branch_id, user_id=1, since=None))["cursor"]
+
+    await record(branch_id, [seat_change(seat_status(f"P{i}", True)) for i in range(3)], now - timedelta(days=2))
+
+    first_page = await feed.read(branch_id, user_id=1, since=start)
+    assert first_page["has_more"] and len(first_page["changes"]) == 2
+    second_page = await feed.read(branch_id, user_id=1, since=first_page["cursor"])
+    assert not second_page["has_more"] and [change["id"] for change in second_page["changes"]] == ["P2"]
+
+    assert await feed.prune(now) >= 3
+    pruned_id = await db.fetch_val(
+        select(change_feed_state.c.pruned_id).where(change_feed_state.c.branch_id == branch_id)
+    )
+    assert pruned_id >= second_page["cursor"]
+
+    # 지운 기록 이전 커서는 reset, 그 뒤 기록은 받은 커서부터 이어짐
+    stale = await feed.read(branch_id, user_id=1, since=start)
+    assert stale["reset"] and stale["cursor"] >= pruned_id
+    await record(branch_id, [seat_change(seat_status("P9", True))], now)
+    resumed = await feed.read(branch_id, user_id=1, since=stale["cursor"])
+    assert [change["id"] for change in resumed["changes"]] == ["P9"]
+
+    # 앞으로 간 커서(다른 DB 등)도 reset
+    assert (await feed.read(branch_id, user_id=1, since=resumed["cursor"] + 100))["reset"]
+
+
+async def test_bulk_purchase_records_pass_changes(db, client, admin, make_pass, make_user_pass):
+    feed = ChangeFeed()
+    pass_id = await make_pass(pass_type="time_period", duration=120, price=8000)
+    buyers = [await make_user_pass(pass_id) for _ in range(2)]
+    cursor = (await feed.read(1, user_id=buyers[0]["user_id"], since=None))["cursor"]
+
+    response = await client.post("/purchase/bulk", headers=(await admin())["headers"], json={
+        "items": [{"user_id": buyer["user_id"], "pass_id": pass_id} for buyer in buyers],
+    })
+    assert response.status_code == 200
+
+    for buyer in buyers:
+        changes = (await feed.read(1, user_id=buyer["user_id"], since=cursor))["changes"]
+        assert len(changes) == 1
+        assert changes[0]["entity"] == "user_pass"
+        assert changes[0]["data"]["pass_id"] == pass_id
+        assert changes[0]["data"]["remaining_seconds"] == 120 * 60
+
+
+async def test_auto_resume_records_changes_and_publishes_seat(db, make_seat, make_pass, make_user_pass):
+    from metering import MAX_PAUSE, UsageMeter
+    from models import seats, user_passes
+    from seat_hub import seat_hubs
+
+    feed = ChangeFeed()
+    now = datetime.now(KST)
+    seat_id = await make_seat()
+    holder = await make_user_pass(
+        await make_pass(pass_type="time_period", duration=60), expire_at=None, remaining_seconds=3600,
+        seat_id=seat_id, is_active=True, paused_at=now - MAX_PAUSE - timedelta(minutes=1),
+    )
+    await db.execute(seats.update().where(seats.c.id == seat_id).values(
+        is_occupied=True, user_pass_id=holder["user_pass_id"], start_at=now - MAX_PAUSE,
+    ))
+    cursor = (await feed.read(1, user_id=holder["user_id"], since=None))["cursor"]
+    queue = seat_hubs.channel(1).subscribe()
+    try:
+        assert await UsageMeter().resume_overdue(now) >= 1
+    finally:
+        seat_hubs.channel(1).unsubscribe(queue)
+
+    resumed = await db.fetch_one(user_passes.select().where(user_passes.c.id == holder["user_pass_id"]))
+    assert resumed["paused_at"] is None and resumed["metered_at"] is not None
+
+    changes = {(change["entity"], change["id"]): change for change in (await feed.read(1, holder["user_id"], cursor))["changes"]}
+    assert changes[("seat", seat_id)]["data"]["is_paused"] is False
+    assert changes[("user_pass", str(holder["user_pass_id"]))]["data"]["is_paused"] is False
+
+    messages = [queue.get_nowait() for _ in range(queue.qsize())]
+    assert any(f'"seat_name": "{seat_id}"' in message or f'"seat_name":"{seat_id}"' in message for message in messages)
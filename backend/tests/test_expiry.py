@@ -0,0 +1,62 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from sqlalchemy import select
+
+from expiry import ExpirySweeper
+from models import user_passes, users
+
+KST = pytz.timezone("Asia/Seoul")
+
+pytestmark = pytest.mark.anyio
+
+
+async def insert_user_pass(db, expire_at: datetime) -> int:
+    user_id = await db.execute(users.insert().values(
+        name="expiry", age=20, phone_number=f"010-expiry-{expire_at.timestamp()}", created_at=datetime.now(KST),
+    ))
+    return await db.execute(user_passes.insert().values(
+        user_id=user_id, pass_id=1, expire_at=expire_at, is_active=False, branch_id=1,
+    ))
+
+
+async def test_sweep_reads_only_new_passes_and_pops_due_deadlines(db):
+    sweeper = ExpirySweeper()
+    now = datetime.now(KST)
+    await sweeper.sweep(now)
+    last_id = sweeper._last_user_pass_id
+
+    # 다른 워커가 구매한 이용권: 다음 점검 때 그 뒤 id 만 읽어 힙에 들어감
+    later = now + timedelta(hours=1)
+    later_id = await insert_user_pass(db, later)
+    past_id = await insert_user_pass(db, now - timedelta(minutes=1))
+    await sweeper.sweep(now)
+
+    assert sweeper._last_user_pass_id >= later_id > last_id
+    assert (later, later_id) in sweeper._deadlines
+    assert all(deadline > now for deadline, _ in sweeper._deadlines)
+    assert await db.fetch_one(select(user_passes.c.id).where(user_passes.c.id == past_id)) is None
+
+    # 같은 만료 시각을 다시 등록해도 힙에 한 번만 들어감
+    sweeper.schedule(later_id, later)
+    assert sweeper._deadlines.count((later, later_id)) == 1
+
+
+async def test_failed_sweep_backs_off_instead_of_spinning(monkeypatch):
+    sweeper = ExpirySweeper()
+    calls = []
+
+    async def failing_sweep(now=None):
+        calls.append(now)
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(sweeper, "sweep", failing_sweep)
+    sweeper.schedule(1, datetime.now(KST) - timedelta(minutes=1))
+
+    task = asyncio.create_task(sweeper.run())
+    await asyncio.sleep(0.3)
+    task.cancel()
+
+    assert len(calls) == 1
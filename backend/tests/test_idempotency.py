@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy import func, select
+
+import rate_limit
+import routes.passes as passes_routes
+from models import user_passes
+from rate_limit import RateLimiter
+
+pytestmark = pytest.mark.anyio
+
+
+async def purchase(client, buyer: dict, pass_id: int, key: str):
+    return await client.post(
+        "/purchase",
+        headers={**buyer["headers"], "Idempotency-Key": key},
+        json={"pass_id": pass_id},
+    )
+
+
+async def owned_count(db, user_id: int) -> int:
+    return await db.fetch_val(select(func.count()).select_from(user_passes).where(user_passes.c.user_id == user_id))
+
+
+async def test_replay_returns_first_response_once(db, client, make_pass, make_user_pass):
+    pass_id = await make_pass()
+    buyer = await make_user_pass(pass_id)
+
+    first = await purchase(client, buyer, pass_id, "kiosk-1")
+    replay = await purchase(client, buyer, pass_id, "kiosk-1")
+    assert first.status_code == replay.status_code == 200
+    assert replay.json() == first.json()
+    assert await owned_count(db, buyer["user_id"]) == 2  # 처음 만든 것 + 구매 한 건
+
+
+async def test_same_key_with_different_body_is_422(db, client, make_pass, make_user_pass):
+    pass_id = await make_pass()
+    other_pass_id = await make_pass(price=12000)
+    buyer = await make_user_pass(pass_id)
+
+    assert (await purchase(client, buyer, pass_id, "kiosk-2")).status_code == 200
+    response = await purchase(client, buyer, other_pass_id, "kiosk-2")
+    assert response.status_code == 422
+    assert await owned_count(db, buyer["user_id"]) == 2
+
+
+async def test_replays_do_not_use_the_rate_limit(db, client, make_pass, make_user_pass, monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(passes_routes, "purchase_limiter", RateLimiter("test_purchase", limit=2, period=60))
+    pass_id = await make_pass()
+    buyer = await make_user_pass(pass_id)
+
+    assert (await purchase(client, buyer, pass_id, "kiosk-3")).status_code == 200
+    for _ in range(5):
+        assert (await purchase(client, buyer, pass_id, "kiosk-3")).status_code == 200
+    assert (await purchase(client, buyer, pass_id, "kiosk-4")).status_code == 200
+    assert (await purchase(client, buyer, pass_id, "kiosk-5")).status_code == 429
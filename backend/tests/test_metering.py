@@ -0,0 +1,157 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from alembic import command
+from alembic.config import Config
+
+from metering import MAX_PAUSE, UsageMeter, settle
+from models import user_passes
+from seat_state import to_kst
+
+KST = pytz.timezone("Asia/Seoul")
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 정액 시간권 하나에 처음 넣어 두는 남은 시간 (10분)
+REMAINING = 600
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def make_time_pass(make_pass, make_user_pass):
+    """
+    branch_id 지점의 정액 시간권을 가진 사용자. values 로 remaining_seconds/metered_at 등을 바꿈.
+    """
+    async def make(branch_id: int = 1, **values) -> dict:
+        pass_id = await make_pass(pass_type="time_period", duration=REMAINING // 60, branch_id=branch_id)
+        return await make_user_pass(pass_id, **{
+            "expire_at": None, "remaining_seconds": REMAINING, "branch_id": branch_id, **values,
+        })
+    return make
+
+
+async def fetch_pass(db, user_pass_id: int):
+    return await db.fetch_one(user_passes.select().where(user_passes.c.id == user_pass_id))
+
+
+async def backdate_metering(db, user_pass_id: int, seconds: float):
+    """
+    계량 시작을 seconds 초 앞당겨 그만큼 앉아 있었던 것처럼 만듦.
+    """
+    record = await fetch_pass(db, user_pass_id)
+    await db.execute(
+        user_passes.update()
+        .where(user_passes.c.id == user_pass_id)
+        .values(metered_at=to_kst(record["metered_at"]) - timedelta(seconds=seconds))
+    )
+
+
+def test_settle_bills_whole_seconds():
+    now = datetime.now(KST)
+    values = settle({"remaining_seconds": REMAINING, "metered_at": now - timedelta(seconds=61.5)}, now)
+    assert values == {"metered_at": None, "remaining_seconds": REMAINING - 61}
+    # 기간권은 남은 시간이 없으므로 계량만 멈춤
+    assert settle({"remaining_seconds": None, "metered_at": None}, now) == {"metered_at": None}
+
+
+async def test_pause_stops_metering_until_resume(db, client, make_seat, make_time_pass):
+    seat_id = await make_seat()
+    holder = await make_time_pass()
+    body = {"seat_id": seat_id}
+    assert (await client.post("/seat", headers=holder["headers"], json={
+        "seat_id": seat_id, "user_pass_id": holder["user_pass_id"],
+    })).status_code == 200
+
+    # 90초 앉아 있다 외출: 90초를 빼고 계량을 멈춤
+    await backdate_metering(db, holder["user_pass_id"], 90)
+    assert (await client.post("/seat/pause", headers=holder["headers"], json=body)).status_code == 200
+    paused = await fetch_pass(db, holder["user_pass_id"])
+    assert paused["remaining_seconds"] == REMAINING - 90
+    assert paused["metered_at"] is None and paused["paused_at"] is not None
+    assert (await client.post("/seat/pause", headers=holder["headers"], json=body)).status_code == 409
+
+    # 외출 중인 시간은 빼지 않고, 복귀한 뒤 30초 앉아 있다 퇴실하면 그 30초만 더 뺌
+    assert (await client.post("/seat/resume", headers=holder["headers"], json=body)).status_code == 200
+    resumed = await fetch_pass(db, holder["user_pass_id"])
+    assert resumed["paused_at"] is None and resumed["metered_at"] is not None
+    assert resumed["remaining_seconds"] == REMAINING - 90
+
+    await backdate_metering(db, holder["user_pass_id"], 30)
+    assert (await client.post("/leave", headers=holder["headers"], json=body)).status_code == 200
+    left = await fetch_pass(db, holder["user_pass_id"])
+    assert left["remaining_seconds"] == REMAINING - 120
+    assert left["metered_at"] is None and left["seat_id"] is None
+
+
+async def test_checkpoint_bills_whole_seconds_and_keeps_the_rest(db, branch, make_time_pass):
+    now = datetime.now(KST)
+    started_at = now - timedelta(seconds=10.7)
+    metered = await make_time_pass(branch["id"], metered_at=started_at)
+    idle = await make_time_pass(branch["id"])
+    meter = UsageMeter(branch_ids={branch["id"]})
+
+    assert await meter.checkpoint(now) == 1
+    record = await fetch_pass(db, metered["user_pass_id"])
+    assert record["remaining_seconds"] == REMAINING - 10
+    # 1초 미만 자투리(0.7초)는 다음 체크포인트/퇴실 때 빠지도록 metered_at 을 반영한 초만큼만 옮김
+    assert to_kst(record["metered_at"]) == started_at + timedelta(seconds=10)
+    assert (await fetch_pass(db, idle["user_pass_id"]))["remaining_seconds"] == REMAINING
+
+    # 같은 시각에 다시 돌려도 두 번 빼지 않고, 체크포인트 뒤 정산해도 합은 같음
+    assert await meter.checkpoint(now) == 0
+    later = now + timedelta(seconds=5.3)
+    assert settle(record, later)["remaining_seconds"] == REMAINING - 16
+
+
+async def test_overdue_pause_resumes_automatically(db, branch, make_time_pass):
+    now = datetime.now(KST)
+    overdue = await make_time_pass(branch["id"], paused_at=now - MAX_PAUSE - timedelta(minutes=1))
+    recent = await make_time_pass(branch["id"], paused_at=now - timedelta(minutes=10))
+
+    assert await UsageMeter(branch_ids={branch["id"]}).resume_overdue(now) == 1
+
+    resumed = await fetch_pass(db, overdue["user_pass_id"])
+    assert resumed["paused_at"] is None
+    assert to_kst(resumed["metered_at"]) == now
+    assert resumed["remaining_seconds"] == REMAINING
+    still_paused = await fetch_pass(db, recent["user_pass_id"])
+    assert still_paused["paused_at"] is not None and still_paused["metered_at"] is None
+
+
+def migrate(url: str, revision: str, downgrade: bool = False):
+    cfg = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+    cfg.set_main_option("sqlalchemy.url", url)
+    (command.downgrade if downgrade else command.upgrade)(cfg, revision)
+
+
+def test_0008_converts_minutes_to_seconds_and_keeps_seated_metering(tmp_path):
+    path = tmp_path / "metering.db"
+    url = f"sqlite:///{path}"
+    migrate(url, "0007")
+
+    with sqlite3.connect(path) as connection:
+        connection.execute("INSERT INTO users (id, name, age, phone_number) VALUES (1, 'u', 20, '010')")
+        connection.execute(
+            "INSERT INTO passes (id, name, pass_type, duration, price) VALUES (1, 'time', 'time_period', 120, 8000)"
+        )
+        connection.executemany(
+            "INSERT INTO user_passes (id, user_id, pass_id, remaining_time, is_active, seat_id) VALUES (?, 1, 1, ?, ?, ?)",
+            [(1, 90, True, "A1"), (2, 45, False, None), (3, None, False, None)],
+        )
+        connection.execute(
+            "INSERT INTO seats (id, is_occupied, user_pass_id, start_at) VALUES ('A1', 1, 1, '2026-01-01 09:00:00')"
+        )
+
+    migrate(url, "0008")
+    with sqlite3.connect(path) as connection:
+        rows = connection.execute("SELECT id, remaining_seconds, metered_at FROM user_passes ORDER BY id").fetchall()
+    assert rows == [(1, 90 * 60, "2026-01-01 09:00:00"), (2, 45 * 60, None), (3, None, None)]
+
+    # 되돌리면 분 단위로 돌아가고 착석 시각은 마지막 계량 시작 시각이 됨
+    migrate(url, "0007", downgrade=True)
+    with sqlite3.connect(path) as connection:
+        rows = connection.execute("SELECT id, remaining_time FROM user_passes ORDER BY id").fetchall()
+    assert rows == [(1, 90), (2, 45), (3, None)]
@@ -0,0 +1,61 @@
+import logging
+
+import pytest
+from sqlalchemy import select
+
+import database as database_module
+from database import compile_sql
+from metrics import BACKGROUND_ROUTE, RequestStats, current_stats, metrics
+from models import passes
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_metrics_need_admin(db, client, admin, make_pass, make_user_pass):
+    assert (await client.get("/metrics")).status_code == 401
+    user = await make_user_pass(await make_pass())
+    assert (await client.get("/metrics", headers=user["headers"])).status_code == 403
+
+    response = await client.get("/metrics", headers=(await admin())["headers"])
+    assert response.status_code == 200
+    assert "# TYPE" in response.text
+
+
+def test_compile_sql_fills_in_parameters():
+    assert "passes.id = 123" in compile_sql(select(passes.c.name).where(passes.c.id == 123))
+    assert compile_sql("SELECT 1") == "SELECT 1"
+
+
+async def test_slow_query_is_logged_with_sql_and_route(db, monkeypatch, caplog):
+    monkeypatch.setattr(database_module, "SLOW_QUERY_MS", 0)
+    stats = RequestStats("GET", "/slow-test")
+    before = metrics.slow_queries[stats.route]
+
+    token = current_stats.set(stats)
+    try:
+        with caplog.at_level(logging.WARNING, logger="database"):
+            await db.fetch_all(select(passes.c.name).where(passes.c.id == 4242))
+    finally:
+        current_stats.reset(token)
+
+    assert stats.query_count == 1 and stats.query_seconds > 0
+    assert metrics.slow_queries[stats.route] == before + 1
+    [record] = [record for record in caplog.records if "GET /slow-test" in record.getMessage()]
+    assert "passes.id = 4242" in record.getMessage()
+
+
+async def test_fast_query_is_not_logged(db, caplog):
+    with caplog.at_level(logging.WARNING, logger="database"):
+        await db.fetch_val("SELECT 1")
+    assert not caplog.records
+
+
+async def test_background_queries_count_under_background_route(db):
+    before = metrics.queries[BACKGROUND_ROUTE]
+    await db.fetch_val("SELECT 1")
+    assert metrics.queries[BACKGROUND_ROUTE] == before + 1
+
+
+async def test_response_has_server_timing(db, client):
+    response = await client.get("/passes")
+    assert response.headers["server-timing"].startswith("db;dur=")
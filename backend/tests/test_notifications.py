@@ -0,0 +1,86 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+import pytz
+from sqlalchemy import select
+
+from database import database
+from models import notification_outbox
+from seat_state import to_kst
+from notifications import MAX_ATTEMPTS, NotificationDispatcher, enqueue, outbox_row
+
+KST = pytz.timezone("Asia/Seoul")
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingSender:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.sent = []
+
+    async def send(self, batch):
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("push service down")
+        self.sent += [notification["id"] for notification in batch]
+        return [notification["id"] for notification in batch]
+
+
+async def outbox_rows(db, keys):
+    return await db.fetch_all(notification_outbox.select().where(notification_outbox.c.dedupe_key.in_(keys)))
+
+
+async def test_concurrent_enqueue_of_same_key_inserts_once(db, next_id):
+    now = datetime.now(KST)
+    key = f"test:{next_id()}"
+
+    async def worker():
+        async with database.transaction():
+            return await enqueue([outbox_row(1, "test", key, {"message": "hi"}, now)] * 2)
+
+    added = await asyncio.gather(*[worker() for _ in range(5)])
+
+    assert sum(added) == 1
+    assert len(await outbox_rows(db, [key])) == 1
+
+
+async def test_dispatchers_lease_each_notification_once(db, next_id):
+    # 다른 테스트가 남긴 알림도 함께 보낼 수 있으므로 이 테스트의 알림만 확인
+    now = datetime.now(KST)
+    keys = [f"lease:{next_id()}" for _ in range(7)]
+    async with database.transaction():
+        await enqueue([outbox_row(1, "test", key, {"message": key}, now) for key in keys])
+    ids = {record["id"] for record in await outbox_rows(db, keys)}
+
+    senders = [RecordingSender() for _ in range(3)]
+    dispatchers = [NotificationDispatcher(sender=sender, batch_size=3) for sender in senders]
+    for _ in range(3):
+        await asyncio.gather(*[dispatcher.dispatch(now) for dispatcher in dispatchers])
+
+    sent = [notification_id for sender in senders for notification_id in sender.sent if notification_id in ids]
+    assert sorted(sent) == sorted(ids)
+    assert {record["status"] for record in await outbox_rows(db, keys)} == {"sent"}
+
+
+async def test_failed_send_backs_off_then_gives_up(db, next_id):
+    now = datetime.now(KST)
+    key = f"retry:{next_id()}"
+    async with database.transaction():
+        await enqueue([outbox_row(1, "test", key, {"message": key}, now)])
+    dispatcher = NotificationDispatcher(sender=RecordingSender(fail=True))
+
+    await dispatcher.dispatch(now)
+    [record] = await outbox_rows(db, [key])
+    assert record["status"] == "pending" and record["attempts"] == 1 and record["last_error"]
+    # 백오프 동안은 다시 꺼내지 않음
+    await dispatcher.dispatch(now)
+    [record] = await outbox_rows(db, [key])
+    assert record["attempts"] == 1
+
+    for _ in range(MAX_ATTEMPTS - 1):
+        [record] = await outbox_rows(db, [key])
+        await dispatcher.dispatch(to_kst(record["next_attempt_at"]))
+    [record] = await outbox_rows(db, [key])
+    assert record["status"] == "failed" and record["attempts"] == MAX_ATTEMPTS
@@ -0,0 +1,50 @@
+import pytest
+
+from models import passes
+from pass_catalog import PassCatalog, bump_catalog_version
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_unknown_pass_checks_version_at_most_once_per_interval(db, monkeypatch):
+    catalog = PassCatalog(miss_check_interval=60)
+    await catalog.load()
+    reads = []
+    original_read_version = catalog._read_version
+
+    async def counting_read_version():
+        reads.append(1)
+        return await original_read_version()
+
+    monkeypatch.setattr(catalog, "_read_version", counting_read_version)
+
+    for pass_id in range(900000, 900020):
+        assert await catalog.get_pass(pass_id) is None
+    assert len(reads) == 1
+
+
+async def test_pass_added_by_another_worker_is_found_on_miss(db, next_id):
+    catalog = PassCatalog(miss_check_interval=0)
+    await catalog.load()
+    async with db.transaction():
+        pass_id = await db.execute(passes.insert().values(
+            name=f"day{next_id()}", pass_type="day", duration=1, price=9000, branch_id=1,
+        ))
+        await bump_catalog_version()
+
+    assert (await catalog.get_pass(pass_id))["id"] == pass_id
+
+
+async def test_invalidate_makes_local_change_visible_in_listing(db, next_id):
+    catalog = PassCatalog()
+    body, etag = await catalog.listing(1)
+    name = f"day{next_id()}"
+    await db.execute(passes.insert().values(name=name, pass_type="day", duration=1, price=9000, branch_id=1))
+
+    # 확인 간격 안에서는 버전이 안 바뀐 이상 이전 목록 그대로
+    assert await catalog.listing(1) == (body, etag)
+
+    catalog.invalidate()
+    new_body, new_etag = await catalog.listing(1)
+    assert new_etag != etag
+    assert name.encode() in new_body
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+
+from database import DATABASE_URL
+from hot_queries import HOT_QUERIES, plan_problems, upgrade
+
+# 실행 계획을 PostgreSQL 에서도 확인하려면 빈 테스트용 DB 주소를 지정 (없으면 그 테스트는 건너뜀)
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+HOT_QUERY_IDS = [entry[0] for entry in HOT_QUERIES]
+
+
+@pytest.fixture(scope="module")
+def connection(migrated):
+    engine = create_engine(DATABASE_URL)
+    with engine.connect() as connection:
+        yield connection
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def postgres_connection():
+    if not TEST_POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL 이 없어 PostgreSQL 실행 계획 확인은 건너뜀")
+    upgrade(TEST_POSTGRES_URL)
+    engine = create_engine(TEST_POSTGRES_URL)
+    with engine.connect() as connection:
+        yield connection
+    engine.dispose()
+
+
+@pytest.mark.parametrize("name, table, index, query", HOT_QUERIES, ids=HOT_QUERY_IDS)
+def test_hot_query_uses_index(connection, name, table, index, query):
+    assert plan_problems(connection, table, index, query) == []
+
+
+@pytest.mark.parametrize("name, table, index, query", HOT_QUERIES, ids=HOT_QUERY_IDS)
+def test_hot_query_uses_index_on_postgres(postgres_connection, name, table, index, query):
+    assert plan_problems(postgres_connection, table, index, query) == []
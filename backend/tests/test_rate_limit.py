@@ -0,0 +1,34 @@
+from starlette.requests import Request
+
+from rate_limit import RateLimiter, client_ip
+
+
+def make_request(forwarded=None, peer="10.0.0.9"):
+    headers = [(b"x-forwarded-for", value.encode()) for value in (forwarded or [])]
+    return Request({"type": "http", "client": (peer, 50000), "headers": headers})
+
+
+def test_client_ip_ignores_forwarded_for_without_trusted_proxy():
+    assert client_ip(make_request(["1.2.3.4"]), trusted_hops=0) == "10.0.0.9"
+
+
+def test_client_ip_uses_address_appended_by_trusted_proxy():
+    # 클라이언트가 넣은 가짜 주소(9.9.9.9)는 왼쪽, nginx 가 붙인 실제 주소는 오른쪽 끝
+    request = make_request(["9.9.9.9, 203.0.113.7"])
+    assert client_ip(request, trusted_hops=1) == "203.0.113.7"
+    assert client_ip(make_request(["9.9.9.9, 203.0.113.7, 10.0.0.2"]), trusted_hops=2) == "203.0.113.7"
+    assert client_ip(make_request(["9.9.9.9", "203.0.113.7"]), trusted_hops=1) == "203.0.113.7"
+
+
+def test_client_ip_falls_back_to_peer_when_chain_is_short():
+    assert client_ip(make_request(["203.0.113.7"]), trusted_hops=2) == "10.0.0.9"
+    assert client_ip(make_request(), trusted_hops=1) == "10.0.0.9"
+
+
+def test_rotating_spoofed_forwarded_for_shares_one_bucket():
+    limiter = RateLimiter("test_spoof", limit=2, period=60)
+    results = [
+        limiter.hit(client_ip(make_request([f"9.9.9.{i}, 203.0.113.7"]), trusted_hops=1), now=0)
+        for i in range(3)
+    ]
+    assert results[:2] == [0.0, 0.0] and results[2] > 0
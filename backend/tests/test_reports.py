@@ -0,0 +1,51 @@
+from datetime import datetime
+
+import pytest
+import pytz
+
+from analytics import FOLD_LAG, fold_purchase_logs, record_seat_usage
+from models import purchase_logs
+
+KST = pytz.timezone("Asia/Seoul")
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_revenue_report_reads_rollups_only_for_its_branch(db, client, branch, make_pass, make_user_pass):
+    pass_id = await make_pass(price=7000, branch_id=branch["id"])
+    other_pass_id = await make_pass(price=3000)
+    buyer = await make_user_pass(pass_id)
+    sold_at = KST.localize(datetime(2020, 2, 3, 10, 15))
+    for sold_pass_id, price in [(pass_id, 7000), (other_pass_id, 3000)]:
+        await db.execute(purchase_logs.insert().values(user_id=buyer["user_id"], pass_id=sold_pass_id, purchased_at=sold_at, price=price))
+
+    params = {"start": "2020-02-03", "end": "2020-02-03", "branch_id": branch["id"]}
+    # 조회는 집계를 돌리지 않음 (주 DB에 쓰지 않음): 다음 집계 주기 전에는 안 보임
+    response = await client.get("/admin/reports/revenue", headers=branch["headers"], params=params)
+    assert response.status_code == 200
+    assert response.json() == []
+
+    # 다른 테스트가 방금 넣은 로그까지 지금 반영한 뒤 평소 주기처럼 한 번 더 돌림
+    await fold_purchase_logs(datetime.now(KST) + FOLD_LAG)
+    await fold_purchase_logs()
+    response = await client.get("/admin/reports/revenue", headers=branch["headers"], params=params)
+    assert [(row["purchase_count"], row["revenue"]) for row in response.json()] == [(1, 7000)]
+    lag = int(response.headers["X-Rollup-Lag-Seconds"])
+    assert FOLD_LAG.total_seconds() <= lag < FOLD_LAG.total_seconds() + 5
+
+    response = await client.get("/admin/reports/top-passes", headers=branch["headers"], params=params)
+    assert [row["pass_id"] for row in response.json()] == [pass_id]
+
+
+async def test_seat_utilization_counts_only_its_branch(db, client, branch, make_seat):
+    for _ in range(2):
+        await make_seat(branch_id=branch["id"])
+    hour = KST.localize(datetime(2020, 2, 4, 9))
+    await record_seat_usage(hour, hour.replace(minute=30), branch["id"])
+    await record_seat_usage(hour, hour.replace(minute=50), 1)
+
+    response = await client.get("/admin/reports/seat-utilization", headers=branch["headers"], params={
+        "start": "2020-02-04", "end": "2020-02-04", "branch_id": branch["id"],
+    })
+    assert response.status_code == 200
+    assert [(row["occupied_minutes"], row["sessions"], row["utilization"]) for row in response.json()] == [(30, 1, 0.25)]
@@ -0,0 +1,58 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from sqlalchemy import func, select
+
+from models import seat_reservations
+from reservations import ReservationBook
+
+KST = pytz.timezone("Asia/Seoul")
+CONCURRENCY = 10
+
+pytestmark = pytest.mark.anyio
+
+
+def reservation(seat_id: str, start_at: datetime, hours: int = 1) -> dict:
+    return {"id": None, "seat_id": seat_id, "start_at": start_at, "end_at": start_at + timedelta(hours=hours)}
+
+
+def test_hold_rejects_overlap_and_keeps_index_sorted():
+    book = ReservationBook()
+    start = KST.localize(datetime(2030, 1, 1, 10))
+    first = reservation("S1", start, hours=2)
+
+    assert book.hold(first) is None
+    assert book.hold(reservation("S1", start + timedelta(hours=1))) is first
+    assert book.hold(reservation("S1", start + timedelta(hours=2))) is None
+    assert book.hold(reservation("S2", start)) is None
+
+    intervals = book._by_seat["S1"]
+    assert intervals.starts == sorted(intervals.starts)
+    assert all(end <= next_start for end, next_start in zip(intervals.ends, intervals.starts[1:]))
+
+
+async def test_concurrent_overlapping_reservations_only_one_booked(db, make_seat, make_pass, make_user_pass, client):
+    seat_id = await make_seat("R")
+    pass_id = await make_pass(duration=7, price=50000)
+    holders = [await make_user_pass(pass_id, days=7) for _ in range(CONCURRENCY)]
+    start_at = datetime.now(KST).replace(microsecond=0) + timedelta(days=1)
+
+    responses = await asyncio.gather(*[
+        client.post("/reservations", headers=holder["headers"], json={
+            "seat_id": seat_id,
+            "user_pass_id": holder["user_pass_id"],
+            # 서로 30분씩 어긋나게 해 모두 첫 예약과 겹침
+            "start_at": (start_at + timedelta(minutes=30 * (i % 2))).isoformat(),
+            "end_at": (start_at + timedelta(hours=1, minutes=30 * (i % 2))).isoformat(),
+        })
+        for i, holder in enumerate(holders)
+    ])
+
+    codes = sorted(response.status_code for response in responses)
+    assert codes == [200] + [409] * (CONCURRENCY - 1)
+    booked = await db.fetch_val(
+        select(func.count()).select_from(seat_reservations).where(seat_reservations.c.seat_id == seat_id)
+    )
+    assert booked == 1
@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from models import revoked_tokens
+from routes.protected import RevokedTokens, hash_token
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_prune_drops_expired_tokens_from_db_and_memory(db):
+    now = datetime.now(timezone.utc)
+    tokens = RevokedTokens()
+    await tokens.revoke("expired-token", now - timedelta(minutes=1))
+    await tokens.revoke("live-token", now + timedelta(minutes=30))
+
+    # 다른 워커가 새로 읽는 경우도 같은 결과
+    other_worker = RevokedTokens()
+    await other_worker.refresh()
+    assert hash_token("live-token") in other_worker
+
+    await tokens.prune(now)
+
+    stored = {record["token_hash"] for record in await db.fetch_all(select(revoked_tokens.c.token_hash))}
+    assert hash_token("expired-token") not in stored
+    assert hash_token("live-token") in stored
+    assert hash_token("expired-token") not in tokens
+    assert hash_token("live-token") in tokens
+    assert len(tokens) == 1
@@ -0,0 +1,160 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from models import seat_sessions, seats, user_passes
+from seat_engine import claim_seat
+from expiry import expiry_sweeper
+
+KST = pytz.timezone("Asia/Seoul")
+CONCURRENCY = 10
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def seat_and_pass(make_seat, make_pass):
+    return await make_seat(), await make_pass()
+
+
+async def session_count(db, seat_id: str) -> int:
+    return await db.fetch_val(
+        select(func.count()).select_from(seat_sessions).where(seat_sessions.c.seat_id == seat_id)
+    )
+
+
+async def test_concurrent_claims_only_one_wins(db, seat_and_pass, make_user_pass):
+    seat_id, pass_id = seat_and_pass
+    holders = [await make_user_pass(pass_id) for _ in range(CONCURRENCY)]
+    now = datetime.now(KST)
+
+    results = await asyncio.gather(
+        *[claim_seat(seat_id, h["user_pass_id"], h["user_id"], now) for h in holders],
+        return_exceptions=True,
+    )
+
+    winners = [r for r in results if not isinstance(r, Exception)]
+    assert len(winners) == 1
+    assert all(isinstance(r, HTTPException) and r.status_code == 409 for r in results if isinstance(r, Exception))
+
+    seat = await db.fetch_one(seats.select().where(seats.c.id == seat_id))
+    assert seat["is_occupied"]
+    assert seat["user_pass_id"] == winners[0]["id"]
+    seated = await db.fetch_val(
+        select(func.count()).select_from(user_passes).where(user_passes.c.seat_id == seat_id)
+    )
+    assert seated == 1
+
+
+async def test_concurrent_leaves_write_one_session(db, seat_and_pass, make_user_pass, client):
+    seat_id, pass_id = seat_and_pass
+    holder = await make_user_pass(pass_id)
+    await claim_seat(seat_id, holder["user_pass_id"], holder["user_id"], datetime.now(KST))
+
+    responses = await asyncio.gather(*[
+        client.post("/leave", json={"seat_id": seat_id}, headers=holder["headers"])
+        for _ in range(CONCURRENCY)
+    ])
+
+    codes = sorted(response.status_code for response in responses)
+    assert codes == [200] + [404] * (CONCURRENCY - 1)
+    assert await session_count(db, seat_id) == 1
+    seat = await db.fetch_one(seats.select().where(seats.c.id == seat_id))
+    assert not seat["is_occupied"] and seat["user_pass_id"] is None
+
+
+async def test_leave_races_expiry_sweep_once(db, seat_and_pass, make_user_pass, client):
+    seat_id, pass_id = seat_and_pass
+    holder = await make_user_pass(pass_id)
+    await claim_seat(seat_id, holder["user_pass_id"], holder["user_id"], datetime.now(KST))
+
+    await asyncio.gather(
+        client.post("/leave", json={"seat_id": seat_id}, headers=holder["headers"]),
+        expiry_sweeper._expire([holder["user_pass_id"]], datetime.now(KST)),
+    )
+
+    assert await session_count(db, seat_id) == 1
+
+
+async def test_cannot_leave_someone_elses_seat(db, seat_and_pass, make_user_pass, client):
+    seat_id, pass_id = seat_and_pass
+    holder = await make_user_pass(pass_id)
+    other = await make_user_pass(pass_id)
+    await claim_seat(seat_id, holder["user_pass_id"], holder["user_id"], datetime.now(KST))
+
+    response = await client.post("/leave", json={"seat_id": seat_id}, headers=other["headers"])
+
+    assert response.status_code == 403
+    seat = await db.fetch_one(seats.select().where(seats.c.id == seat_id))
+    assert seat["is_occupied"] and seat["user_pass_id"] == holder["user_pass_id"]
+    assert await session_count(db, seat_id) == 0
+    remaining = await db.fetch_one(user_passes.select().where(user_passes.c.id == holder["user_pass_id"]))
+    assert remaining["seat_id"] == seat_id
+
+
+async def claim_response(client, seat_id: str, holder: dict, user_pass_id=None):
+    return await client.post("/seat", headers=holder["headers"], json={
+        "seat_id": seat_id, "user_pass_id": user_pass_id or holder["user_pass_id"],
+    })
+
+
+async def test_claim_then_leave_frees_seat_and_records_session(db, seat_and_pass, make_user_pass, client):
+    seat_id, pass_id = seat_and_pass
+    holder = await make_user_pass(pass_id)
+
+    assert (await claim_response(client, seat_id, holder)).status_code == 200
+    seated = await db.fetch_one(user_passes.select().where(user_passes.c.id == holder["user_pass_id"]))
+    assert seated["seat_id"] == seat_id and seated["is_active"]
+
+    assert (await client.post("/leave", json={"seat_id": seat_id}, headers=holder["headers"])).status_code == 200
+    seat = await db.fetch_one(seats.select().where(seats.c.id == seat_id))
+    assert not seat["is_occupied"] and seat["user_pass_id"] is None
+    left = await db.fetch_one(user_passes.select().where(user_passes.c.id == holder["user_pass_id"]))
+    assert left["seat_id"] is None and not left["is_active"]
+    assert await session_count(db, seat_id) == 1
+
+
+@pytest.mark.parametrize("values", [
+    {"expire_at": datetime.now(KST) - timedelta(minutes=1)},
+    {"expire_at": None, "remaining_seconds": 0},
+], ids=["expired", "no_time_left"])
+async def test_claim_rejects_unusable_pass(db, seat_and_pass, make_user_pass, client, values):
+    seat_id, pass_id = seat_and_pass
+    holder = await make_user_pass(pass_id, **values)
+
+    response = await claim_response(client, seat_id, holder)
+
+    assert response.status_code == 400
+    seat = await db.fetch_one(seats.select().where(seats.c.id == seat_id))
+    assert not seat["is_occupied"] and seat["user_pass_id"] is None
+
+
+async def test_claim_rejects_someone_elses_pass(db, seat_and_pass, make_user_pass, client):
+    seat_id, pass_id = seat_and_pass
+    holder = await make_user_pass(pass_id)
+    other = await make_user_pass(pass_id)
+
+    response = await claim_response(client, seat_id, other, user_pass_id=holder["user_pass_id"])
+
+    assert response.status_code == 404
+    seat = await db.fetch_one(seats.select().where(seats.c.id == seat_id))
+    assert not seat["is_occupied"]
+
+
+async def test_claim_rejects_occupied_seat_and_seated_pass(db, make_seat, seat_and_pass, make_user_pass, client):
+    seat_id, pass_id = seat_and_pass
+    holder = await make_user_pass(pass_id)
+    other = await make_user_pass(pass_id)
+    assert (await claim_response(client, seat_id, holder)).status_code == 200
+
+    # 이미 점유된 좌석
+    assert (await claim_response(client, seat_id, other)).status_code == 409
+    # 이미 다른 좌석에 앉아 있는 이용권 (두 번째 좌석 점유도 롤백됨)
+    second_seat_id = await make_seat()
+    assert (await claim_response(client, second_seat_id, holder)).status_code == 409
+    second_seat = await db.fetch_one(seats.select().where(seats.c.id == second_seat_id))
+    assert not second_seat["is_occupied"] and second_seat["user_pass_id"] is None
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from seat_hub import SeatHub, SeatHubs, seat_hubs
+
+pytestmark = pytest.mark.anyio
+
+
+def parse_sse(message: str) -> tuple:
+    event_line, data_line = message.strip().split("\n")
+    return event_line.removeprefix("event: "), json.loads(data_line.removeprefix("data: "))
+
+
+def test_events_go_only_to_the_branch_channel():
+    hubs = SeatHubs()
+    mine, other = hubs.channel(1).subscribe(), hubs.channel(2).subscribe()
+
+    hubs.channel(1).publish_freed(["A1"])
+
+    assert parse_sse(mine.get_nowait()) == ("seat", {
+        "seat_name": "A1", "is_occupied": False, "occupant_user_pass_id": None,
+        "occupant_remaining_time": None, "is_paused": False,
+    })
+    assert other.empty()
+
+
+def test_slow_subscriber_is_dropped_without_blocking_others():
+    hub = SeatHub(queue_size=2)
+    slow, fast = hub.subscribe(), hub.subscribe()
+
+    for seat_id in ["A1", "A2"]:
+        hub.publish_freed([seat_id])
+        fast.get_nowait()
+    hub.publish_freed(["A3"])
+
+    # 가득 찬 구독자는 밀린 이벤트를 버리고 종료 신호(None)만 받아 재접속하게 됨
+    assert slow.get_nowait() is None and slow.empty()
+    assert hub.subscriber_count == 1
+    assert parse_sse(fast.get_nowait())[1]["seat_name"] == "A3"
+
+
+async def test_claim_and_leave_publish_seat_events(db, client, branch, make_seat, make_pass, make_user_pass):
+    seat_id = await make_seat(branch_id=branch["id"])
+    holder = await make_user_pass(await make_pass(branch_id=branch["id"]), branch_id=branch["id"])
+    hub = seat_hubs.channel(branch["id"])
+    queue = hub.subscribe()
+    try:
+        assert (await client.post(f"/branches/{branch['id']}/seat", headers=holder["headers"], json={
+            "seat_id": seat_id, "user_pass_id": holder["user_pass_id"],
+        })).status_code == 200
+        event, seated = parse_sse(queue.get_nowait())
+        assert event == "seat" and seated["seat_name"] == seat_id
+        assert seated["is_occupied"] and seated["occupant_user_pass_id"] == holder["user_pass_id"]
+
+        assert (await client.post(f"/branches/{branch['id']}/leave", headers=holder["headers"], json={
+            "seat_id": seat_id,
+        })).status_code == 200
+        event, freed = parse_sse(queue.get_nowait())
+        assert event == "seat" and freed["seat_name"] == seat_id and not freed["is_occupied"]
+        assert queue.empty()
+    finally:
+        hub.unsubscribe(queue)
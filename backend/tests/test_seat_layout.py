@@ -0,0 +1,90 @@
+import pytest
+
+from seat_layout import BranchLayout, recommend_group, recommend_seats
+
+pytestmark = pytest.mark.anyio
+
+
+def make_layout() -> BranchLayout:
+    """
+    open 구역 두 줄과 quiet 구역 한 자리.
+      y=1: A1(outlet) A2 A3(window) A4
+      y=2: B1         B2
+    """
+    def seat(seat_id, zone, x, y, features=None):
+        return {"id": seat_id, "zone": zone, "pos_x": x, "pos_y": y, "features": features}
+
+    return BranchLayout([
+        seat("A1", "open", 1, 1, "outlet"), seat("A2", "open", 2, 1), seat("A3", "open", 3, 1, "window"),
+        seat("A4", "open", 4, 1), seat("B1", "open", 1, 2), seat("B2", "open", 2, 2),
+        seat("Q1", "quiet", 1, 1, "outlet"),
+    ])
+
+
+def seat_ids(recommendations) -> list:
+    return [seat["seat_id"] for seat in recommendations]
+
+
+def test_neighbors_stay_within_zone():
+    layout = make_layout()
+    assert sorted(layout.neighbors["A2"]) == ["A1", "A3", "B2"]
+    assert layout.neighbors["Q1"] == []
+
+
+def test_recommend_prefers_features_then_free_neighbors():
+    layout = make_layout()
+    best = recommend_seats(layout, set(), 2, {"outlet"})
+    assert seat_ids(best) == ["A1", "Q1"]
+    assert best[0]["matched_features"] == ["outlet"]
+
+    # 특성 조건이 없으면 옆자리가 가장 많이 빈 좌석, 같으면 좌석 id 순
+    assert seat_ids(recommend_seats(layout, set(), 1, set())) == ["A2"]
+    assert seat_ids(recommend_seats(layout, {"A3"}, 1, set())) == ["A1"]
+    assert seat_ids(recommend_seats(layout, set(), 5, set(), zone="quiet")) == ["Q1"]
+
+
+def test_group_prefers_consecutive_seats_in_a_row():
+    layout = make_layout()
+    assert seat_ids(recommend_group(layout, set(), 3, set())) == ["A1", "A2", "A3"]
+    assert seat_ids(recommend_group(layout, {"A1"}, 3, set())) == ["A2", "A3", "A4"]
+
+
+def test_group_falls_back_to_adjacent_cluster():
+    layout = make_layout()
+    # A2 가 차 있으면 한 줄에 셋이 연달아 빈 곳이 없으므로 앞뒤로 이어진 A1-B1-B2
+    assert seat_ids(recommend_group(layout, {"A2"}, 3, set())) == ["A1", "B1", "B2"]
+    assert recommend_group(layout, {"A2"}, 4, set()) is None
+
+
+async def test_recommend_skips_occupied_seats(db, client, branch, make_pass, make_user_pass, next_id):
+    prefix = f"L{next_id()}-"
+    layout = [{"seat_id": f"{prefix}{x}", "zone": "open", "x": x, "y": 1} for x in range(1, 4)]
+    response = await client.put(f"/branches/{branch['id']}/seats/layout", headers=branch["headers"], json={
+        "seats": layout,
+    })
+    assert response.status_code == 200 and response.json()["created"] == 3
+
+    holder = await make_user_pass(await make_pass(branch_id=branch["id"]), branch_id=branch["id"])
+    assert (await client.post(f"/branches/{branch['id']}/seat", headers=holder["headers"], json={
+        "seat_id": f"{prefix}2", "user_pass_id": holder["user_pass_id"],
+    })).status_code == 200
+
+    response = await client.get(f"/branches/{branch['id']}/seats/recommend", headers=holder["headers"], params={
+        "count": 5,
+    })
+    assert response.status_code == 200
+    assert sorted(seat_ids(response.json())) == [f"{prefix}1", f"{prefix}3"]
+
+    # 가운데 자리가 차 있어 둘이 붙어 앉을 곳이 없음
+    response = await client.get(f"/branches/{branch['id']}/seats/recommend/group", headers=holder["headers"], params={
+        "size": 2,
+    })
+    assert response.status_code == 404
+
+
+async def test_layout_rejects_other_branch_seat(db, client, branch, make_seat):
+    other = await make_seat(branch_id=1)
+    response = await client.put(f"/branches/{branch['id']}/seats/layout", headers=branch["headers"], json={
+        "seats": [{"seat_id": other, "zone": "open", "x": 1, "y": 1}],
+    })
+    assert response.status_code == 409
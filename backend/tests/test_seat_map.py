@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from models import seats
+from seat_state import SeatMap
+
+pytestmark = pytest.mark.anyio
+
+
+async def add_seat_behind_cache(db, branch_id: int, next_id) -> str:
+    """
+    캐시를 무효화하지 않고 좌석을 추가 (다른 워커가 바꾼 것처럼).
+    """
+    seat_id = f"M{next_id()}"
+    await db.execute(seats.insert().values(id=seat_id, is_occupied=False, branch_id=branch_id))
+    return seat_id
+
+
+async def test_snapshot_is_cached_until_invalidated(db, branch, make_seat, next_id):
+    first = await make_seat(branch_id=branch["id"])
+    seat_map = SeatMap(branch["id"], ttl=60)
+    assert [entry["seat_id"] for entry in await seat_map.get()] == [first]
+
+    second = await add_seat_behind_cache(db, branch["id"], next_id)
+    assert [entry["seat_id"] for entry in await seat_map.get()] == [first]
+
+    seat_map.invalidate()
+    assert sorted(entry["seat_id"] for entry in await seat_map.get()) == sorted([first, second])
+
+
+async def test_snapshot_reloads_after_ttl(db, branch, make_seat, next_id):
+    await make_seat(branch_id=branch["id"])
+    seat_map = SeatMap(branch["id"], ttl=0)
+    await seat_map.get()
+
+    added = await add_seat_behind_cache(db, branch["id"], next_id)
+    assert added in [entry["seat_id"] for entry in await seat_map.get()]
+
+
+async def test_concurrent_misses_load_once(db, branch, make_seat, monkeypatch):
+    await make_seat(branch_id=branch["id"])
+    seat_map = SeatMap(branch["id"], ttl=60)
+    loads = []
+    original_load = seat_map._load
+
+    async def counting_load():
+        loads.append(1)
+        return await original_load()
+
+    monkeypatch.setattr(seat_map, "_load", counting_load)
+
+    results = await asyncio.gather(*[seat_map.get() for _ in range(10)])
+    assert len(loads) == 1
+    assert all(result == results[0] for result in results)
+
+
+async def test_status_shows_occupant_and_remaining_time(db, client, branch, make_seat, make_pass, make_user_pass):
+    seat_id = await make_seat(branch_id=branch["id"])
+    holder = await make_user_pass(await make_pass(branch_id=branch["id"]), branch_id=branch["id"])
+    assert (await client.post(f"/branches/{branch['id']}/seat", headers=holder["headers"], json={
+        "seat_id": seat_id, "user_pass_id": holder["user_pass_id"],
+    })).status_code == 200
+
+    response = await client.get(f"/branches/{branch['id']}/status", headers=holder["headers"])
+    assert response.status_code == 200
+    [status] = response.json()
+    assert status["seat_name"] == seat_id and status["is_occupied"]
+    assert status["occupant_user_pass_id"] == holder["user_pass_id"]
+    # 하루짜리 기간권: 남은 시간은 하루에서 1분 안쪽으로 모자람
+    assert 24 * 60 - 1 <= status["occupant_remaining_time"] <= 24 * 60
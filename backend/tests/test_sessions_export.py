@@ -0,0 +1,61 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+
+import routes.reports as reports_routes
+from analytics import record_seat_session
+
+KST = pytz.timezone("Asia/Seoul")
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def sessions(db, next_id):
+    """
+    다른 테스트와 겹치지 않는 하루(day)에 끝난 이용 기록 5건과 그 앞뒤 날짜 기록 한 건씩.
+    """
+    day = datetime(2019, 1, 1) + timedelta(days=next_id())
+    seat_ids = []
+    for hours in [-20, 9, 10, 11, 12, 13, 30]:
+        ended_at = KST.localize(day + timedelta(hours=hours))
+        seat_id = f"E{next_id()}"
+        await record_seat_session({
+            "seat_id": seat_id, "user_pass_id": next_id(), "user_id": None, "pass_id": None,
+            "started_at": ended_at - timedelta(minutes=90), "ended_at": ended_at, "end_reason": "leave",
+        }, 1)
+        if 0 <= hours < 24:
+            seat_ids.append(seat_id)
+    return {"day": day.date().isoformat(), "seat_ids": seat_ids}
+
+
+async def export(client, headers: dict, day: str, **params) -> list:
+    response = await client.get("/admin/reports/sessions", headers=headers, params={
+        "start": day, "end": day, **params,
+    })
+    assert response.status_code == 200
+    if params.get("format") == "csv":
+        return response.text.splitlines()
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+async def test_export_pages_through_all_sessions_in_id_order(db, client, admin, sessions, monkeypatch):
+    monkeypatch.setattr(reports_routes, "EXPORT_PAGE_SIZE", 2)
+    headers = (await admin())["headers"]
+
+    rows = await export(client, headers, sessions["day"])
+    assert [row["seat_id"] for row in rows] == sessions["seat_ids"]
+    assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+    assert {row["used_minutes"] for row in rows} == {90}
+
+    # 끊긴 다운로드는 마지막으로 받은 id 다음부터 이어 받음
+    resumed = await export(client, headers, sessions["day"], after_id=rows[1]["id"])
+    assert [row["seat_id"] for row in resumed] == sessions["seat_ids"][2:]
+
+
+async def test_export_as_csv(db, client, admin, sessions):
+    lines = await export(client, (await admin())["headers"], sessions["day"], format="csv")
+    assert lines[0] == ",".join(reports_routes.SESSION_COLUMNS)
+    assert [line.split(",")[1] for line in lines[1:]] == sessions["seat_ids"]
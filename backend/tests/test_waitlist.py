@@ -0,0 +1,44 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from sqlalchemy import func, select
+
+from models import waitlist_entries
+
+KST = pytz.timezone("Asia/Seoul")
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_joins_create_one_entry(db, client, branch, make_pass, make_user_pass):
+    holder = await make_user_pass(await make_pass(branch_id=branch["id"]), branch_id=branch["id"])
+
+    async def join():
+        return await client.post(f"/branches/{branch['id']}/waitlist", headers=holder["headers"])
+
+    responses = await asyncio.gather(*[join() for _ in range(3)])
+    assert sorted(response.status_code for response in responses) == [200, 409, 409]
+    open_entries = await db.fetch_val(
+        select(func.count())
+        .select_from(waitlist_entries)
+        .where(waitlist_entries.c.user_id == holder["user_id"])
+        .where(waitlist_entries.c.status.in_(["waiting", "offered"]))
+    )
+    assert open_entries == 1
+
+    # 취소하면 다시 줄 설 수 있음
+    assert (await client.delete(f"/branches/{branch['id']}/waitlist/me", headers=holder["headers"])).status_code == 200
+    assert (await join()).status_code == 200
+
+
+@pytest.mark.parametrize("values", [
+    {"expire_at": datetime.now(KST) - timedelta(minutes=1)},
+    {"expire_at": None, "remaining_seconds": 0},
+], ids=["expired", "no_time_left"])
+async def test_join_needs_a_usable_pass(db, client, branch, make_pass, make_user_pass, values):
+    holder = await make_user_pass(await make_pass(branch_id=branch["id"]), branch_id=branch["id"], **values)
+
+    response = await client.post(f"/branches/{branch['id']}/waitlist", headers=holder["headers"])
+    assert response.status_code == 400
@@ -0,0 +1,344 @@
+import asyncio
+import heapq
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from database import database
+from models import waitlist_entries
+from analytics import upsert
+from seat_state import seat_maps, to_kst
+from seat_hub import SeatHub
+from reservations import reservation_book
+from branches import OWNED_BRANCH_IDS
+import pytz
+KST = pytz.timezone("Asia/Seoul")
+
+logger = logging.getLogger(__name__)
+
+# 빈 좌석을 제안받은 대기자가 착석해야 하는 시간
+OFFER_SECONDS = 120
+# 제안 만료가 없어도 이 간격마다 DB에서 대기열을 다시 읽어 다른 워커의 변경을 반영 (초)
+WAITLIST_CHECK_SECONDS = 30
+
+# 대기열에 남아 있는 상태
+OPEN_STATUSES = ("waiting", "offered")
+
+
+def entry_values(record) -> dict:
+    return {
+        "id": record["id"],
+        "branch_id": record["branch_id"],
+        "user_id": record["user_id"],
+        "priority": record["priority"],
+        "status": record["status"],
+        "seat_id": record["seat_id"],
+        "offer_expires_at": to_kst(record["offer_expires_at"]),
+    }
+
+
+class Waitlist:
+    """
+    지점별 좌석 대기열. 대기 중인 항목을 (우선순위, 줄 선 순서) 최소 힙으로 메모리에 두고 DB 테이블에 함께 기록함.
+    퇴실/만료로 좌석이 비면 맨 앞 대기자에게 그 좌석을 OFFER_SECONDS 동안 제안하고,
+    그 사용자에게만 이벤트(offer)를 보냄. 제안 중인 좌석은 제안받은 사람만 착석할 수 있음.
+    상태 변경은 조건부 UPDATE 로 해서 여러 워커가 같은 항목을 두 번 제안하지 않게 하고,
+    주기적으로 DB에서 다시 읽어 다른 워커의 변경을 반영함.
+    branch_ids 를 주면 그 지점 대기열만 다룸 (워커별 담당 지점).
+    """
+
+    def __init__(
+        self,
+        offer_seconds: float = OFFER_SECONDS,
+        check_interval: float = WAITLIST_CHECK_SECONDS,
+        branch_ids: Optional[set] = None,
+    ):
+        self.offer_seconds = offer_seconds
+        self.check_interval = check_interval
+        self.branch_ids = branch_ids
+        self._queues: Dict[int, List[Tuple[int, int, dict]]] = defaultdict(list)  # 지점 → [(-우선순위, id, 항목)]
+        self._by_user: Dict[Tuple[int, int], dict] = {}  # (지점, 사용자) → 대기열에 남아 있는 항목
+        self._offers: Dict[str, dict] = {}               # 좌석 → 그 좌석을 제안받은 항목
+        self._pending: Optional[List[dict]] = None       # 다시 읽는 동안 새로 줄 선 항목
+        self._user_hubs: Dict[int, SeatHub] = {}         # 사용자별 알림 채널
+        self._wakeup = asyncio.Event()
+
+    def _owned(self, query):
+        if self.branch_ids is None:
+            return query
+        return query.where(waitlist_entries.c.branch_id.in_(self.branch_ids))
+
+    def find(self, branch_id: int, user_id: int) -> Optional[dict]:
+        return self._by_user.get((branch_id, user_id))
+
+    def get(self, entry_id: int) -> Optional[dict]:
+        for entry in self._by_user.values():
+            if entry["id"] == entry_id:
+                return entry
+        return None
+
+    def offer_for(self, seat_id: str) -> Optional[dict]:
+        return self._offers.get(seat_id)
+
+    def position(self, entry: dict) -> int:
+        """
+        대기 중인 항목 앞에 있는 대기자 수 (1부터). 제안받은 상태면 0.
+        """
+        if entry["status"] != "waiting":
+            return 0
+        key = (-entry["priority"], entry["id"])
+        return 1 + sum(
+            1 for other in self._by_user.values()
+            if other["branch_id"] == entry["branch_id"]
+            and other["status"] == "waiting"
+            and (-other["priority"], other["id"]) < key
+        )
+
+    def waiting_count(self, branch_id: int) -> int:
+        return sum(
+            1 for entry in self._by_user.values()
+            if entry["branch_id"] == branch_id and entry["status"] == "waiting"
+        )
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        hub = self._user_hubs.get(user_id)
+        if hub is None:
+            hub = self._user_hubs[user_id] = SeatHub()
+        return hub.subscribe()
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        hub = self._user_hubs.get(user_id)
+        if hub is not None:
+            hub.unsubscribe(queue)
+            if not hub.subscriber_count:
+                del self._user_hubs[user_id]
+
+    def _notify(self, entry: dict, event: str):
+        hub = self._user_hubs.get(entry["user_id"])
+        if hub is not None:
+            hub.publish(event, {
+                "entry_id": entry["id"],
+                "branch_id": entry["branch_id"],
+                "status": entry["status"],
+                "seat_id": entry["seat_id"],
+                "offer_expires_at": entry["offer_expires_at"],
+            })
+
+    def _enqueue(self, entry: dict):
+        self._by_user[(entry["branch_id"], entry["user_id"])] = entry
+        if entry["status"] == "waiting":
+            heapq.heappush(self._queues[entry["branch_id"]], (-entry["priority"], entry["id"], entry))
+        elif entry["status"] == "offered":
+            self._offers[entry["seat_id"]] = entry
+
+    def _forget(self, entry: dict):
+        key = (entry["branch_id"], entry["user_id"])
+        if self._by_user.get(key) is entry:
+            del self._by_user[key]
+        if entry["seat_id"] is not None and self._offers.get(entry["seat_id"]) is entry:
+            del self._offers[entry["seat_id"]]
+        # 힙에 남은 항목은 꺼낼 때 상태를 보고 건너뜀
+
+    async def load(self):
+        """
+        대기열에 남아 있는 항목으로 메모리 인덱스를 다시 만듦. 앱 시작(lifespan) 때와 주기적으로 호출.
+        """
+        self._pending = []
+        try:
+            records = await database.fetch_all(self._owned(
+                waitlist_entries.select()
+                .where(waitlist_entries.c.status.in_(OPEN_STATUSES))
+            ))
+            entries = [entry_values(record) for record in records]
+            loaded_ids = {entry["id"] for entry in entries}
+            entries.extend(entry for entry in self._pending if entry["id"] not in loaded_ids)
+        finally:
+            self._pending = None
+
+        self._queues = defaultdict(list)
+        self._by_user = {}
+        self._offers = {}
+        for entry in entries:
+            self._enqueue(entry)
+
+    async def join(self, branch_id: int, user_id: int, now: datetime, priority: int = 0) -> Optional[dict]:
+        """
+        대기열에 줄을 세움. 지금 빈 좌석이 있으면 바로 제안까지 함.
+        이미 그 지점 대기열에 있으면 (다른 요청/워커가 먼저 넣음) 아무것도 하지 않고 None.
+        """
+        entry = {
+            "branch_id": branch_id,
+            "user_id": user_id,
+            "priority": priority,
+            "status": "waiting",
+            "seat_id": None,
+            "offer_expires_at": None,
+        }
+        # 부분 유니크 인덱스(대기열에 남은 항목의 지점+사용자)에 걸리면 넣지 않음
+        entry_id = await database.fetch_val(
+            upsert(waitlist_entries)
+            .values(entry)
+            .on_conflict_do_nothing(
+                index_elements=["branch_id", "user_id"],
+                index_where=waitlist_entries.c.status.in_(OPEN_STATUSES),
+            )
+            .returning(waitlist_entries.c.id)
+        )
+        if entry_id is None:
+            return None
+
+        entry["id"] = entry_id
+        self._enqueue(entry)
+        if self._pending is not None:
+            self._pending.append(entry)
+
+        await self.offer_free_seats(branch_id, now)
+        return entry
+
+    async def leave(self, entry: dict, status: str, now: datetime):
+        """
+        대기열에서 빼고(status: 'cancelled' 또는 'seated') 제안받던 좌석이 있으면 다음 대기자에게 넘김.
+        """
+        offered_seat = entry["seat_id"] if entry["status"] == "offered" else None
+        await database.execute(
+            waitlist_entries.update()
+            .where(waitlist_entries.c.id == entry["id"])
+            .where(waitlist_entries.c.status.in_(OPEN_STATUSES))
+            .values(status=status)
+        )
+        self._forget(entry)
+        entry["status"] = status
+
+        if offered_seat is not None and status != "seated":
+            await self.seats_freed(entry["branch_id"], [offered_seat], now)
+
+    async def set_priority(self, entry: dict, priority: int):
+        await database.execute(
+            waitlist_entries.update()
+            .where(waitlist_entries.c.id == entry["id"])
+            .values(priority=priority)
+        )
+        entry["priority"] = priority
+        if entry["status"] == "waiting":
+            # 예전 우선순위로 들어간 힙 항목은 꺼낼 때 건너뜀
+            heapq.heappush(self._queues[entry["branch_id"]], (-priority, entry["id"], entry))
+
+    async def seated(self, branch_id: int, user_id: int, seat_id: str, now: datetime):
+        """
+        착석하면 그 사용자의 대기 항목을 끝냄. 다른 좌석을 제안받고 있었다면 그 좌석은 다음 대기자에게.
+        """
+        entry = self.find(branch_id, user_id)
+        if entry is None:
+            return
+        if entry["status"] == "offered" and entry["seat_id"] != seat_id:
+            await self.leave(entry, "cancelled", now)
+        else:
+            await self.leave(entry, "seated", now)
+
+    async def _offer_next(self, branch_id: int, seat_id: str, now: datetime) -> Optional[dict]:
+        queue = self._queues.get(branch_id)
+        while queue:
+            negative_priority, _, entry = heapq.heappop(queue)
+            if entry["status"] != "waiting" or -entry["priority"] != negative_priority:
+                continue
+            if self._by_user.get((branch_id, entry["user_id"])) is not entry:
+                continue
+
+            expires_at = now + timedelta(seconds=self.offer_seconds)
+            offered = await database.fetch_one(
+                waitlist_entries.update()
+                .where(waitlist_entries.c.id == entry["id"])
+                .where(waitlist_entries.c.status == "waiting")
+                .values(status="offered", seat_id=seat_id, offer_expires_at=expires_at)
+                .returning(waitlist_entries.c.id)
+            )
+            if not offered:
+                # 다른 워커가 먼저 처리한 항목
+                self._forget(entry)
+                continue
+
+            entry.update(status="offered", seat_id=seat_id, offer_expires_at=expires_at)
+            self._offers[seat_id] = entry
+            self._notify(entry, "offer")
+            self._wakeup.set()
+            return entry
+        return None
+
+    async def seats_freed(self, branch_id: int, seat_ids: Iterable[str], now: Optional[datetime] = None):
+        """
+        퇴실/만료로 빈 좌석을 대기열 앞사람부터 하나씩 제안. 곧 예약이 시작되는 좌석은 제외.
+        """
+        now = now or datetime.now(KST)
+        if not self._queues.get(branch_id):
+            return
+        for seat_id in seat_ids:
+            if seat_id in self._offers or reservation_book.upcoming(seat_id, now) is not None:
+                continue
+            if await self._offer_next(branch_id, seat_id, now) is None:
+                break
+
+    async def offer_free_seats(self, branch_id: int, now: datetime):
+        """
+        지점 좌석 스냅샷에서 비어 있는 좌석을 찾아 대기자에게 제안 (줄 설 때, 제안이 만료됐을 때).
+        """
+        if not self._queues.get(branch_id):
+            return
+        entries = await seat_maps.get(branch_id)
+        await self.seats_freed(branch_id, [entry["seat_id"] for entry in entries if not entry["is_occupied"]], now)
+
+    async def expire_offers(self, now: Optional[datetime] = None) -> int:
+        """
+        시간 안에 착석하지 않은 제안을 한 번의 UPDATE 로 만료시키고 그 좌석을 다음 대기자에게 제안.
+        """
+        now = now or datetime.now(KST)
+        overdue = [entry for entry in self._offers.values() if entry["offer_expires_at"] <= now]
+        if not overdue:
+            return 0
+
+        await database.execute(
+            waitlist_entries.update()
+            .where(waitlist_entries.c.id.in_([entry["id"] for entry in overdue]))
+            .where(waitlist_entries.c.status == "offered")
+            .values(status="expired")
+        )
+        for entry in overdue:
+            self._forget(entry)
+            entry["status"] = "expired"
+            self._notify(entry, "expired")
+
+        for branch_id in {entry["branch_id"] for entry in overdue}:
+            await self.offer_free_seats(branch_id, now)
+        logger.info("좌석 제안 %d건 만료", len(overdue))
+        return len(overdue)
+
+    def _seconds_until_next(self, now: datetime) -> float:
+        if not self._offers:
+            return self.check_interval
+        earliest = min(entry["offer_expires_at"] for entry in self._offers.values())
+        return min(max((earliest - now).total_seconds(), 0), self.check_interval)
+
+    async def run(self):
+        """
+        lifespan 에서 백그라운드 태스크로 실행하는 제안 만료/대기열 갱신 루프.
+        가장 빠른 제안 만료 시각에 맞춰 깨어남.
+        """
+        last_load = time.monotonic()
+        while True:
+            try:
+                await self.expire_offers()
+                if time.monotonic() - last_load >= self.check_interval:
+                    await self.load()
+                    last_load = time.monotonic()
+            except Exception:
+                logger.exception("좌석 대기열 정리 실패")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._seconds_until_next(datetime.now(KST)))
+            except asyncio.TimeoutError:
+                pass
+
+
+# 앱 전체에서 공유하는 좌석 대기열 (이 워커가 맡은 지점만)
+waitlist = Waitlist(branch_ids=OWNED_BRANCH_IDS)
@@ -1,6 +1,5 @@
 import * as React from "react";
 import { useEffect, useState } from "react";
-import axios from "axios";
 
 const seatRotation = {
     "73G": { angle: -68.7, cx: 192.647, cy: 253.232 },
@@ -138,24 +137,31 @@ const SvgComponent = ({ handleSeatClick }) => {
     const [loading, setLoading] = useState(true);
 
     useEffect(() => {
-        const fetchSeatStatuses = async () => {
-            try {
-                const token = localStorage.getItem("token")
-                const res = await axios.get("http://localhost:8000/status", {
-                    headers: { Authorization: `Bearer ${token}` },
-                });
-                setSeatStatuses(res.data)
-
-            } catch (err) {
-                console.error("좌석 상태 불러오기 실패:", err)
-            } finally {
-                setLoading(false);
-            }
+        // 좌석 상태 실시간 구독: 처음엔 전체 스냅샷, 이후엔 바뀐 좌석만 받음
+        const token = localStorage.getItem("token")
+        const source = new EventSource(
+            `http://localhost:8000/status/stream?token=${encodeURIComponent(token)}`
+        );
+
+        source.addEventListener("snapshot", (event) => {
+            setSeatStatuses(JSON.parse(event.data))
+            setLoading(false);
+        });
+
+        source.addEventListener("seat", (event) => {
+            const changed = JSON.parse(event.data)
+            setSeatStatuses((prev) =>
+                prev.map((s) => (s.seat_name === changed.seat_name ? changed : s))
+            );
+        });
+
+        source.onerror = (err) => {
+            // 연결이 끊기면 EventSource가 자동으로 재접속하고 스냅샷을 다시 받음
+            console.error("좌석 상태 구독 오류:", err)
+            setLoading(false);
         };
 
-        fetchSeatStatuses();
-        const interval = setInterval(fetchSeatStatuses, 60000); // 1분마다 갱신
-        return () => clearInterval(interval);
+        return () => source.close();
     }, []);
 
     const seatStatusMap = new Map(